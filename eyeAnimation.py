@@ -0,0 +1,165 @@
+##
+# SpriteSheet and SpriteAnimation Classes
+#
+# Short looping animations (iris shimmer, sparkles) from multi-frame
+# bitmap modules, the kind GC9A01.bitmap( module, x, y, index ) draws one
+# frame of, played on time and without allocating per frame.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeAnimation.py
+
+    Module: Sprite sheet frames decoded into a reusable buffer, with timing.
+
+    A multi-frame bitmap module holds BITMAPS frames of WIDTH x HEIGHT
+    pixels packed back to back in BITMAP, BPP bits per pixel.  A SpriteSheet
+    decodes a frame on demand into one arena buffer with
+    pixelDecode.decodePixels(), or decodes every frame once up front
+    (predecode) when there is memory for them, after which a frame is only
+    a blit.
+"""
+
+from utime import ticks_diff, ticks_add
+
+import pixelArena
+
+from pixelDecode import paletteBytes, decodePixels
+
+##
+## Class SpriteSheet
+##
+class SpriteSheet:
+    '''
+    Frames of a multi-frame bitmap module.
+
+    bitmap  - module with WIDTH, HEIGHT, BPP, PALETTE, BITMAP and
+              optionally BITMAPS (the frame count, 1 if missing)
+    swapped - True for eye bitmap modules whose PALETTE is byte swapped
+              (see pixelDecode.paletteBytes); False for GC9A01.bitmap() modules
+    owner   - pixel arena owner of the frame buffer(s)
+
+    frame( index ) returns the RGB565 pixels of a frame.  Without
+    predecode() every frame is decoded into the same buffer, so the result
+    is only good until the next call.
+    '''
+
+    def __init__( self, bitmap, swapped=False, owner=None ):
+        self.bitmap    = bitmap
+        self.width     = bitmap.WIDTH
+        self.height    = bitmap.HEIGHT
+        self.frames    = getattr( bitmap, "BITMAPS", 1 )
+        self.pixels    = self.width * self.height
+        self.high, self.low = paletteBytes( bitmap.PALETTE, swapped )
+        self.owner     = owner if owner is not None else "sheet " + bitmap.__name__
+        self.buffer    = None
+        self.current   = -1     # Frame now in buffer
+        self.views     = None   # Views of every frame after predecode()
+
+    def __len__( self ):
+        return self.frames
+
+    def frame( self, index ):
+        if ( self.views is not None ):
+            return self.views[ index ]
+        if ( index != self.current ):
+            if ( self.buffer is None ):
+                self.buffer = pixelArena.get( self.owner, self.pixels * 2 )
+            self.decode( index, self.buffer )
+            self.current = index
+        return self.buffer
+
+    def decode( self, index, buffer, offset=0 ):
+        bitmap = self.bitmap
+        decodePixels( bitmap.BITMAP, bitmap.BPP, bitmap.BPP * self.pixels * index,
+                      self.pixels, self.high, self.low, buffer, offset )
+
+    def predecode( self ):
+        # Decode every frame once into one arena block; frames then cost
+        # frames * WIDTH * HEIGHT * 2 bytes and no decoding
+        frameBytes = self.pixels * 2
+        block      = pixelArena.get( self.owner, frameBytes * self.frames )
+        views      = []
+        for index in range( self.frames ):
+            self.decode( index, block, index * frameBytes )
+            views.append( block[ index * frameBytes : ( index + 1 ) * frameBytes ] )
+        self.buffer  = None
+        self.current = -1
+        self.views   = views
+
+    def draw( self, display, x, y, index ):
+        display.blit_buffer( self.frame( index ), x, y, self.width, self.height )
+
+
+##
+## Class SpriteAnimation
+##
+class SpriteAnimation:
+    '''
+    Plays the frames of a SpriteSheet at (x, y) on a display, one frame
+    every frameMs milliseconds.
+
+    start( now )    - show the first frame at time now (ticks_ms)
+    update( now )   - show the frame due at time now; returns True if a
+                      frame was drawn
+
+    Timing follows the clock rather than the frame loop: when update() is
+    called late, frames that are already over are skipped (and counted in
+    skipped) so the animation keeps its speed.  Without loop the last
+    frame stays up and done becomes True.
+    '''
+
+    def __init__( self, sheet, display, x, y, frameMs=100, loop=True ):
+        self.sheet    = sheet
+        self.display  = display
+        self.x        = x
+        self.y        = y
+        self.frameMs  = frameMs
+        self.loop     = loop
+        self.index    = 0
+        self.due      = 0
+        self.running  = False
+        self.done     = False
+        self.skipped  = 0
+
+    def moveTo( self, x, y ):
+        self.x = x
+        self.y = y
+
+    def start( self, now ):
+        self.index   = 0
+        self.running = True
+        self.done    = False
+        self.skipped = 0
+        self.sheet.draw( self.display, self.x, self.y, 0 )
+        self.due     = ticks_add( now, self.frameMs )
+
+    def stop( self ):
+        self.running = False
+
+    def update( self, now ):
+        if ( not self.running ):
+            return False
+        late = ticks_diff( now, self.due )
+        if ( late < 0 ):
+            return False
+
+        # Skip the frames whose time is already over
+        skip          = late // self.frameMs
+        self.skipped += skip
+        self.due      = ticks_add( self.due, self.frameMs * ( skip + 1 ) )
+        index         = self.index + 1 + skip
+        frames        = self.sheet.frames
+        if ( index >= frames ):
+            if ( not self.loop ):
+                index        = frames - 1
+                self.running = False
+                self.done    = True
+                if ( index == self.index ):
+                    return False
+            else:
+                index %= frames
+        self.index = index
+        self.sheet.draw( self.display, self.x, self.y, index )
+        return True
@@ -0,0 +1,309 @@
+##
+# EyeArray Class
+#
+# State of several eyes kept in array columns and updated in one pass,
+# for props with more than two displays.  Eyes that show the same image
+# at the same place are drawn once, to all of their displays together.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeArray.py
+
+    Module: Column-oriented state and broadcast drawing for N eyes.
+
+    All displays share SPI clock, data and DC and differ only in their chip
+    select pins.  Pulling several chip selects low at once sends the same
+    commands and pixels to every selected panel, so a group of eyes in
+    identical state costs one transfer instead of one per eye.
+"""
+
+from array import array
+
+##
+## Class ChipSelectGroup
+##
+class ChipSelectGroup:
+    '''
+    Stands in for a display's chip select pin and drives the pins of every
+    display in a group.  Holds at most capacity pins; set count to use the
+    first count of them.
+    '''
+
+    def __init__( self, capacity ):
+        self.pins  = [ None ] * capacity
+        self.count = 0
+
+    def off( self ):
+        for i in range( self.count ):
+            self.pins[ i ].off()
+
+    def on( self ):
+        for i in range( self.count ):
+            self.pins[ i ].on()
+
+
+##
+## Class EyeArray
+##
+class EyeArray:
+    '''
+    Positions, targets, steps and directions of up to capacity Eyeballs in
+    signed short array columns:
+
+        x, y                - position of each eye
+        targetX, targetY    - destination of each eye
+        stepX, stepY        - pixels moved per update
+        dirX, dirY          - -1, 0 or 1; dirY > 0 moves down
+
+    update() moves every eye in one pass over the columns, then draws.
+    Eyes whose display state is identical (same style, same position now
+    and before, same state) form a group drawn once by the first of them
+    with all their chip selects low.  Eyes moved on their own
+    (Eyeball.animate, moveEyeball, drawAt) are read back into x, y by
+    sync(), which update() and atDestination() call first.
+
+    Eyes have the same style when their settings match on displays with
+    the same mirroring; call restyle() after changing an eye's settings.
+    Style holds only what stays put between frames.  What changes while
+    the eyes run (lid and pupil levels, the warp variant and the buffer it
+    selects) is compared by sameState() as the groups are formed.
+    '''
+
+    def __init__( self, eyeballs=(), capacity=8 ):
+        self.capacity = capacity
+        self.eyes     = []
+        self.count    = 0
+
+        self.x        = array('h', bytes( 2 * capacity ))
+        self.y        = array('h', bytes( 2 * capacity ))
+        self.targetX  = array('h', bytes( 2 * capacity ))
+        self.targetY  = array('h', bytes( 2 * capacity ))
+        self.stepX    = array('h', bytes( 2 * capacity ))
+        self.stepY    = array('h', bytes( 2 * capacity ))
+        self.dirX     = array('h', bytes( 2 * capacity ))
+        self.dirY     = array('h', bytes( 2 * capacity ))
+        self.style    = array('h', bytes( 2 * capacity ))
+        self.leader   = array('h', bytes( 2 * capacity ))
+
+        self.select   = ChipSelectGroup( capacity )
+        self.draws    = 0     # Transfers made by the last draw()
+
+        for eyeball in eyeballs:
+            self.add( eyeball )
+
+    def __len__( self ):
+        return self.count
+
+    def __getitem__( self, i ):
+        return self.eyes[ i ]
+
+    def __iter__( self ):
+        return iter( self.eyes )
+
+    def add( self, eyeball ):
+        # Add an Eyeball and return its index
+        if ( self.count >= self.capacity ):
+            raise ValueError( "EyeArray is full ({} eyes)".format( self.capacity ) )
+        i = self.count
+        self.eyes.append( eyeball )
+        self.count       += 1
+        self.x[ i ]       = eyeball.x
+        self.y[ i ]       = eyeball.y
+        self.targetX[ i ] = eyeball.targetX
+        self.targetY[ i ] = eyeball.targetY
+        self.stepX[ i ]   = eyeball.stepX
+        self.stepY[ i ]   = eyeball.stepY
+        self.dirX[ i ]    = 0
+        self.dirY[ i ]    = 0
+        self.restyle()
+        return i
+
+    def restyle( self ):
+        # Number the distinct display styles; eyes with equal numbers can
+        # share a broadcast
+        eyes = self.eyes
+        for i in range( self.count ):
+            self.style[ i ] = i
+            for j in range( i ):
+                if ( self.sameStyle( eyes[ i ], eyes[ j ] ) ):
+                    self.style[ i ] = self.style[ j ]
+                    break
+
+    def sameStyle( self, a, b ):
+        displayA = a.display
+        displayB = b.display
+        return ( displayA.cs is not None and displayB.cs is not None and
+                 displayA.spi is displayB.spi and
+                 displayA.mirror == displayB.mirror and
+                 a.width == b.width and a.height == b.height and
+                 a.background == b.background and a.roundMask == b.roundMask and
+                 a.padded is b.padded and a.pupil is b.pupil and a.warp is b.warp and
+                 a.lowBuffer is b.lowBuffer and a.quality == b.quality and
+                 a.lids is b.lids and a.sclera is b.sclera and
+                 a.composite is b.composite )
+
+    def sameState( self, a, b ):
+        # True if two eyes of the same style would draw the same pixels
+        return ( a.buffer is b.buffer and a.warpKey == b.warpKey and
+                 a.lidLevel == b.lidLevel and a.pupilLevel == b.pupilLevel and
+                 a.useLowResolution() == b.useLowResolution() )
+
+    def setStep( self, stepX, stepY ):
+        for i in range( self.count ):
+            self.stepX[ i ] = stepX
+            self.stepY[ i ] = stepY
+
+    def setDirection( self, dirX, dirY ):
+        for i in range( self.count ):
+            self.dirX[ i ] = dirX
+            self.dirY[ i ] = dirY
+
+    def setDestination( self, targetX, targetY ):
+        for i in range( self.count ):
+            self.targetX[ i ] = targetX
+            self.targetY[ i ] = targetY
+
+    def moveCenter( self ):
+        # Center every eye without drawing
+        for i in range( self.count ):
+            eye = self.eyes[ i ]
+            eye.moveCenter()
+            self.x[ i ]       = eye.x
+            self.y[ i ]       = eye.y
+            self.targetX[ i ] = eye.x
+            self.targetY[ i ] = eye.y
+            self.dirX[ i ]    = 0
+            self.dirY[ i ]    = 0
+
+    def sync( self ):
+        # Copy each eye's position into x, y; eyes moved on their own since
+        # the last update would otherwise be drawn back at the old place
+        for i in range( self.count ):
+            eye = self.eyes[ i ]
+            self.x[ i ] = eye.x
+            self.y[ i ] = eye.y
+
+    def clear( self ):
+        for eye in self.eyes:
+            eye.clear()
+
+    def show( self ):
+        for eye in self.eyes:
+            eye.show()
+
+    def blink( self, now ):
+        for i in range( self.count ):
+            self.eyes[ i ].blink( now )
+
+    def updateBlink( self, now ):
+        # Advance every eye's blink; the lids of each eye are drawn on
+        # their own display
+        for i in range( self.count ):
+            self.eyes[ i ].updateBlink( now )
+
+    def atDestination( self ):
+        self.sync()
+        for i in range( self.count ):
+            if ( self.x[ i ] != self.targetX[ i ] or self.y[ i ] != self.targetY[ i ] ):
+                return False
+        return True
+
+    def update( self, stopAtTarget=False ):
+        # Move every eye one step, then draw.
+        #    stopAtTarget True  - walk toward (targetX, targetY) without overshooting
+        #    stopAtTarget False - move in (dirX, dirY), bouncing off the edges
+        self.sync()
+        xs = self.x
+        ys = self.y
+        for i in range( self.count ):
+            eye = self.eyes[ i ]
+            if ( stopAtTarget ):
+                xs[ i ] = self.approach( xs[ i ], self.targetX[ i ], self.stepX[ i ] )
+                ys[ i ] = self.approach( ys[ i ], self.targetY[ i ], self.stepY[ i ] )
+                continue
+
+            low  = -eye.overscan
+            high = eye.maxX - eye.width + eye.overscan
+            x    = xs[ i ] + self.dirX[ i ] * self.stepX[ i ]
+            if ( x < low or x > high ):
+                self.dirX[ i ] = -self.dirX[ i ]
+                x = xs[ i ] + self.dirX[ i ] * self.stepX[ i ]
+            xs[ i ] = x
+
+            high = eye.maxY - eye.height + eye.overscan
+            y    = ys[ i ] + self.dirY[ i ] * self.stepY[ i ]
+            if ( y < low or y > high ):
+                self.dirY[ i ] = -self.dirY[ i ]
+                y = ys[ i ] + self.dirY[ i ] * self.stepY[ i ]
+            ys[ i ] = y
+
+        self.draw()
+
+    def approach( self, value, target, step ):
+        if ( value < target ):
+            return min( value + step, target )
+        if ( value > target ):
+            return max( value - step, target )
+        return value
+
+    def drawAt( self, x, y ):
+        # Move every eye to (x, y) and draw
+        for i in range( self.count ):
+            self.x[ i ] = x
+            self.y[ i ] = y
+        self.draw()
+
+    def draw( self ):
+        # Bring every display up to date with the x, y columns, drawing
+        # each group of identical eyes once
+        eyes   = self.eyes
+        count  = self.count
+        leader = self.leader
+        xs     = self.x
+        ys     = self.y
+        for i in range( count ):
+            leader[ i ] = i
+
+        self.draws = 0
+        for i in range( count ):
+            if ( leader[ i ] != i ):
+                continue
+            eye = eyes[ i ]
+            if ( eye.x == xs[ i ] and eye.y == ys[ i ] ):
+                continue
+
+            # Collect the eyes in the same state as eye i
+            select       = self.select
+            select.pins[ 0 ] = eye.display.cs
+            select.count = 1
+            for j in range( i + 1, count ):
+                other = eyes[ j ]
+                if ( leader[ j ] == j and self.style[ j ] == self.style[ i ] and
+                     xs[ j ] == xs[ i ] and ys[ j ] == ys[ i ] and
+                     other.x == eye.x and other.y == eye.y and
+                     self.sameState( eye, other ) ):
+                    leader[ j ] = i
+                    select.pins[ select.count ] = other.display.cs
+                    select.count += 1
+
+            self.draws += 1
+            if ( select.count == 1 ):
+                eye.drawAt( xs[ i ], ys[ i ] )
+                continue
+
+            # Broadcast: draw through eye i with every chip select in the
+            # group, then bring the others to the state it was drawn in
+            display    = eye.display
+            cs         = display.cs
+            display.cs = select
+            try:
+                eye.drawAt( xs[ i ], ys[ i ] )
+            finally:
+                display.cs = cs
+            for j in range( i + 1, count ):
+                if ( leader[ j ] == i ):
+                    eyes[ j ].x = xs[ i ]
+                    eyes[ j ].y = ys[ i ]
+                    eyes[ j ].selectWarp()
@@ -0,0 +1,190 @@
+##
+# AssetManager Class
+#
+# Loads eye designs on first use and keeps the decoded buffers within a
+# RAM budget, evicting the least recently used designs that no Eyeball is
+# currently showing.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeAssets.py
+
+    Module: Lazily loaded, memory-budgeted eye design buffers.
+"""
+
+import gc
+
+import pixelArena
+
+from eyeBitmap import loadEye
+from eyeCache  import LRUCache
+
+## Default RAM budget for decoded designs (two 115x115 RGB565 buffers)
+DEFAULT_BUDGET = 2 * 115 * 115 * 2
+
+
+##
+## Class EyeAsset
+##
+class EyeAsset:
+    '''
+    A decoded eye design: RGB565 buffer plus its size in pixels.
+    Every Eyeball showing the design shares the same buffer, which is the
+    pixel arena block owned by the design's name.
+    '''
+
+    def __init__( self, name, buffer, width, height ):
+        self.name   = name
+        self.buffer = buffer
+        self.width  = width
+        self.height = height
+        self.bytes  = len( buffer )
+
+
+# moduleLoader( moduleName )
+#
+# Loader for an eye bitmap module (see eyeBitmap.extractEye).  The module is
+# imported when the design is first needed and decoded through loadEye(),
+# so its flash cache file is used when available.
+def moduleLoader( moduleName ):
+    def load( name ):
+        module = __import__( moduleName )
+        return EyeAsset( name, loadEye( module, owner=name ), module.WIDTH, module.HEIGHT )
+    return load
+
+# bundleLoader( fileName, width, height )
+#
+# Loader for a raw RGB565 file (width * height * 2 bytes, high byte first),
+# read with a single readinto().
+def bundleLoader( fileName, width, height ):
+    def load( name ):
+        buffer = pixelArena.get( name, width * height * 2 )
+        with open( fileName, "rb" ) as f:
+            f.readinto( buffer )
+        return EyeAsset( name, buffer, width, height )
+    return load
+
+# packedLoader( fileName )
+#
+# Loader for a compressed or indexed image file (see eyePack.packEye),
+# decoded band by band into the design's arena block.
+def packedLoader( fileName ):
+    def load( name ):
+        from eyePack import PackedEye
+        packed = PackedEye( fileName )
+        return EyeAsset( name, packed.loadInto( owner=name ), packed.width, packed.height )
+    return load
+
+# proceduralLoader( design )
+#
+# Loader for an eyeIris.IrisDesign, rendered when first needed.
+def proceduralLoader( design ):
+    def load( name ):
+        from eyeIris import renderIris
+        buffer = pixelArena.get( name, design.size * design.size * 2 )
+        return EyeAsset( name, renderIris( design, buffer ), design.size, design.size )
+    return load
+
+
+##
+## Class AssetManager
+##
+class AssetManager:
+    '''
+    Named eye designs loaded on first use.
+
+    register( name, loader, sizeHint )  - add a design; loader( name ) returns
+                                          an EyeAsset, sizeHint is its size
+                                          in bytes if known in advance
+    acquire( name )                     - load if needed and pin for an Eyeball
+    release( name )                     - the Eyeball no longer shows it
+    attach( eyeball, name )             - acquire name and show it on eyeball
+
+    Designs that are not acquired are evicted least recently used first to
+    stay within budget bytes.  Room is made before loading when sizeHint is
+    known, so a new design is not allocated on top of the ones it replaces.
+    '''
+
+    def __init__( self, budget=DEFAULT_BUDGET, maxDesigns=8 ):
+        self.loaders   = {}
+        self.hints     = {}
+        self.attached  = {}    # Eyeball -> name of the design it shows
+        self.cache     = LRUCache( maxDesigns, budget, lambda asset: asset.bytes,
+                                   lambda name, asset: pixelArena.release( name ) )
+
+    def register( self, name, loader, sizeHint=0 ):
+        self.loaders[ name ] = loader
+        self.hints[ name ]   = sizeHint
+
+    def get( self, name ):
+        # Return the EyeAsset for name, loading it on a miss
+        asset = self.cache.get( name )
+        if ( asset is not None ):
+            return asset
+
+        if ( name not in self.loaders ):
+            raise ValueError( "Unknown eye design: {}".format( name ) )
+
+        # Free memory for the new design before allocating it
+        self.makeRoom( self.hints[ name ] )
+        try:
+            asset = self.loaders[ name ]( name )
+        except MemoryError:
+            # Heap too fragmented: drop everything that is not in use and retry
+            while ( self.cache.evict() is not None ):
+                pass
+            gc.collect()
+            asset = self.loaders[ name ]( name )
+
+        self.cache.put( name, asset )
+        return asset
+
+    def makeRoom( self, size ):
+        evicted = False
+        while ( not self.cache.fits( size ) ):
+            if ( self.cache.evict() is None ):
+                break
+            evicted = True
+        if ( evicted ):
+            gc.collect()
+
+    def acquire( self, name ):
+        # Load name if needed and protect it from eviction while in use
+        asset = self.get( name )
+        self.cache.pin( name )
+        return asset
+
+    def release( self, name ):
+        # Allow name to be evicted again, trimming back to the budget if
+        # pinned designs had pushed the cache over it
+        self.cache.unpin( name )
+        budget  = self.cache.maxBytes
+        evicted = False
+        while ( budget is not None and self.cache.bytes > budget ):
+            if ( self.cache.evict() is None ):
+                break
+            evicted = True
+        if ( evicted ):
+            gc.collect()
+
+    def attach( self, eyeball, name ):
+        # Show design name on eyeball, releasing the design it showed before.
+        # Eyeballs attached to the same name share one buffer.
+        asset    = self.acquire( name )
+        previous = self.attached.get( eyeball )
+        if ( previous is not None ):
+            self.release( previous )
+        self.attached[ eyeball ] = name
+        eyeball.setImage( asset.buffer, asset.width, asset.height )
+        return asset
+
+    def footprint( self ):
+        # Bytes currently held by loaded designs
+        return self.cache.bytes
+
+    def stats( self ):
+        stats = self.cache.stats()
+        stats[ "budget" ] = self.cache.maxBytes
+        return stats
@@ -6,6 +6,34 @@
 #  Copyright © 2025, Steven F. LeBrun.  All rights reserved. 
 # 
 
+import os
+import binascii
+import ustruct as struct
+
+from utime import ticks_ms, ticks_diff
+
+import pixelArena
+
+from pixelDecode import paletteBytes, decodePixels
+
+## Directory on the flash filesystem holding decoded eye buffers
+CACHE_DIR    = "/eyecache"
+
+# Cache file header: magic, asset hash, width, height
+_CACHE_MAGIC  = b'E565'
+_CACHE_HEADER = "<4sIHH"
+
+## Result of the last loadEye() call
+##    hit  - True if the buffer was read from the cache file
+##    ms   - milliseconds taken to load (or decode and save) the buffer
+##    file - cache file name
+##    firstMs - milliseconds until the eye first showed on the displays
+##              given to loadEye() (the first band when decoding)
+cacheReport = { "hit": False, "ms": 0, "file": None, "firstMs": 0 }
+
+## Rows decoded per band by extractEyeRows()
+EYE_BAND_ROWS = 8
+
 # extractEye( eyeBitmapFile )
 #
 # Generates a bytearray from a Python file containing the eye bitmap data.
@@ -20,8 +48,12 @@
 # BITMAP  - list of integers representing the bitmap pixel data
 #           The data in the BITMAP list is packed according to the BPP value.
 #
-# Returns a bytearray containing the pixel data in RGB565 format.
-def extractEye( eyeBitmapFile ):
+# The buffer is owner's block of the pixel arena (see pixelArena.get);
+# owner defaults to the name of the bitmap module, so extracting the same
+# module again decodes into the same memory.
+#
+# Returns a buffer containing the pixel data in RGB565 format.
+def extractEye( eyeBitmapFile, owner=None ):
     width   = eyeBitmapFile.WIDTH
     height  = eyeBitmapFile.HEIGHT
     palette = eyeBitmapFile.PALETTE
@@ -36,7 +68,9 @@ def extractEye( eyeBitmapFile ):
     # Create an empty buffer for the full pixel color data so that we don't
     # have to keep appending to the bytearray (which is slow)
     bufferSize = width * height * 2  # 2 bytes per pixel for RGB565
-    buffer = bytearray( bufferSize )
+    if ( owner is None ):
+        owner = eyeBitmapFile.__name__
+    buffer = pixelArena.get( owner, bufferSize )
 
     # Extract bpp bits from Bitmap to get the color index for each pixel,
     # element in buffer. The color index is then used to look up the RGB
@@ -104,3 +138,229 @@ def extractEye( eyeBitmapFile ):
     # end of extractEye()
 
 
+
+
+# extractIndices( eyeBitmapFile )
+#
+# Decodes the BITMAP of an eye bitmap module into one palette index per
+# pixel, without looking the colors up in the PALETTE.  The module is
+# expected to contain the same variables as for extractEye().
+#
+# Bits are pulled from the BITMAP into an integer accumulator a whole byte
+# at a time, so each pixel costs one shift and one mask instead of a walk
+# over the individual bits.
+#
+# Returns a bytearray of WIDTH * HEIGHT color indices, row by row.
+def extractIndices( eyeBitmapFile ):
+    width   = eyeBitmapFile.WIDTH
+    height  = eyeBitmapFile.HEIGHT
+    colors  = eyeBitmapFile.COLORS
+    bpp     = eyeBitmapFile.BPP
+    bitmap  = eyeBitmapFile.BITMAP
+
+    pixels  = width * height
+    indices = bytearray( pixels )
+    mask    = (1 << bpp) - 1
+
+    accumulator = 0   # Bits read from the bitmap but not yet used
+    accBits     = 0   # Number of valid bits in the accumulator
+    bitMapIndex = 0   # Index into the bitmap list
+
+    for pixel in range( pixels ):
+        # Top up the accumulator until it holds a full color index
+        while ( accBits < bpp ):
+            accumulator = ( (accumulator << 8) | bitmap[ bitMapIndex ] ) & 0xFFFF
+            bitMapIndex += 1
+            accBits     += 8
+
+        accBits   -= bpp
+        colorIndex = ( accumulator >> accBits ) & mask
+
+        if ( colorIndex >= colors ):
+            # Error - color index out of range
+            msg = "Error: Color index {} out of range (max {}). Bitmap[{}], Pixel[{}]".format(
+                colorIndex, colors-1, bitMapIndex, pixel )
+            raise ValueError( msg )
+
+        indices[ pixel ] = colorIndex
+
+    return indices
+    # end of extractIndices()
+
+
+# extractEyeRows( eyeBitmapFile, owner=None, bandRows=EYE_BAND_ROWS )
+#
+# Generator form of extractEye(): decodes the bitmap into the same arena
+# buffer bandRows rows at a time, with decodePixels(), and yields
+# ( row, rows, pixels ) after each band, pixels being the band's rows in
+# the buffer.  A band can be sent to a display while the rest of the eye is
+# still being decoded; once the generator is exhausted the buffer holds the
+# whole eye, as extractEye() returns it.  A color index past COLORS raises
+# IndexError.
+def extractEyeRows( eyeBitmapFile, owner=None, bandRows=EYE_BAND_ROWS ):
+    width     = eyeBitmapFile.WIDTH
+    height    = eyeBitmapFile.HEIGHT
+    bpp       = eyeBitmapFile.BPP
+    bitmap    = eyeBitmapFile.BITMAP
+    high, low = paletteBytes( eyeBitmapFile.PALETTE[ 0 : eyeBitmapFile.COLORS ] )
+
+    if ( owner is None ):
+        owner = eyeBitmapFile.__name__
+    buffer = pixelArena.get( owner, width * height * 2 )
+
+    row = 0
+    while ( row < height ):
+        rows  = min( bandRows, height - row )
+        start = row * width * 2
+        decodePixels( bitmap, bpp, row * width * bpp, rows * width, high, low, buffer, start )
+        yield row, rows, buffer[ start : start + rows * width * 2 ]
+        row += rows
+    # end of extractEyeRows()
+
+
+# eyePixels( eyeBitmapFile, owner, start )
+#
+# The band pixels of extractEyeRows() alone, as GC9A01.blit_rows() takes
+# them.  Sets cacheReport["firstMs"], from ticks_ms() start, once the
+# first band has been taken.
+def eyePixels( eyeBitmapFile, owner, start ):
+    for row, rows, pixels in extractEyeRows( eyeBitmapFile, owner ):
+        yield pixels
+        if ( row == 0 ):
+            cacheReport["firstMs"] = ticks_diff( ticks_ms(), start )
+    # end of eyePixels()
+
+
+# halveEye( buffer, width, height )
+#
+# Builds a half resolution copy of an RGB565 buffer (as returned by
+# extractEye) by averaging every 2x2 block of pixels.  Odd widths and
+# heights are rounded up, the last column / row averaging with itself.
+#
+# The result is drawn at full size with GC9A01.blit_scaled( ..., scale=2 )
+# and takes a quarter of the memory of the original.
+#
+# When owner is given the result is owner's block of the pixel arena.
+#
+# Returns a buffer of ceil(width/2) x ceil(height/2) RGB565 pixels.
+def halveEye( buffer, width, height, owner=None ):
+    halfWidth  = ( width  + 1 ) // 2
+    halfHeight = ( height + 1 ) // 2
+    if ( owner is None ):
+        half = bytearray( halfWidth * halfHeight * 2 )
+    else:
+        half = pixelArena.get( owner, halfWidth * halfHeight * 2 )
+
+    outIndex = 0
+    for row in range( 0, height, 2 ):
+        nextRow = row + 1 if ( row + 1 < height ) else row
+        for column in range( 0, width, 2 ):
+            nextColumn = column + 1 if ( column + 1 < width ) else column
+            red = green = blue = 0
+            for offset in ( (row * width + column) * 2,     (row * width + nextColumn) * 2,
+                            (nextRow * width + column) * 2, (nextRow * width + nextColumn) * 2 ):
+                # Buffer pixels are stored high byte first
+                color  = ( buffer[ offset ] << 8 ) | buffer[ offset + 1 ]
+                red   += color >> 11
+                green += ( color >> 5 ) & 0x3F
+                blue  += color & 0x1F
+            color = ( (red >> 2) << 11 ) | ( (green >> 2) << 5 ) | ( blue >> 2 )
+            half[ outIndex ]     = color >> 8
+            half[ outIndex + 1 ] = color & 0xFF
+            outIndex += 2
+
+    return half
+    # end of halveEye()
+
+
+# assetHash( eyeBitmapFile )
+#
+# CRC32 over everything that determines the decoded pixels of an eye
+# bitmap module: WIDTH, HEIGHT, BPP, PALETTE and BITMAP.
+def assetHash( eyeBitmapFile ):
+    header = struct.pack( "<HHH", eyeBitmapFile.WIDTH, eyeBitmapFile.HEIGHT, eyeBitmapFile.BPP )
+    crc    = binascii.crc32( header )
+    for color in eyeBitmapFile.PALETTE:
+        crc = binascii.crc32( struct.pack( "<H", color ), crc )
+    return binascii.crc32( eyeBitmapFile.BITMAP, crc ) & 0xFFFFFFFF
+
+
+# loadEye( eyeBitmapFile, cacheDir=CACHE_DIR )
+#
+# Same result as extractEye(), but the decoded buffer is kept in a file on
+# the flash filesystem.  The first boot decodes and writes the file, later
+# boots read it back with a single readinto().  The file starts with a
+# hash of the module's WIDTH/HEIGHT/BPP/PALETTE/BITMAP, so a changed asset
+# is decoded again and its file rewritten automatically.
+#
+# If the filesystem cannot be written the decoded buffer is still returned.
+# cacheReport is updated with the hit / miss and the load time.
+#
+# The buffer is owner's block of the pixel arena, as for extractEye().
+#
+# The eye is also drawn in the center of each of displays.  When it has to
+# be decoded it is streamed to the first display with GC9A01.blit_rows()
+# and extractEyeRows(), so it starts to appear after the first band instead
+# of after the whole bitmap; the other displays get the decoded buffer.
+#
+# Returns a buffer containing the pixel data in RGB565 format.
+def loadEye( eyeBitmapFile, cacheDir=CACHE_DIR, owner=None, displays=() ):
+    start     = ticks_ms()
+    width     = eyeBitmapFile.WIDTH
+    height    = eyeBitmapFile.HEIGHT
+    checksum  = assetHash( eyeBitmapFile )
+    fileName  = "{}/{}.565".format( cacheDir, eyeBitmapFile.__name__ )
+    header    = struct.pack( _CACHE_HEADER, _CACHE_MAGIC, checksum, width, height )
+
+    cacheReport["file"] = fileName
+    if ( owner is None ):
+        owner = eyeBitmapFile.__name__
+    buffer = pixelArena.get( owner, width * height * 2 )
+
+    try:
+        with open( fileName, "rb" ) as f:
+            if ( f.read( len( header ) ) == header and f.readinto( buffer ) == len( buffer ) ):
+                for display in displays:
+                    display.blit_buffer( buffer, ( display.width - width ) // 2,
+                                         ( display.height - height ) // 2, width, height )
+                cacheReport["hit"]     = True
+                cacheReport["ms"]      = ticks_diff( ticks_ms(), start )
+                cacheReport["firstMs"] = cacheReport["ms"]
+                return buffer
+    except OSError:
+        # No cache file yet
+        pass
+
+    # Decode band by band, each band going out to the first display as
+    # soon as it is ready; blit_rows stops at the bottom of the panel, so
+    # whatever it left is decoded after it
+    bands = eyePixels( eyeBitmapFile, owner, start )
+    for i in range( len( displays ) ):
+        display = displays[ i ]
+        x       = ( display.width  - width )  // 2
+        y       = ( display.height - height ) // 2
+        if ( i == 0 ):
+            display.blit_rows( bands, x, y, width, height )
+            for pixels in bands:
+                pass
+        else:
+            display.blit_buffer( buffer, x, y, width, height )
+    for pixels in bands:
+        pass
+
+    try:
+        try:
+            os.mkdir( cacheDir )
+        except OSError:
+            # Directory already exists
+            pass
+        with open( fileName, "wb" ) as f:
+            f.write( header )
+            f.write( buffer )
+    except OSError as e:
+        print("Unable to write eye cache file {}: {}".format( fileName, e ))
+
+    cacheReport["hit"] = False
+    cacheReport["ms"]  = ticks_diff( ticks_ms(), start )
+    return buffer
+    # end of loadEye()
@@ -0,0 +1,139 @@
+##
+# LRUCache Class
+#
+# Small least-recently-used cache for decoded / rendered eye images.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeCache.py
+
+    Module: Least-recently-used cache with hit / miss / eviction counters.
+"""
+
+##
+## Class LRUCache
+##
+class LRUCache:
+    '''
+    Maps keys to values and keeps at most maxEntries of them and, when
+    maxBytes is given, at most maxBytes of values as measured by
+    sizeOf( value ) (len() by default).  When a new entry does not fit,
+    the least recently used entries are evicted.
+
+    Entries can be pinned while they are in use; pinned entries are never
+    evicted, so the cache may go over budget if everything is pinned.
+
+    MicroPython's OrderedDict cannot move an existing key to the end, so
+    the use order is kept in a plain list, oldest first.  The caches used
+    here only ever hold a handful of entries so the list search is cheap.
+    '''
+
+    def __init__( self, maxEntries=4, maxBytes=None, sizeOf=len, onEvict=None ):
+        self.maxEntries = maxEntries
+        self.maxBytes   = maxBytes
+        self.sizeOf     = sizeOf
+        self.onEvict    = onEvict    # Called as onEvict( key, value ) on eviction
+        self.entries    = {}
+        self.sizes      = {}
+        self.order      = []
+        self.pins       = {}
+        self.bytes      = 0
+
+        self.hits       = 0
+        self.misses     = 0
+        self.evictions  = 0
+
+    def __len__( self ):
+        return len( self.entries )
+
+    def __contains__( self, key ):
+        return key in self.entries
+
+    def get( self, key, default=None ):
+        # Look up key, counting a hit or a miss and marking it most recently used
+        if ( key in self.entries ):
+            self.hits += 1
+            self.touch( key )
+            return self.entries[ key ]
+        self.misses += 1
+        return default
+
+    def touch( self, key ):
+        # Mark key as the most recently used entry
+        if ( self.order[-1] != key ):
+            self.order.remove( key )
+            self.order.append( key )
+
+    def put( self, key, value ):
+        # Insert or replace key, evicting the oldest entries if needed
+        self.remove( key )
+        size = self.sizeOf( value )
+
+        while ( not self.fits( size ) ):
+            if ( self.evict() is None ):
+                break
+
+        self.entries[ key ] = value
+        self.sizes[ key ]   = size
+        self.bytes         += size
+        self.order.append( key )
+
+    def fits( self, size ):
+        # True if one more entry of size bytes fits without evicting
+        if ( len( self.order ) >= self.maxEntries ):
+            return False
+        return self.maxBytes is None or ( self.bytes + size ) <= self.maxBytes
+
+    def evict( self ):
+        # Drop the least recently used unpinned entry and return its key,
+        # or None if there is nothing that can be evicted
+        for key in self.order:
+            if ( not self.pins.get( key, 0 ) ):
+                value = self.entries[ key ]
+                self.remove( key )
+                self.evictions += 1
+                if ( self.onEvict is not None ):
+                    self.onEvict( key, value )
+                return key
+        return None
+
+    def pin( self, key ):
+        # Protect key from eviction (pins are counted)
+        self.pins[ key ] = self.pins.get( key, 0 ) + 1
+
+    def unpin( self, key ):
+        count = self.pins.get( key, 0 ) - 1
+        if ( count > 0 ):
+            self.pins[ key ] = count
+        elif ( key in self.pins ):
+            del self.pins[ key ]
+
+    def remove( self, key ):
+        if ( key in self.entries ):
+            del self.entries[ key ]
+            self.bytes -= self.sizes.pop( key )
+            self.order.remove( key )
+
+    def clear( self ):
+        self.entries = {}
+        self.sizes   = {}
+        self.order   = []
+        self.pins    = {}
+        self.bytes   = 0
+
+    def getOrCreate( self, key, create ):
+        # Return the cached value for key, calling create( key ) on a miss
+        value = self.get( key )
+        if ( value is None ):
+            value = create( key )
+            self.put( key, value )
+        return value
+
+    def stats( self ):
+        return { "hits":      self.hits,
+                 "misses":    self.misses,
+                 "evictions": self.evictions,
+                 "entries":   len( self.entries ),
+                 "bytes":     self.bytes }
@@ -0,0 +1,372 @@
+##
+# CompositeSprite Class
+#
+# Draws an eye image over a textured background (eyeSclera) so that its
+# transparent corners show the background instead of a white square, with
+# optional soft edges blended through lookup tables.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeComposite.py
+
+    Module: Color-key and alpha compositing of an eye image over a background.
+
+    The image is described once, at setup, as runs of pixels per row: fully
+    transparent (the key color connected to the image border), fully opaque,
+    or partly transparent at an alpha level of 1, 2 or 4 bits.  Drawing
+    composes a few rows at a time into a block buffer, background first,
+    and streams each block to the panel in one window.  With a cache the
+    whole sprite is composed into its own buffer instead and kept: drawing
+    again at the same position (a redraw, a lid opening over the eye) only
+    sends it.
+
+    Blending uses per-level channel tables: a 5 or 6 bit channel value times
+    level / ( levels - 1 ) is one table lookup, so a blended pixel is four
+    lookups per channel pair instead of multiplications and divisions.
+"""
+
+from array import array
+
+import pixelArena
+
+## Pixels composed per blit; the block buffer is twice this many bytes
+BLOCK_PIXELS = 1024
+
+## Blend tables per alpha bit depth, built on first use
+_blendTables = {}
+
+# blendTables( bits )
+#
+# Returns ( scale5, scale6 ) bytearrays for 2 ** bits alpha levels, where
+# scale5[ level * 32 + v ] is v * level / top for a 5 bit channel value v
+# and scale6[ level * 64 + v ] the same for a 6 bit value, top being the
+# highest level.  Both are rounded down so two terms never overflow.
+def blendTables( bits ):
+    tables = _blendTables.get( bits )
+    if ( tables is not None ):
+        return tables
+    top    = ( 1 << bits ) - 1
+    scale5 = bytearray( ( top + 1 ) * 32 )
+    scale6 = bytearray( ( top + 1 ) * 64 )
+    for level in range( top + 1 ):
+        for value in range( 32 ):
+            scale5[ level * 32 + value ] = ( value * level ) // top
+        for value in range( 64 ):
+            scale6[ level * 64 + value ] = ( value * level ) // top
+    tables = ( scale5, scale6 )
+    _blendTables[ bits ] = tables
+    return tables
+
+# keyMask( buffer, width, height, key=0xFFFF, border=True )
+#
+# Returns a bytearray with 1 for every transparent pixel of an RGB565
+# buffer (high byte first).  A pixel is transparent when it has the key
+# color and, with border, is connected to the image border through other
+# key pixels, so white highlights inside the iris stay opaque.
+def keyMask( buffer, width, height, key=0xFFFF, border=True ):
+    high = key >> 8
+    low  = key & 0xFF
+    mask = bytearray( width * height )
+
+    def isKey( pixel ):
+        return buffer[ pixel * 2 ] == high and buffer[ pixel * 2 + 1 ] == low
+
+    if ( not border ):
+        for pixel in range( width * height ):
+            if ( isKey( pixel ) ):
+                mask[ pixel ] = 1
+        return mask
+
+    # Flood fill from every key pixel on the border
+    stack = []
+    for column in range( width ):
+        stack.append( column )
+        stack.append( ( height - 1 ) * width + column )
+    for row in range( height ):
+        stack.append( row * width )
+        stack.append( row * width + width - 1 )
+    while ( stack ):
+        pixel = stack.pop()
+        if ( mask[ pixel ] or not isKey( pixel ) ):
+            continue
+        mask[ pixel ] = 1
+        row    = pixel // width
+        column = pixel - row * width
+        if ( column > 0 ):
+            stack.append( pixel - 1 )
+        if ( column < width - 1 ):
+            stack.append( pixel + 1 )
+        if ( row > 0 ):
+            stack.append( pixel - width )
+        if ( row < height - 1 ):
+            stack.append( pixel + width )
+    return mask
+
+
+# compositeBytes( width, height, cache=None )
+#
+# Bytes of pixel arena a CompositeSprite of a width x height image takes,
+# for sizing pixelArena.init(): its kept sprite with a cache owner, else
+# the block buffer (owner "composite") that every uncached one shares.
+def compositeBytes( width, height, cache=None ):
+    if ( cache is None ):
+        return BLOCK_PIXELS * 2
+    return ( width * height * 2 + pixelArena.ALIGN - 1 ) & ~( pixelArena.ALIGN - 1 )
+
+
+##
+## Class CompositeSprite
+##
+class CompositeSprite:
+    '''
+    An RGB565 image (high byte first) with transparency, drawn over an
+    eyeSclera.ScleraBackground.
+
+    runs     - unsigned short array of [first, count, level] triples, the
+               runs of every row one after the other; level 0 is fully
+               transparent and top (2 ** alphaBits - 1) fully opaque
+    rowRuns  - index into runs of the first run of each row (height + 1)
+
+    With alphaBits of 1 the key mask is used as is.  With 2 or 4 bits the
+    opaque pixels along the edge get the level of the share of opaque
+    pixels around them (3 x 3), which softens the outline of the iris.
+
+    cache is the pixelArena owner name of a width x height sprite buffer,
+    or None to compose through the small block buffer every time.  The
+    cached sprite is for one position, display mirroring, sclera, image
+    and variant (see compose()); eyes on mirrored and unmirrored panels
+    each need their own CompositeSprite to keep it.  variant tells apart
+    the contents of one image buffer that is rewritten in place, such as
+    PupilDilation.fullImage() for each pupil level.
+    '''
+
+    def __init__( self, buffer, width, height, key=0xFFFF, alphaBits=1, border=True, cache=None ):
+        if ( alphaBits not in ( 1, 2, 4 ) ):
+            raise ValueError( "alphaBits must be 1, 2 or 4" )
+        self.buffer    = buffer
+        self.width     = width
+        self.height    = height
+        self.alphaBits = alphaBits
+        self.top       = ( 1 << alphaBits ) - 1
+        self.scale5, self.scale6 = blendTables( alphaBits )
+        self.block     = None
+        self.views     = {}
+        self.imageView = None
+        self.viewOf    = None
+
+        # Composed sprite and what it was composed for
+        self.cache         = cache
+        self.sprite        = None
+        self.spriteX       = 0
+        self.spriteY       = 0
+        self.spriteFlip    = False
+        self.spriteBack    = None
+        self.spriteImage   = None
+        self.spriteVariant = None
+
+        self.buildRuns( keyMask( buffer, width, height, key, border ) )
+
+    def level( self, mask, row, column ):
+        # Alpha level of an opaque pixel from the opaque share of its 3 x 3
+        # neighbourhood (pixels off the image count as transparent)
+        top = self.top
+        if ( top == 1 ):
+            return top
+        opaque = 0
+        for y in range( row - 1, row + 2 ):
+            for x in range( column - 1, column + 2 ):
+                if ( 0 <= x < self.width and 0 <= y < self.height and not mask[ y * self.width + x ] ):
+                    opaque += 1
+        return max( 1, ( opaque * top ) // 9 )
+
+    def buildRuns( self, mask ):
+        runs    = array('H')
+        rowRuns = array('H')
+        width   = self.width
+        for row in range( self.height ):
+            rowRuns.append( len( runs ) )
+            column = 0
+            while ( column < width ):
+                if ( mask[ row * width + column ] ):
+                    level = 0
+                else:
+                    level = self.level( mask, row, column )
+                first = column
+                column += 1
+                while ( column < width ):
+                    if ( mask[ row * width + column ] ):
+                        nextLevel = 0
+                    else:
+                        nextLevel = self.level( mask, row, column )
+                    if ( nextLevel != level ):
+                        break
+                    column += 1
+                runs.append( first )
+                runs.append( column - first )
+                runs.append( level )
+        rowRuns.append( len( runs ) )
+        self.runs    = runs
+        self.rowRuns = rowRuns
+
+    def blockView( self, pixels ):
+        # One view per size, kept, so drawing does not allocate
+        view = self.views.get( pixels )
+        if ( view is None ):
+            view = self.block[ 0 : pixels * 2 ]
+            self.views[ pixels ] = view
+        return view
+
+    def invalidate( self ):
+        # Forget the cached sprite, e.g. after the sclera was redrawn in place
+        self.spriteImage = None
+
+    def cached( self, display, x, y, sclera, image, variant=None ):
+        # True if the cached sprite shows variant of image at (x, y) over sclera
+        return ( self.sprite is not None and self.spriteImage is image and
+                 self.spriteVariant == variant and
+                 self.spriteX == x and self.spriteY == y and
+                 self.spriteFlip == display.mirror and self.spriteBack is sclera )
+
+    def compose( self, display, x, y, sclera, image=None, variant=None ):
+        # Return the cached sprite composed for variant of image at (x, y)
+        # over sclera, composing it first if it was made for anything else.
+        # Only the rows and columns on the panel are composed; the buffer
+        # has the layout of the image (width x height).
+        if ( image is None ):
+            image = self.buffer
+        if ( self.cached( display, x, y, sclera, image, variant ) ):
+            return self.sprite
+        if ( self.sprite is None ):
+            # Rows are composed straight into the sprite, which takes the
+            # place of the block buffer
+            self.sprite = pixelArena.get( self.cache, self.width * self.height * 2 )
+            self.block  = self.sprite
+
+        width = self.width
+        x0    = max( x, 0 )
+        y0    = max( y, 0 )
+        x1    = min( x + width, display.width )
+        y1    = min( y + self.height, display.height )
+        if ( x0 < x1 and y0 < y1 ):
+            first      = display._first_column( x, width, x0, x1 )
+            last       = first + x1 - x0
+            background = ( sclera.size - x - width ) if display.mirror else x
+            source     = self.imageOf( image )
+            for row in range( y0, y1 ):
+                self.composeRow( source, row - y, first, last,
+                                 row * sclera.size + background, sclera,
+                                 ( ( row - y ) * width + first ) * 2 )
+
+        self.spriteX       = x
+        self.spriteY       = y
+        self.spriteFlip    = display.mirror
+        self.spriteBack    = sclera
+        self.spriteImage   = image
+        self.spriteVariant = variant
+        return self.sprite
+
+    def imageOf( self, image ):
+        # A memoryview of image, kept while the same image is drawn, so that
+        # slicing opaque runs out of it does not copy them
+        if ( self.viewOf is not image ):
+            self.imageView = memoryview( image )
+            self.viewOf    = image
+        return self.imageView
+
+    def draw( self, display, x, y, sclera, image=None, variant=None ):
+        # Compose the image at (x, y) over sclera and send the part on the panel.
+        # image is a variant of the buffer with the same outline (such as
+        # one with a dilated pupil) to take the opaque pixels from instead;
+        # variant tells apart contents of image for the cached sprite.
+        if ( image is None ):
+            image = self.buffer
+        if ( self.cache is not None ):
+            display.blit_buffer( self.compose( display, x, y, sclera, image, variant ),
+                                 x, y, self.width, self.height )
+            return
+
+        width  = self.width
+        x0     = max( x, 0 )
+        y0     = max( y, 0 )
+        x1     = min( x + width, display.width )
+        y1     = min( y + self.height, display.height )
+        if ( x0 >= x1 or y0 >= y1 ):
+            return
+
+        if ( self.block is None ):
+            self.block = pixelArena.get( "composite", BLOCK_PIXELS * 2 )
+        source = self.imageOf( image )
+
+        # Image columns first to last - 1 are visible; on a mirrored display
+        # they are taken from the other side, and so is the background
+        visible = x1 - x0
+        first   = display._first_column( x, width, x0, x1 )
+        last    = first + visible
+        if ( display.mirror ):
+            background = sclera.size - x - width
+        else:
+            background = x
+
+        perBlit = max( 1, BLOCK_PIXELS // visible )
+        row     = y0
+        while ( row < y1 ):
+            rows = min( perBlit, y1 - row )
+            for line in range( rows ):
+                self.composeRow( source, row + line - y, first, last,
+                                 ( row + line ) * sclera.size + background, sclera,
+                                 line * visible * 2 )
+            display.blit_buffer( self.blockView( visible * rows ), x0, row, visible, rows )
+            row += rows
+
+    def composeRow( self, buffer, imageRow, first, last, bgBase, sclera, out ):
+        # Compose image columns first to last - 1 of imageRow of buffer into
+        # the block at byte offset out.  Image column c lies on background
+        # pixel bgBase + c.
+        block   = self.block
+        runs    = self.runs
+        top     = self.top
+        scale5  = self.scale5
+        scale6  = self.scale6
+        indices = sclera.indices
+        high    = sclera.high
+        low     = sclera.low
+        source  = imageRow * self.width
+
+        for run in range( self.rowRuns[ imageRow ], self.rowRuns[ imageRow + 1 ], 3 ):
+            start = max( runs[ run ], first )
+            end   = min( runs[ run ] + runs[ run + 1 ], last )
+            if ( start >= end ):
+                continue
+            level = runs[ run + 2 ]
+            pos   = out + ( start - first ) * 2
+
+            if ( level == top ):
+                # Opaque: copy the image pixels
+                block[ pos : pos + ( end - start ) * 2 ] = buffer[ ( source + start ) * 2 : ( source + end ) * 2 ]
+                continue
+
+            for column in range( start, end ):
+                bgPixel = bgBase + column
+                packed  = indices[ bgPixel >> 1 ]
+                index   = ( packed & 0x0F ) if ( bgPixel & 1 ) else ( packed >> 4 )
+                if ( level == 0 ):
+                    # Transparent: background only
+                    block[ pos ]     = high[ index ]
+                    block[ pos + 1 ] = low[ index ]
+                else:
+                    # Partly transparent: blend channel by channel
+                    bh = high[ index ]
+                    bl = low[ index ]
+                    pixel = ( source + column ) * 2
+                    fh = buffer[ pixel ]
+                    fl = buffer[ pixel + 1 ]
+                    rest  = top - level
+                    red   = scale5[ level * 32 + ( fh >> 3 ) ] + scale5[ rest * 32 + ( bh >> 3 ) ]
+                    green = ( scale6[ level * 64 + ( ( ( fh & 7 ) << 3 ) | ( fl >> 5 ) ) ] +
+                              scale6[ rest * 64 + ( ( ( bh & 7 ) << 3 ) | ( bl >> 5 ) ) ] )
+                    blue  = scale5[ level * 32 + ( fl & 31 ) ] + scale5[ rest * 32 + ( bl & 31 ) ]
+                    block[ pos ]     = ( red << 3 ) | ( green >> 3 )
+                    block[ pos + 1 ] = ( ( green & 7 ) << 5 ) | blue
+                pos += 2
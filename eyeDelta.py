@@ -0,0 +1,122 @@
+##
+# SpanDelta Class
+#
+# Compact description of how a variant of an eye image differs from its
+# base image, stored as one horizontal span of pixels per changed row.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeDelta.py
+
+    Module: Row span deltas between RGB565 eye image buffers.
+"""
+
+from array import array
+
+##
+## Class SpanDelta
+##
+class SpanDelta:
+    '''
+    Differences between a variant image and a base image of the same size.
+
+    spans - unsigned short array of [row, firstColumn, pixelCount] triples
+    data  - bytearray holding the RGB565 pixels of all spans back to back
+    box   - (x0, y0, x1, y1) bounding box of all spans, end exclusive,
+            or None when the variant is identical to the base
+    '''
+
+    def __init__( self, width, height ):
+        self.width  = width
+        self.height = height
+        self.spans  = array('H')
+        self.data   = bytearray()
+        self.box    = None
+
+    def __len__( self ):
+        # Number of bytes used by the delta pixel data
+        return len( self.data )
+
+    def addSpan( self, row, first, pixels ):
+        count = len( pixels ) // 2
+        self.spans.append( row )
+        self.spans.append( first )
+        self.spans.append( count )
+        self.data.extend( pixels )
+
+        if ( self.box is None ):
+            self.box = ( first, row, first + count, row + 1 )
+        else:
+            x0, y0, x1, y1 = self.box
+            self.box = ( min( x0, first ), min( y0, row ),
+                         max( x1, first + count ), max( y1, row + 1 ) )
+
+    def applyTo( self, target, x0=0, y0=0, width=None ):
+        # Copy the span pixels into target, an RGB565 buffer whose top left
+        # corner is at (x0, y0) in image coordinates and which is width
+        # pixels wide (defaults to the full image width).
+        if ( width is None ):
+            width = self.width
+        spans  = self.spans
+        data   = memoryview( self.data )
+        offset = 0
+        for i in range( 0, len( spans ), 3 ):
+            count = spans[ i + 2 ]
+            start = ( (spans[ i ] - y0) * width + spans[ i + 1 ] - x0 ) * 2
+            target[ start : start + count * 2 ] = data[ offset : offset + count * 2 ]
+            offset += count * 2
+
+
+# makeDelta( base, variant, width, height, box=None )
+#
+# Compares a variant against an RGB565 base image that is width x height
+# pixels.  The variant holds only the pixels of box (x0, y0, x1, y1), row
+# by row; when no box is given it is the full image.  For every row that
+# differs, the span from the first to the last changed pixel is recorded.
+#
+# Returns a SpanDelta.
+def makeDelta( base, variant, width, height, box=None ):
+    if ( box is None ):
+        box = ( 0, 0, width, height )
+    x0, y0, x1, y1 = box
+    boxWidth = x1 - x0
+
+    delta = SpanDelta( width, height )
+    for row in range( y0, y1 ):
+        baseStart    = ( row * width + x0 ) * 2
+        variantStart = ( row - y0 ) * boxWidth * 2
+        first        = -1
+        last         = -1
+        for column in range( boxWidth ):
+            b = baseStart    + column * 2
+            v = variantStart + column * 2
+            if ( base[ b ] != variant[ v ] or base[ b + 1 ] != variant[ v + 1 ] ):
+                if ( first < 0 ):
+                    first = column
+                last = column
+        if ( first >= 0 ):
+            delta.addSpan( row, x0 + first,
+                           variant[ variantStart + first * 2 : variantStart + (last + 1) * 2 ] )
+    return delta
+
+
+# copyRegion( buffer, width, box, target=None )
+#
+# Copies the box (x0, y0, x1, y1) out of an RGB565 image buffer that is
+# width pixels wide into a buffer of its own, row by row.
+#
+# Returns the region buffer (target if one was given).
+def copyRegion( buffer, width, box, target=None ):
+    x0, y0, x1, y1 = box
+    rowBytes = ( x1 - x0 ) * 2
+    if ( target is None ):
+        target = bytearray( rowBytes * (y1 - y0) )
+    source = memoryview( buffer )
+    offset = 0
+    for row in range( y0, y1 ):
+        start = ( row * width + x0 ) * 2
+        target[ offset : offset + rowBytes ] = source[ start : start + rowBytes ]
+        offset += rowBytes
+    return target
@@ -0,0 +1,223 @@
+##
+# FramePlayer Class
+#
+# Plays animations too long to keep in RAM by streaming their frames from
+# a file on the flash filesystem (or an SD card mounted on a second SPI
+# bus) band by band into the panel.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeFrames.py
+
+    Module: Streaming frame player with double-buffered readinto.
+
+    Each frame is sent with GC9A01.blit_rows: the window is set once and
+    the frame follows as bands of rows, the first with Write Memory (RAMWR)
+    and every later one with Write Memory Continue (0x3C).  Bands are read
+    with readinto() straight into the two band buffers blit_rows hands out
+    in turn, so a band is never read into the buffer whose write may still
+    be in progress, and memory stays at two bands however large the frames
+    are.  Frames may lie partly off the panel; only rows down to the last
+    one on the panel are read.
+
+    File format (see saveFrames), little endian:
+        'FRMS', width (H), height (H), frames (H), frameMs (H), bpp (H),
+        with bpp 8: 256 palette colors (H, normal RGB565),
+        then the frames: RGB565 high byte first (bpp 16) or one palette
+        index per pixel (bpp 8), row by row
+"""
+
+import ustruct as struct
+
+from utime import ticks_ms, ticks_diff, ticks_add
+
+import pixelArena
+
+from pixelDecode import decodePixels
+
+_FRAMES_MAGIC  = b'FRMS'
+_FRAMES_HEADER = "<4sHHHHH"
+
+## Colors in the palette of indexed (bpp 8) frame files
+FRAME_COLORS = 256
+
+## Pixels per band; each of the two band buffers is twice this many bytes
+BAND_PIXELS  = 2048
+
+# saveFrames( fileName, width, height, frameMs, frames, palette=None )
+#
+# Writes frames (buffers of width * height pixels) to a frame file.
+# Without palette the frames are RGB565, high byte first; with palette (up
+# to 256 normal RGB565 colors) they hold one palette index per pixel, which
+# halves the file and the bytes read per frame.
+def saveFrames( fileName, width, height, frameMs, frames, palette=None ):
+    bpp = 16 if palette is None else 8
+    with open( fileName, "wb" ) as f:
+        f.write( struct.pack( _FRAMES_HEADER, _FRAMES_MAGIC, width, height,
+                              len( frames ), frameMs, bpp ) )
+        if ( palette is not None ):
+            for i in range( FRAME_COLORS ):
+                f.write( struct.pack( "<H", palette[ i ] if i < len( palette ) else 0 ) )
+        for frame in frames:
+            f.write( frame )
+
+
+##
+## Class FramePlayer
+##
+class FramePlayer:
+    '''
+    Streams a frame file to display at (x, y); by default centered.
+
+    start( now )    - show the first frame at time now (ticks_ms)
+    update( now )   - show the frame due at time now; returns True if a
+                      frame was sent
+    close()         - close the file
+
+    The target rate is the file's frameMs, or fps (1 to 1000) when given.
+    The player keeps to the clock: frames whose time is already over when
+    update() is called are skipped without being read and counted in
+    dropped.  A frame that took longer than one frame time to read and
+    send, or that the file ended in the middle of, counts as one underrun:
+    the source cannot keep up at this rate and band size.
+    '''
+
+    def __init__( self, display, fileName, x=None, y=None, fps=None,
+                  loop=True, bandPixels=BAND_PIXELS ):
+        if ( fps is not None and not ( 1 <= fps <= 1000 ) ):
+            raise ValueError( "fps must be 1 to 1000, not {}".format( fps ) )
+        self.display  = display
+        self.file     = open( fileName, "rb" )
+        magic, width, height, count, frameMs, bpp = struct.unpack(
+            _FRAMES_HEADER, self.file.read( struct.calcsize( _FRAMES_HEADER ) ) )
+        if ( magic != _FRAMES_MAGIC or bpp not in ( 8, 16 ) ):
+            self.file.close()
+            raise ValueError( "Not a frame file: {}".format( fileName ) )
+        if ( frameMs == 0 and not fps ):
+            self.file.close()
+            raise ValueError( "Frame file has no frame time: {}".format( fileName ) )
+
+        self.width    = width
+        self.height   = height
+        self.count    = count
+        self.frameMs  = ( 1000 // fps ) if fps else frameMs
+        self.loop     = loop
+        self.indexed  = ( bpp == 8 )
+        self.x        = ( display.width  - width )  // 2 if x is None else x
+        self.y        = ( display.height - height ) // 2 if y is None else y
+
+        if ( self.indexed ):
+            palette   = struct.unpack( "<{}H".format( FRAME_COLORS ), self.file.read( 2 * FRAME_COLORS ) )
+            self.high = bytearray( FRAME_COLORS )
+            self.low  = bytearray( FRAME_COLORS )
+            for i in range( FRAME_COLORS ):
+                self.high[ i ] = palette[ i ] >> 8
+                self.low[ i ]  = palette[ i ] & 0xFF
+        self.dataStart  = self.file.tell()
+        self.frameBytes = width * height * ( bpp // 8 )
+
+        # Band buffers come from blit_rows; indexed frames need an index
+        # band too, with a view for the last (shorter) band made once here
+        bandRows      = max( 1, min( bandPixels // width, height ) )
+        lastRows      = height - ( ( height - 1 ) // bandRows ) * bandRows
+        self.bandRows = bandRows
+        self.filler   = self.fill     # Bound once, blit_rows calls it per band
+        self.complete = True
+        self.filled   = 0
+        if ( self.indexed ):
+            indices          = pixelArena.get( "frame indices", bandRows * width )
+            self.indicesFull = indices
+            self.indicesLast = indices[ 0 : lastRows * width ]
+
+        self.frame     = 0
+        self.position  = -1     # Frame the file is positioned at
+        self.due       = 0
+        self.running   = False
+        self.done      = False
+        self.shown     = 0
+        self.dropped   = 0
+        self.underruns = 0
+        self.worstMs   = 0      # Longest time taken by one frame
+
+    def start( self, now ):
+        self.frame     = 0
+        self.due       = now
+        self.running   = True
+        self.done      = False
+        self.shown     = 0
+        self.dropped   = 0
+        self.underruns = 0
+        self.worstMs   = 0
+        self.update( now )
+
+    def stop( self ):
+        self.running = False
+
+    def close( self ):
+        self.running = False
+        self.file.close()
+
+    def update( self, now ):
+        if ( not self.running ):
+            return False
+        late = ticks_diff( now, self.due )
+        if ( late < 0 ):
+            return False
+
+        # Frames whose time is already over are dropped unread
+        skip          = late // self.frameMs
+        self.dropped += skip
+        frame         = self.frame + skip
+        if ( frame >= self.count ):
+            if ( not self.loop ):
+                self.running = False
+                self.done    = True
+                return False
+            frame %= self.count
+
+        started  = ticks_ms()
+        complete = self.send( frame )
+        took     = ticks_diff( ticks_ms(), started )
+        self.worstMs = max( self.worstMs, took )
+        if ( not complete or took > self.frameMs ):
+            self.underruns += 1
+
+        self.shown += 1
+        self.frame  = frame + 1
+        self.due    = ticks_add( self.due, self.frameMs * ( skip + 1 ) )
+        return True
+
+    def send( self, frame ):
+        # Stream one frame in one window.  Returns False if the file ended
+        # before the frame did.
+        if ( frame != self.position ):
+            self.file.seek( self.dataStart + frame * self.frameBytes )
+        self.complete = True
+        self.filled   = 0
+        self.display.blit_rows( self.filler, self.x, self.y, self.width, self.height, self.bandRows )
+
+        # Rows below the panel are not read, leaving the file mid frame
+        if ( self.complete and self.filled == self.height ):
+            self.position = frame + 1
+        else:
+            self.position = -1
+        return self.complete
+
+    def fill( self, buffer, row, rows ):
+        # blit_rows source: read the next rows of the frame into buffer
+        self.filled += rows
+        if ( self.indexed ):
+            indices = self.indicesFull if rows == self.bandRows else self.indicesLast
+            if ( self.file.readinto( indices ) != len( indices ) ):
+                self.complete = False
+            decodePixels( indices, 8, 0, len( indices ), self.high, self.low, buffer )
+        elif ( self.file.readinto( buffer ) != len( buffer ) ):
+            self.complete = False
+
+    def stats( self ):
+        return { "shown":     self.shown,
+                 "dropped":   self.dropped,
+                 "underruns": self.underruns,
+                 "worstMs":   self.worstMs }
@@ -0,0 +1,179 @@
+##
+# GazePlanner Class
+#
+# Moves the eyes the way real eyes move: quick saccades from one point to
+# the next, fixations that hold still, and small micro-saccades while
+# fixating, instead of walking toward a target one pixel per frame.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeGaze.py
+
+    Module: Saccade / fixation / micro-saccade gaze planner.
+
+    A saccade is so fast that the eye is a blur, so it is drawn in the few
+    frames it lasts rather than as dozens of one pixel steps.  Each frame
+    draws at most one window per eye (see Eyeball.drawAt), and a whole
+    change of gaze costs two or three blits instead of one per pixel.
+"""
+
+from random import randint
+
+from utime import ticks_diff
+
+from eyeMotion import Motion, EASE_OUT
+
+## Planner states
+FIXATE  = 0
+SACCADE = 1
+
+## Default saccade speed in pixels per second: about 100 pixels in two
+## frames of 50 ms
+SACCADE_SPEED = 1200
+
+
+##
+## Class GazePlanner
+##
+class GazePlanner:
+    '''
+    Gaze of one or more Eyeballs that look at the same point.  eyes is a
+    list of Eyeballs or an eyeArray.EyeArray, which draws eyes in the same
+    state once for all of them.
+
+    lookAt( x, y, holdMs )  - queue a fixation point (top left of the
+                              eye image) held for holdMs milliseconds
+    update( now )           - advance to time now (ticks_ms) and draw
+
+    When the queue is empty and wander is True, the next point is picked
+    at random within the eyes' travel range.  Fixations last between
+    fixationMs[0] and fixationMs[1]; micro-saccades of up to microRange
+    pixels happen every microMs[0] to microMs[1] milliseconds while
+    fixating and are drawn in a single frame.
+    '''
+
+    def __init__( self, eyes, speed=SACCADE_SPEED, fixationMs=(400, 1500),
+                  microMs=(150, 500), microRange=2, wander=True ):
+        self.eyes       = eyes
+        self.group      = eyes if hasattr( eyes, "drawAt" ) else None
+        self.fixationMs = fixationMs
+        self.microMs    = microMs
+        self.microRange = microRange
+        self.wander     = wander
+        self.queue      = []
+
+        eye             = eyes[0]
+        self.motion     = Motion( eye.x, eye.y, speed, EASE_OUT )
+        self.state      = FIXATE
+        self.fixX       = eye.x
+        self.fixY       = eye.y
+        self.fixStart   = 0
+        self.fixMs      = 0
+        self.microStart = 0
+        self.microWait  = 0
+        self.targetX    = eye.x
+        self.targetY    = eye.y
+        self.holdMs     = 0
+        self.saccades   = 0
+        self.setLimits()
+
+    def lookAt( self, x, y, holdMs=None ):
+        # Queue a fixation point; holdMs of None picks a random duration
+        self.queue.append( ( x, y, holdMs ) )
+
+    def clear( self ):
+        # Forget queued points and stop where the eyes are now
+        eye           = self.eyes[0]
+        self.queue    = []
+        self.state    = FIXATE
+        self.fixX     = eye.x
+        self.fixY     = eye.y
+        self.fixMs    = 0
+        self.motion.jumpTo( eye.x, eye.y )
+        self.setLimits()
+
+    def setLimits( self ):
+        # Travel range of the top left corner, including overscan.  Call
+        # again after changing the eyes' image or overscan.
+        eye         = self.eyes[0]
+        self.left   = -eye.overscan
+        self.right  = eye.maxX - eye.width + eye.overscan
+        self.top    = -eye.overscan
+        self.bottom = eye.maxY - eye.height + eye.overscan
+
+    def update( self, now ):
+        if ( self.state == SACCADE ):
+            if ( self.motion.update( now ) ):
+                self.drawAt( self.motion.x, self.motion.y )
+            if ( not self.motion.moving ):
+                self.fixate( now )
+            return
+
+        if ( ticks_diff( now, self.fixStart ) >= self.fixMs ):
+            if ( self.nextTarget() ):
+                self.saccade( now )
+            else:
+                # Nothing queued: keep fixating
+                self.fixStart = now
+                self.fixMs    = self.fixationMs[0]
+            return
+
+        if ( self.microRange > 0 and ticks_diff( now, self.microStart ) >= self.microWait ):
+            self.microSaccade( now )
+
+    def nextTarget( self ):
+        # Load the next fixation point into targetX, targetY and holdMs.
+        # Returns False if there is none.
+        if ( self.queue ):
+            x, y, holdMs = self.queue.pop( 0 )
+        elif ( self.wander ):
+            x      = randint( self.left, self.right )
+            y      = randint( self.top, self.bottom )
+            holdMs = None
+        else:
+            return False
+
+        if ( holdMs is None ):
+            holdMs = randint( self.fixationMs[0], self.fixationMs[1] )
+        self.targetX = x
+        self.targetY = y
+        self.holdMs  = holdMs
+        return True
+
+    def saccade( self, now ):
+        # Start a fast eased move from where the eyes are to the target
+        eye = self.eyes[0]
+        self.motion.jumpTo( eye.x, eye.y )
+        self.motion.moveTo( self.targetX, self.targetY, now )
+        for eye in self.eyes:
+            eye.setDestination( self.targetX, self.targetY )
+        self.state     = SACCADE
+        self.saccades += 1
+
+    def fixate( self, now ):
+        self.state      = FIXATE
+        self.fixX       = self.targetX
+        self.fixY       = self.targetY
+        self.fixStart   = now
+        self.fixMs      = self.holdMs
+        self.microStart = now
+        self.microWait  = randint( self.microMs[0], self.microMs[1] )
+
+    def microSaccade( self, now ):
+        # Jump to a point near the fixation point in one frame, staying
+        # within the travel range
+        spread = self.microRange
+        x = min( max( self.fixX + randint( -spread, spread ), self.left ), self.right )
+        y = min( max( self.fixY + randint( -spread, spread ), self.top ), self.bottom )
+        self.drawAt( x, y )
+        self.microStart = now
+        self.microWait  = randint( self.microMs[0], self.microMs[1] )
+
+    def drawAt( self, x, y ):
+        if ( self.group is not None ):
+            self.group.drawAt( x, y )
+            return
+        for eye in self.eyes:
+            eye.drawAt( x, y )
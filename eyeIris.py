@@ -0,0 +1,242 @@
+##
+# Procedural Iris
+#
+# Renders an iris from a handful of parameters (ring radii and colors,
+# radial striations, limbal ring, pupil size and highlight) into the same
+# RGB565 buffer layout that extractEye() produces, so the result can be
+# handed straight to an Eyeball.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeIris.py
+
+    Module: On-device procedural iris generator with a cache of rendered designs.
+"""
+
+from utime    import ticks_ms, ticks_diff
+
+from eyeCache import LRUCache
+from eyeMath  import isqrt
+
+## Number of angle steps in a full circle used for striations
+ANGLE_STEPS = 256
+
+
+# blendColor( colorA, colorB, amount )
+#
+# Mixes two normal RGB565 colors, amount / 256 of colorB.
+def blendColor( colorA, colorB, amount ):
+    keep  = 256 - amount
+    red   = ( ((colorA >> 11) & 0x1F) * keep + ((colorB >> 11) & 0x1F) * amount ) >> 8
+    green = ( ((colorA >> 5)  & 0x3F) * keep + ((colorB >> 5)  & 0x3F) * amount ) >> 8
+    blue  = ( ( colorA        & 0x1F) * keep + ( colorB        & 0x1F) * amount ) >> 8
+    return ( red << 11 ) | ( green << 5 ) | blue
+
+# angleTable( radius )
+#
+# Builds a (radius + 1) x (radius + 1) table of the angle, in 1/ANGLE_STEPS
+# of a circle, of every first quadrant offset (dx, dy).  The other three
+# quadrants are found by mirroring, so no trigonometry is needed per pixel.
+def angleTable( radius ):
+    import math
+    size  = radius + 1
+    table = bytearray( size * size )
+    for dy in range( size ):
+        for dx in range( size ):
+            angle = math.atan2( dy, dx ) * ANGLE_STEPS / ( 2 * math.pi )
+            table[ dy * size + dx ] = int( angle ) % ANGLE_STEPS
+    return table
+
+
+##
+## Class IrisDesign
+##
+class IrisDesign:
+    '''
+    Parameters of a procedural iris.  All colors are normal RGB565 values
+    (see gc9a01py.color565), all sizes are in pixels.
+
+    size            - width and height of the rendered square image
+    irisRadius      - outer radius of the iris
+    pupilRadius     - radius of the pupil
+    innerColor      - iris color next to the pupil
+    outerColor      - iris color at the outer edge (colors are blended
+                      between innerColor and outerColor by radius)
+    pupilColor      - pupil color
+    limbalColor     - color of the dark ring around the iris
+    limbalWidth     - width of the limbal ring
+    striations      - number of radial striations around the iris
+    striationDepth  - how much striations darken the iris (0..256)
+    highlight       - radius of the specular highlight (0 for none)
+    highlightColor  - highlight color
+    background      - color of the corners outside the iris
+    '''
+
+    def __init__( self, size=115, irisRadius=56, pupilRadius=18,
+                  innerColor=0x8B5A, outerColor=0x4010, pupilColor=0x0000,
+                  limbalColor=0x2008, limbalWidth=4,
+                  striations=48, striationDepth=96,
+                  highlight=7, highlightColor=0xFFFF, background=0xFFFF ):
+        self.size           = size
+        self.irisRadius     = irisRadius
+        self.pupilRadius    = pupilRadius
+        self.innerColor     = innerColor
+        self.outerColor     = outerColor
+        self.pupilColor     = pupilColor
+        self.limbalColor    = limbalColor
+        self.limbalWidth    = limbalWidth
+        self.striations     = striations
+        self.striationDepth = striationDepth
+        self.highlight      = highlight
+        self.highlightColor = highlightColor
+        self.background     = background
+
+    def key( self ):
+        # Hashable value identifying the rendered image
+        return ( self.size, self.irisRadius, self.pupilRadius,
+                 self.innerColor, self.outerColor, self.pupilColor,
+                 self.limbalColor, self.limbalWidth,
+                 self.striations, self.striationDepth,
+                 self.highlight, self.highlightColor, self.background )
+
+
+# renderIris( design, buffer=None )
+#
+# Renders an IrisDesign into an RGB565 buffer (size * size * 2 bytes, high
+# byte first as extractEye() produces).  Every row is split into spans with
+# integer circle math: background, iris, pupil, iris, background.  The
+# background and pupil spans are copied from prebuilt rows, and iris pixels
+# come from two per radius color tables (plain and striated) chosen with
+# radius and angle lookup tables.
+#
+# Returns the buffer.
+def renderIris( design, buffer=None ):
+    size        = design.size
+    center      = size // 2
+    irisRadius  = design.irisRadius
+    pupilRadius = design.pupilRadius
+    rowBytes    = size * 2
+
+    if ( buffer is None ):
+        buffer = bytearray( size * rowBytes )
+
+    # Prebuilt solid rows for the background and pupil spans
+    backgroundRow = bytearray( [ design.background >> 8, design.background & 0xFF ] ) * size
+    pupilRow      = bytearray( [ design.pupilColor >> 8, design.pupilColor & 0xFF ] ) * size
+
+    # Per radius colors, plain and darkened for striations
+    ringColors = []
+    darkColors = []
+    limbalStart = irisRadius - design.limbalWidth
+    ringWidth   = max( 1, irisRadius - pupilRadius )
+    for radius in range( irisRadius + 1 ):
+        amount = ( max( 0, radius - pupilRadius ) << 8 ) // ringWidth
+        color  = blendColor( design.innerColor, design.outerColor, min( 256, amount ) )
+        if ( radius >= limbalStart and design.limbalWidth > 0 ):
+            edge  = ( ( radius - limbalStart + 1 ) << 8 ) // design.limbalWidth
+            color = blendColor( color, design.limbalColor, min( 256, edge ) )
+        ringColors.append( color )
+        darkColors.append( blendColor( color, 0x0000, design.striationDepth ) )
+
+    # Striation pattern by angle step
+    stripes = bytearray( ANGLE_STEPS )
+    for angle in range( ANGLE_STEPS ):
+        stripes[ angle ] = ( ( angle * design.striations * 2 ) // ANGLE_STEPS ) & 1
+
+    angles    = angleTable( irisRadius )
+    tableSize = irisRadius + 1
+    irisR2    = irisRadius  * irisRadius
+    pupilR2   = pupilRadius * pupilRadius
+    half      = ANGLE_STEPS // 2
+
+    # Radius of every squared distance inside the iris
+    radii = bytearray( irisR2 + 1 )
+    for d2 in range( irisR2 + 1 ):
+        radii[ d2 ] = isqrt( d2 )
+
+    for row in range( size ):
+        dy       = row - center
+        rowStart = row * rowBytes
+        buffer[ rowStart : rowStart + rowBytes ] = backgroundRow
+
+        if ( dy * dy > irisR2 ):
+            continue
+
+        # Span math: half widths of the iris and pupil circles on this row
+        irisHalf  = isqrt( irisR2 - dy * dy )
+        pupilHalf = isqrt( pupilR2 - dy * dy ) if ( dy * dy <= pupilR2 ) else -1
+        ady       = dy if dy >= 0 else -dy
+
+        for dx in range( -irisHalf, irisHalf + 1 ):
+            if ( -pupilHalf <= dx <= pupilHalf ):
+                continue
+            column = center + dx
+            if ( column < 0 or column >= size ):
+                continue
+
+            adx    = dx if dx >= 0 else -dx
+            radius = radii[ dx * dx + dy * dy ]
+            angle  = angles[ ady * tableSize + adx ]
+            # Mirror first quadrant angle into the proper quadrant
+            if ( dx < 0 ):
+                angle = half - angle
+            if ( dy < 0 ):
+                angle = ANGLE_STEPS - angle
+            color  = darkColors[ radius ] if stripes[ angle % ANGLE_STEPS ] else ringColors[ radius ]
+
+            offset = rowStart + column * 2
+            buffer[ offset ]     = color >> 8
+            buffer[ offset + 1 ] = color & 0xFF
+
+        if ( pupilHalf >= 0 ):
+            first = max( 0, center - pupilHalf )
+            last  = min( size, center + pupilHalf + 1 )
+            buffer[ rowStart + first * 2 : rowStart + last * 2 ] = pupilRow[ 0 : (last - first) * 2 ]
+
+    # Specular highlight up and to the left of the pupil
+    if ( design.highlight > 0 ):
+        hiCenterX = center - pupilRadius
+        hiCenterY = center - pupilRadius
+        hiR2      = design.highlight * design.highlight
+        hiRow     = bytearray( [ design.highlightColor >> 8, design.highlightColor & 0xFF ] ) * size
+        for dy in range( -design.highlight, design.highlight + 1 ):
+            row = hiCenterY + dy
+            if ( row < 0 or row >= size ):
+                continue
+            halfWidth = isqrt( hiR2 - dy * dy )
+            first     = max( 0, hiCenterX - halfWidth )
+            last      = min( size, hiCenterX + halfWidth + 1 )
+            rowStart  = row * rowBytes
+            buffer[ rowStart + first * 2 : rowStart + last * 2 ] = hiRow[ 0 : (last - first) * 2 ]
+
+    return buffer
+
+
+##
+## Class IrisRenderer
+##
+class IrisRenderer:
+    '''
+    Renders IrisDesigns and keeps the most recently used results, so
+    switching back to a recently shown design costs nothing.
+
+    lastRenderMs holds how long the last (uncached) render took, for
+    budgeting renders in the main loop.
+    '''
+
+    def __init__( self, cacheEntries=2 ):
+        self.cache        = LRUCache( cacheEntries )
+        self.lastRenderMs = 0
+
+    def render( self, design ):
+        # Returns the RGB565 buffer for design, rendering it on a cache miss
+        key    = design.key()
+        buffer = self.cache.get( key )
+        if ( buffer is None ):
+            start  = ticks_ms()
+            buffer = renderIris( design )
+            self.lastRenderMs = ticks_diff( ticks_ms(), start )
+            self.cache.put( key, buffer )
+        return buffer
@@ -0,0 +1,27 @@
+##
+# Eye Math
+#
+# Small integer helpers shared by the iris, sclera and eyelid tables, kept
+# apart so that modules needing them do not pull in the iris generator.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeMath.py
+
+    Module: Integer math helpers for building lookup tables.
+"""
+
+# isqrt( value )
+#
+# Integer square root (largest r with r * r <= value).
+def isqrt( value ):
+    if ( value <= 0 ):
+        return 0
+    root = value
+    guess = ( root + 1 ) >> 1
+    while ( guess < root ):
+        root  = guess
+        guess = ( root + value // root ) >> 1
+    return root
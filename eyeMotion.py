@@ -0,0 +1,213 @@
+##
+# Motion Class
+#
+# Time based eye motion.  Positions advance by the time that has actually
+# passed (ticks_ms) instead of by a fixed step per loop, so the eye moves
+# at the same speed however long a frame took.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeMotion.py
+
+    Module: Fixed-point eased and spring motion toward a target position.
+
+    Positions and velocities are fixed-point integers with FIX_SHIFT
+    fraction bits, and easing curves are precomputed tables, so update()
+    does no floating point and allocates nothing.
+"""
+
+from array import array
+
+from utime import ticks_diff
+
+## Fixed-point positions: pixels << FIX_SHIFT
+FIX_SHIFT = 8
+FIX_ONE   = 1 << FIX_SHIFT
+FIX_HALF  = FIX_ONE >> 1
+
+## Easing tables: EASE_STEPS + 1 entries from 0 to EASE_ONE
+EASE_STEPS = 64
+EASE_SHIFT = 10
+EASE_ONE   = 1 << EASE_SHIFT
+
+## Motion types
+EASE_LINEAR  = 0
+EASE_IN      = 1    # Start slowly, arrive at full speed
+EASE_OUT     = 2    # Start at full speed, slow down on arrival
+EASE_IN_OUT  = 3    # Slow start and slow arrival (smoothstep)
+SPRING       = 4    # Critically damped spring, follows a moving target
+
+## Spring integration step; larger elapsed times are split into these
+SPRING_STEP_MS = 4
+
+## Longest elapsed time honoured by one update (e.g. after a pause)
+MAX_ELAPSED_MS = 250
+
+# easeTable( kind )
+#
+# Returns an unsigned short array of EASE_STEPS + 1 values from 0 to
+# EASE_ONE giving the fraction of the distance covered at each step of
+# the move, computed with integer arithmetic.
+def easeTable( kind ):
+    table = array('H', bytes( 2 * ( EASE_STEPS + 1 ) ))
+    steps = EASE_STEPS
+    for i in range( steps + 1 ):
+        if ( kind == EASE_IN ):
+            value = ( i * i * EASE_ONE ) // ( steps * steps )
+        elif ( kind == EASE_OUT ):
+            rest  = steps - i
+            value = EASE_ONE - ( rest * rest * EASE_ONE ) // ( steps * steps )
+        elif ( kind == EASE_IN_OUT ):
+            # 3t^2 - 2t^3
+            value = ( ( 3 * steps - 2 * i ) * i * i * EASE_ONE ) // ( steps * steps * steps )
+        else:
+            value = ( i * EASE_ONE ) // steps
+        table[ i ] = value
+    return table
+
+## Tables shared by every Motion, indexed by motion type
+EASE_TABLES = [ easeTable( EASE_LINEAR ), easeTable( EASE_IN ),
+                easeTable( EASE_OUT ),    easeTable( EASE_IN_OUT ) ]
+
+
+##
+## Class Motion
+##
+class Motion:
+    '''
+    Moves a point toward a target at speed pixels per second.
+
+    Eased motion (EASE_*) plans a move of fixed duration from the current
+    position to the target and looks up the covered fraction in an easing
+    table.  SPRING motion integrates a critically damped spring with
+    natural frequency omega (per second), so it follows a target that
+    keeps changing without stopping and restarting.
+
+    x, y            - current position in whole pixels
+    posX, posY      - current position, fixed point
+    velX, velY      - spring velocity, fixed point pixels per second
+    moving          - False once the target has been reached
+
+    update( now ) returns True when x or y changed.  When frames run late
+    the position jumps further in one update; Eyeball.drawAt() erases only
+    the strips the image uncovers, however large the jump.
+    '''
+
+    def __init__( self, x, y, speed=120, kind=EASE_IN_OUT, omega=12, minMs=40 ):
+        self.speed   = speed
+        self.kind    = kind
+        self.omega   = omega
+        self.minMs   = minMs
+        self.jumpTo( x, y )
+
+    def jumpTo( self, x, y ):
+        # Place the point at (x, y) with no motion
+        self.x       = x
+        self.y       = y
+        self.posX    = x << FIX_SHIFT
+        self.posY    = y << FIX_SHIFT
+        self.velX    = 0
+        self.velY    = 0
+        self.targetX = x
+        self.targetY = y
+        self.startX  = self.posX
+        self.startY  = self.posY
+        self.deltaX  = 0
+        self.deltaY  = 0
+        self.start   = 0
+        self.last    = 0
+        self.duration = 0
+        self.moving  = False
+
+    def setKind( self, kind ):
+        self.kind = kind
+
+    def moveTo( self, x, y, now ):
+        # Start moving toward (x, y) from wherever the point is now
+        if ( x == self.targetX and y == self.targetY and self.moving ):
+            return
+        self.targetX = x
+        self.targetY = y
+        self.start   = now
+        self.last    = now
+        self.moving  = ( x != self.x or y != self.y or self.velX != 0 or self.velY != 0 )
+        if ( self.kind == SPRING ):
+            return
+
+        # Plan an eased move; its length follows the longer axis so the
+        # average speed is speed pixels per second
+        self.startX   = self.posX
+        self.startY   = self.posY
+        self.deltaX   = ( x << FIX_SHIFT ) - self.posX
+        self.deltaY   = ( y << FIX_SHIFT ) - self.posY
+        distance      = max( abs( self.deltaX ), abs( self.deltaY ) ) >> FIX_SHIFT
+        self.duration = max( self.minMs, ( distance * 1000 ) // self.speed )
+        self.velX     = 0
+        self.velY     = 0
+
+    def update( self, now ):
+        # Advance to time now.  Returns True if the whole pixel position changed.
+        if ( not self.moving ):
+            return False
+        if ( self.kind == SPRING ):
+            self.spring( now )
+        else:
+            self.ease( now )
+
+        x = ( self.posX + FIX_HALF ) >> FIX_SHIFT
+        y = ( self.posY + FIX_HALF ) >> FIX_SHIFT
+        if ( x == self.x and y == self.y ):
+            return False
+        self.x = x
+        self.y = y
+        return True
+
+    def ease( self, now ):
+        elapsed = ticks_diff( now, self.start )
+        if ( elapsed >= self.duration ):
+            self.posX   = self.targetX << FIX_SHIFT
+            self.posY   = self.targetY << FIX_SHIFT
+            self.moving = False
+            return
+
+        # Table index and the fraction between two entries, both integers
+        scaled   = elapsed * EASE_STEPS
+        index    = scaled // self.duration
+        fraction = scaled - index * self.duration
+        table    = EASE_TABLES[ self.kind ]
+        low      = table[ index ]
+        covered  = low + ( ( table[ index + 1 ] - low ) * fraction ) // self.duration
+
+        self.posX = self.startX + ( ( self.deltaX * covered ) >> EASE_SHIFT )
+        self.posY = self.startY + ( ( self.deltaY * covered ) >> EASE_SHIFT )
+
+    def spring( self, now ):
+        elapsed   = min( ticks_diff( now, self.last ), MAX_ELAPSED_MS )
+        self.last = now
+
+        omega     = self.omega
+        stiffness = omega * omega
+        damping   = 2 * omega
+        goalX     = self.targetX << FIX_SHIFT
+        goalY     = self.targetY << FIX_SHIFT
+
+        # Semi-implicit Euler in fixed steps keeps the spring stable
+        # whatever the frame time was
+        while ( elapsed > 0 ):
+            dt       = min( elapsed, SPRING_STEP_MS )
+            elapsed -= dt
+            self.velX += ( ( stiffness * ( goalX - self.posX ) - damping * self.velX ) * dt ) // 1000
+            self.velY += ( ( stiffness * ( goalY - self.posY ) - damping * self.velY ) * dt ) // 1000
+            self.posX += ( self.velX * dt ) // 1000
+            self.posY += ( self.velY * dt ) // 1000
+
+        # Settle once within a quarter pixel and slower than a pixel per second
+        if ( abs( goalX - self.posX ) < FIX_ONE // 4 and abs( goalY - self.posY ) < FIX_ONE // 4 and
+             abs( self.velX ) < FIX_ONE and abs( self.velY ) < FIX_ONE ):
+            self.posX   = goalX
+            self.posY   = goalY
+            self.velX   = 0
+            self.velY   = 0
+            self.moving = False
@@ -0,0 +1,262 @@
+##
+# PackedEye Class
+#
+# Eye images kept compressed on flash and decoded band by band straight
+# into the buffer that feeds GC9A01.blit_rows, so a design never has to
+# be held whole in RAM just to be drawn.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyePack.py
+
+    Module: Compressed eye asset files with streaming decode.
+
+    An image is stored as RGB565 pixels or, smaller, as one palette index
+    per pixel, and either as is or compressed with zlib (deflate).  Drawing
+    reads the file through the MicroPython deflate module (zlib.DecompIO on
+    older firmware) a band of rows at a time, expands palette indices in
+    the band and blits it.  The image is never held whole: drawing takes
+    the band buffer, an index band for indexed files and, for compressed
+    files, the decompressor's state and history window.  Files are
+    compressed with a window of 2 ** WINDOW_BITS bytes (512) instead of
+    zlib's 32 KB, so the window stays small on the device.
+
+    Whether compression pays depends on the asset: inflating costs CPU time
+    and a stored file costs flash and read time.  benchmark() measures both
+    for a file so the choice can be made per asset.
+
+    File format (see packEye / packModule), little endian:
+        'EPAK', width (H), height (H), bpp (B, 8 or 16), method (B),
+        with bpp 8: 256 palette colors (H, normal RGB565),
+        then the pixels, row by row: stored (method 0) or as one zlib
+        stream with a 2 ** WINDOW_BITS byte window (method 1)
+"""
+
+import ustruct as struct
+
+from utime import ticks_ms, ticks_diff
+
+import pixelArena
+
+from eyeBitmap   import extractIndices
+from pixelDecode import decodePixels
+
+try:
+    import deflate          # MicroPython 1.21 and later
+except ImportError:
+    deflate = None
+
+try:
+    import zlib             # CPython (packing on the host), older MicroPython
+except ImportError:
+    zlib = None
+
+_PACK_MAGIC  = b'EPAK'
+_PACK_HEADER = "<4sHHBB"
+
+## Storage methods
+STORED = 0
+ZLIB   = 1
+
+## Colors in the palette of indexed (bpp 8) files
+PACK_COLORS = 256
+
+## Pixels per band; the band buffer is twice this many bytes
+BAND_PIXELS = 2048
+
+## Deflate window of compressed files, as a power of two; the decoder
+## keeps this much history
+WINDOW_BITS = 9
+
+# compress( data )
+#
+# zlib stream of data with a WINDOW_BITS window: zlib.compressobj on the
+# host, deflate.DeflateIO on firmware built with compression support.
+def compress( data ):
+    if ( zlib is not None and hasattr( zlib, "compressobj" ) ):
+        compressor = zlib.compressobj( 9, zlib.DEFLATED, WINDOW_BITS )
+        return compressor.compress( data ) + compressor.flush()
+    if ( deflate is not None ):
+        import io
+        stream = io.BytesIO()
+        with deflate.DeflateIO( stream, deflate.ZLIB, WINDOW_BITS ) as d:
+            d.write( data )
+        return stream.getvalue()
+    raise RuntimeError( "No zlib compressor available" )
+
+# inflater( f )
+#
+# A stream that reads the zlib stream in file f decompressed, keeping a
+# WINDOW_BITS window.
+def inflater( f ):
+    if ( deflate is not None ):
+        return deflate.DeflateIO( f, deflate.ZLIB, WINDOW_BITS )
+    if ( zlib is not None and hasattr( zlib, "DecompIO" ) ):
+        return zlib.DecompIO( f, WINDOW_BITS )
+    raise RuntimeError( "No deflate decompressor available" )
+
+# packEye( fileName, pixels, width, height, palette=None, method=ZLIB )
+#
+# Writes an image file.  pixels is RGB565 high byte first, or with palette
+# (up to 256 normal RGB565 colors) one palette index per pixel.
+def packEye( fileName, pixels, width, height, palette=None, method=ZLIB ):
+    bpp = 16 if palette is None else 8
+    with open( fileName, "wb" ) as f:
+        f.write( struct.pack( _PACK_HEADER, _PACK_MAGIC, width, height, bpp, method ) )
+        if ( palette is not None ):
+            for i in range( PACK_COLORS ):
+                f.write( struct.pack( "<H", palette[ i ] if i < len( palette ) else 0 ) )
+        f.write( compress( pixels ) if method == ZLIB else pixels )
+
+# packModule( fileName, eyeBitmapFile, method=ZLIB )
+#
+# Writes an eye bitmap module (see eyeBitmap.extractEye) as an indexed
+# image file.  The module's byte swapped PALETTE is stored as normal colors.
+def packModule( fileName, eyeBitmapFile, method=ZLIB ):
+    palette = []
+    for color in eyeBitmapFile.PALETTE:
+        palette.append( ( ( color & 0xFF ) << 8 ) | ( color >> 8 ) )
+    packEye( fileName, extractIndices( eyeBitmapFile ), eyeBitmapFile.WIDTH,
+             eyeBitmapFile.HEIGHT, palette, method )
+
+# readFully( source, view )
+#
+# Fills view from source, which (like a decompressing stream) may return
+# fewer bytes than asked for.  Returns the number of bytes read.
+def readFully( source, view ):
+    count = source.readinto( view )
+    if ( count is None ):
+        count = 0
+    total = len( view )
+    while ( 0 < count < total ):
+        more = source.readinto( view[ count : ] )
+        if ( not more ):
+            break
+        count += more
+    return count
+
+
+##
+## Class PackedEye
+##
+class PackedEye:
+    '''
+    An image file written by packEye().
+
+    draw( display, x, y )   - decode band by band, blitting each band
+    loadInto( buffer )      - decode the whole image into an RGB565 buffer
+                              (owner's pixel arena block by default)
+    '''
+
+    def __init__( self, fileName, bandPixels=BAND_PIXELS ):
+        self.fileName = fileName
+        with open( fileName, "rb" ) as f:
+            magic, width, height, bpp, method = struct.unpack(
+                _PACK_HEADER, f.read( struct.calcsize( _PACK_HEADER ) ) )
+            if ( magic != _PACK_MAGIC or bpp not in ( 8, 16 ) ):
+                raise ValueError( "Not a packed eye file: {}".format( fileName ) )
+            self.high = None
+            self.low  = None
+            if ( bpp == 8 ):
+                palette   = struct.unpack( "<{}H".format( PACK_COLORS ), f.read( 2 * PACK_COLORS ) )
+                self.high = bytearray( PACK_COLORS )
+                self.low  = bytearray( PACK_COLORS )
+                for i in range( PACK_COLORS ):
+                    self.high[ i ] = palette[ i ] >> 8
+                    self.low[ i ]  = palette[ i ] & 0xFF
+            self.dataStart = f.tell()
+
+        self.width     = width
+        self.height    = height
+        self.bpp       = bpp
+        self.method    = method
+        self.bandRows  = max( 1, min( bandPixels // width, height ) )
+
+    def open( self ):
+        # File positioned at the pixels, and the stream to read them from
+        f = open( self.fileName, "rb" )
+        f.seek( self.dataStart )
+        return f, ( inflater( f ) if self.method == ZLIB else f )
+
+    def bands( self ):
+        # Decode band by band: yields ( row, rows, pixels ) with pixels a
+        # view of the RGB565 band buffer, good until the next band
+        width    = self.width
+        bandRows = self.bandRows
+        band     = pixelArena.get( "pack band", bandRows * width * 2 )
+        indices  = None
+        if ( self.bpp == 8 ):
+            indices = pixelArena.get( "pack indices", bandRows * width )
+
+        f, source = self.open()
+        try:
+            row = 0
+            while ( row < self.height ):
+                rows = min( bandRows, self.height - row )
+                if ( indices is None ):
+                    pixels = band if rows == bandRows else band[ 0 : rows * width * 2 ]
+                    complete = readFully( source, pixels ) == len( pixels )
+                else:
+                    view     = indices if rows == bandRows else indices[ 0 : rows * width ]
+                    complete = readFully( source, view ) == len( view )
+                    pixels   = band if rows == bandRows else band[ 0 : rows * width * 2 ]
+                    decodePixels( view, 8, 0, len( view ), self.high, self.low, pixels )
+                if ( not complete ):
+                    raise ValueError( "Truncated packed eye file: {}".format( self.fileName ) )
+                yield row, rows, pixels
+                row += rows
+        finally:
+            f.close()
+
+    def draw( self, display, x, y ):
+        # One window for the whole image, fed a band at a time
+        display.blit_rows( self.pixelBands(), x, y, self.width, self.height )
+
+    def pixelBands( self ):
+        # The band buffers alone, for GC9A01.blit_rows
+        for row, rows, pixels in self.bands():
+            yield pixels
+
+    def loadInto( self, buffer=None, owner=None ):
+        rowBytes = self.width * 2
+        if ( buffer is None ):
+            buffer = pixelArena.get( owner if owner is not None else self.fileName,
+                                     self.height * rowBytes )
+        for row, rows, pixels in self.bands():
+            buffer[ row * rowBytes : ( row + rows ) * rowBytes ] = pixels
+        return buffer
+
+
+# benchmark( fileName, display=None, repeats=3 )
+#
+# Times decoding a packed file against reading the same image stored as
+# plain RGB565 (written next to it as fileName + ".raw" and removed
+# afterwards), both band by band and, with a display, blitted at the top
+# left corner.  Making the raw copy needs the whole image in RAM once.
+# Prints and returns the file sizes and the average milliseconds per image.
+def benchmark( fileName, display=None, repeats=3 ):
+    import os
+    packed  = PackedEye( fileName )
+    rawName = fileName + ".raw"
+    packEye( rawName, packed.loadInto( bytearray( packed.width * packed.height * 2 ) ),
+             packed.width, packed.height, method=STORED )
+    try:
+        raw    = PackedEye( rawName )
+        result = { "packedBytes": os.stat( fileName )[6], "rawBytes": os.stat( rawName )[6] }
+        for key, image in ( ( "packedMs", packed ), ( "rawMs", raw ) ):
+            start = ticks_ms()
+            for _ in range( repeats ):
+                if ( display is None ):
+                    for band in image.bands():
+                        pass
+                else:
+                    image.draw( display, 0, 0 )
+            result[ key ] = ticks_diff( ticks_ms(), start ) // repeats
+    finally:
+        os.remove( rawName )
+
+    print("{}: {} bytes, {} ms packed / {} bytes, {} ms raw".format(
+        fileName, result["packedBytes"], result["packedMs"], result["rawBytes"], result["rawMs"] ))
+    return result
@@ -0,0 +1,209 @@
+##
+# EyePalette Class
+#
+# Palette-space color engine for eye bitmaps.  Color changes (tint,
+# brightness, gamma, fades) are computed on the COLORS palette entries
+# instead of on every pixel, and only the pixels that use a changed
+# palette entry are rewritten in the RGB565 buffer.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyePalette.py
+
+    Module: Runtime palette transforms for eye bitmap buffers.
+"""
+
+from array     import array
+
+from eyeBitmap import extractIndices
+
+## Fixed point scale used for brightness, tint and fade levels.
+##    LEVEL_MAX (256) means 100%
+LEVEL_MAX = 256
+
+# swapBytes( color )
+#
+# The PALETTE values in the bitmap modules are stored byte swapped so that
+# extractEye() can copy the low byte first and produce the big-endian
+# RGB565 stream the display expects.  This converts between the stored
+# form and a normal RGB565 value (the operation is its own inverse).
+def swapBytes( color ):
+    return ( (color & 0xFF) << 8 ) | ( color >> 8 )
+
+# splitColor( color )
+#
+# Splits a normal RGB565 color into its (red, green, blue) components,
+# each scaled up to 0..255.
+def splitColor( color ):
+    red   = (color >> 8) & 0xF8
+    green = (color >> 3) & 0xFC
+    blue  = (color << 3) & 0xF8
+    return red, green, blue
+
+# joinColor( red, green, blue )
+#
+# Packs 0..255 components into a normal RGB565 color, clamping each
+# component to the valid range.
+def joinColor( red, green, blue ):
+    red   = 0 if red   < 0 else (255 if red   > 255 else red)
+    green = 0 if green < 0 else (255 if green > 255 else green)
+    blue  = 0 if blue  < 0 else (255 if blue  > 255 else blue)
+    return ( (red & 0xF8) << 8 ) | ( (green & 0xFC) << 3 ) | ( blue >> 3 )
+
+
+##
+## Class EyePalette
+##
+class EyePalette:
+    '''
+    Keeps the original PALETTE of an eye bitmap module, the currently
+    applied palette and, for every palette index, the runs of pixels
+    in the buffer that use it.
+
+    Runs are stored per palette index as pairs of (first pixel, pixel
+    count) in an unsigned short array, so a single palette entry change
+    only touches the pixels drawn in that color.
+
+    Colors passed to and returned by the transform methods are normal
+    RGB565 values (as used by gc9a01py), not the byte swapped PALETTE form.
+    '''
+
+    def __init__( self, eyeBitmapFile, buffer=None, keep=() ):
+        self.width    = eyeBitmapFile.WIDTH
+        self.height   = eyeBitmapFile.HEIGHT
+        self.colors   = eyeBitmapFile.COLORS
+
+        # Original palette (stored, byte swapped form) and current palette
+        self.base     = list( eyeBitmapFile.PALETTE )
+        self.palette  = list( self.base )
+
+        # Palette indices that no transform may change, e.g. the color of
+        # the transparent corners around the iris.
+        self.keep     = keep
+
+        indices       = extractIndices( eyeBitmapFile )
+        self.runs     = self.buildRuns( indices )
+
+        if ( buffer is None ):
+            buffer = bytearray( self.width * self.height * 2 )
+            self.buffer = buffer
+            self.expand()
+        else:
+            self.buffer = buffer
+
+    def buildRuns( self, indices ):
+        # One run list per palette index: [start0, count0, start1, count1, ...]
+        runs  = [ array('H') for _ in range( self.colors ) ]
+        total = len( indices )
+        start = 0
+        while ( start < total ):
+            colorIndex = indices[ start ]
+            end = start + 1
+            while ( end < total and indices[ end ] == colorIndex and (end - start) < 0xFFFF ):
+                end += 1
+            runs[ colorIndex ].append( start )
+            runs[ colorIndex ].append( end - start )
+            start = end
+        return runs
+
+    def pixelCount( self, colorIndex ):
+        # Number of pixels in the buffer drawn with the palette entry
+        runs  = self.runs[ colorIndex ]
+        count = 0
+        for i in range( 1, len( runs ), 2 ):
+            count += runs[ i ]
+        return count
+
+    def expand( self ):
+        # Rewrite every pixel of the buffer from the current palette
+        for colorIndex in range( self.colors ):
+            self.writeEntry( colorIndex )
+
+    def writeEntry( self, colorIndex ):
+        # Rewrite only the pixels that use palette entry colorIndex
+        color  = self.palette[ colorIndex ]
+        lo     = color & 0xFF
+        hi     = color >> 8
+        buffer = self.buffer
+        runs   = self.runs[ colorIndex ]
+        for i in range( 0, len( runs ), 2 ):
+            offset = runs[ i ] * 2
+            end    = offset + runs[ i + 1 ] * 2
+            while ( offset < end ):
+                buffer[ offset ]     = lo
+                buffer[ offset + 1 ] = hi
+                offset += 2
+
+    def setEntry( self, colorIndex, color ):
+        # Set one palette entry to a normal RGB565 color.
+        # Returns the number of pixels rewritten.
+        stored = swapBytes( color )
+        if ( self.palette[ colorIndex ] == stored ):
+            return 0
+        self.palette[ colorIndex ] = stored
+        self.writeEntry( colorIndex )
+        return self.pixelCount( colorIndex )
+
+    def getEntry( self, colorIndex ):
+        return swapBytes( self.palette[ colorIndex ] )
+
+    def apply( self, transform ):
+        # Run transform( baseColor ) -> newColor over the original palette
+        # (normal RGB565 values) and rewrite the pixels of changed entries.
+        # Returns the number of pixels rewritten.
+        touched = 0
+        for colorIndex in range( self.colors ):
+            if ( colorIndex in self.keep ):
+                continue
+            color    = transform( swapBytes( self.base[ colorIndex ] ) )
+            touched += self.setEntry( colorIndex, color )
+        return touched
+
+    def reset( self ):
+        # Go back to the original palette
+        return self.apply( lambda color: color )
+
+    def brightness( self, level ):
+        # Scale every color by level / LEVEL_MAX (levels above LEVEL_MAX brighten)
+        def transform( color ):
+            red, green, blue = splitColor( color )
+            return joinColor( (red * level) >> 8, (green * level) >> 8, (blue * level) >> 8 )
+        return self.apply( transform )
+
+    def tint( self, tintColor, amount ):
+        # Blend every color toward tintColor by amount / LEVEL_MAX, keeping
+        # the brightness of the original so iris texture is preserved.
+        tRed, tGreen, tBlue = splitColor( tintColor )
+        keepAmount = LEVEL_MAX - amount
+        def transform( color ):
+            red, green, blue = splitColor( color )
+            luma = ( red * 77 + green * 150 + blue * 29 ) >> 8
+            return joinColor( ( red   * keepAmount + ( (tRed   * luma) >> 8 ) * amount ) >> 8,
+                              ( green * keepAmount + ( (tGreen * luma) >> 8 ) * amount ) >> 8,
+                              ( blue  * keepAmount + ( (tBlue  * luma) >> 8 ) * amount ) >> 8 )
+        return self.apply( transform )
+
+    def fade( self, fadeColor, amount ):
+        # Cross fade every color toward fadeColor by amount / LEVEL_MAX.
+        # amount = 0 is the original image, LEVEL_MAX is a solid fadeColor.
+        fRed, fGreen, fBlue = splitColor( fadeColor )
+        keepAmount = LEVEL_MAX - amount
+        def transform( color ):
+            red, green, blue = splitColor( color )
+            return joinColor( ( red   * keepAmount + fRed   * amount ) >> 8,
+                              ( green * keepAmount + fGreen * amount ) >> 8,
+                              ( blue  * keepAmount + fBlue  * amount ) >> 8 )
+        return self.apply( transform )
+
+    def gamma( self, gammaValue ):
+        # Apply gamma correction.  A 256 entry lookup table is built once so
+        # the per entry work is three table lookups.
+        lut = bytearray( 256 )
+        for i in range( 256 ):
+            lut[ i ] = int( 255 * ( (i / 255) ** gammaValue ) + 0.5 )
+        def transform( color ):
+            red, green, blue = splitColor( color )
+            return joinColor( lut[ red ], lut[ green ], lut[ blue ] )
+        return self.apply( transform )
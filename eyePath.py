@@ -0,0 +1,216 @@
+##
+# Path and PathPlayer Classes
+#
+# Automatic eye motion as parametric trajectories (back and forth scans,
+# circles, figure eights) instead of bounce logic in Eyeball.move().  A
+# new motion pattern is just another Path description.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyePath.py
+
+    Module: Parametric eye paths evaluated through fixed-point wave tables.
+
+    Each axis follows a wave (sine or triangle) with its own frequency and
+    phase over a period in milliseconds.  Waves are looked up in
+    precomputed tables of WAVE_STEPS entries scaled by WAVE_ONE, so
+    evaluating a path does no floating point.  A PathPlayer can also
+    precompute one period of positions at mode entry, after which each
+    frame is a table lookup and a blit.
+"""
+
+import math
+
+from array import array
+
+from utime import ticks_diff
+
+## Wave tables: WAVE_STEPS entries per turn, values from -WAVE_ONE to WAVE_ONE
+WAVE_STEPS = 256
+WAVE_MASK  = WAVE_STEPS - 1
+WAVE_SHIFT = 14
+WAVE_ONE   = 1 << WAVE_SHIFT
+
+## Fraction bits of the position between two table entries
+PHASE_SHIFT = 6
+
+## Longest supported period: ( period << ( 8 + PHASE_SHIFT ) ) must stay a small int
+MAX_PERIOD_MS = 65535
+
+## Amplitude scale: SCALE_ONE uses the whole travel range of the axis
+SCALE_SHIFT = 8
+SCALE_ONE   = 1 << SCALE_SHIFT
+
+## Wave shapes
+SINE     = 0
+TRIANGLE = 1    # Constant speed between the ends, like the old bounce modes
+
+# waveTable( shape )
+#
+# Returns a signed short array of WAVE_STEPS + 1 samples of one turn of the
+# wave; the extra sample repeats the first so interpolation needs no wrap.
+def waveTable( shape ):
+    table   = array('h', bytes( 2 * ( WAVE_STEPS + 1 ) ))
+    quarter = WAVE_STEPS // 4
+    for i in range( WAVE_STEPS + 1 ):
+        if ( shape == TRIANGLE ):
+            # 0 -> +1 -> 0 -> -1 -> 0, in phase with the sine
+            step = i % WAVE_STEPS
+            if ( step < quarter ):
+                value = ( step * WAVE_ONE ) // quarter
+            elif ( step < 3 * quarter ):
+                value = ( ( 2 * quarter - step ) * WAVE_ONE ) // quarter
+            else:
+                value = ( ( step - WAVE_STEPS ) * WAVE_ONE ) // quarter
+        else:
+            value = int( round( math.sin( 2 * math.pi * i / WAVE_STEPS ) * ( WAVE_ONE - 1 ) ) )
+        table[ i ] = value
+    return table
+
+## Tables indexed by wave shape, built once at import
+WAVE_TABLES = [ waveTable( SINE ), waveTable( TRIANGLE ) ]
+
+
+##
+## Class Path
+##
+class Path:
+    '''
+    A closed trajectory of the top left corner of the eye image.
+
+        x = centerX + amplitudeX * wave( freqX * turn + phaseX )
+        y = centerY + amplitudeY * wave( freqY * turn + phaseY )
+
+    turn runs once from 0 to WAVE_STEPS per periodMs.  Phases are in wave
+    steps (WAVE_STEPS // 4 is a quarter turn).  scaleX / scaleY set the
+    amplitude as a fraction (of SCALE_ONE) of the eye's travel range from
+    the center; fit( eye ) converts them to pixels for an Eyeball.
+
+    at( turnFine ) sets x and y for a turn with PHASE_SHIFT fraction bits.
+    '''
+
+    def __init__( self, periodMs, waveX=SINE, freqX=1, phaseX=0,
+                  waveY=SINE, freqY=1, phaseY=0, scaleX=SCALE_ONE, scaleY=SCALE_ONE ):
+        if ( periodMs <= 0 or periodMs > MAX_PERIOD_MS ):
+            raise ValueError( "Path period must be 1 to {} ms".format( MAX_PERIOD_MS ) )
+        self.periodMs   = periodMs
+        self.waveX      = waveX
+        self.freqX      = freqX
+        self.phaseX     = phaseX
+        self.waveY      = waveY
+        self.freqY      = freqY
+        self.phaseY     = phaseY
+        self.scaleX     = scaleX
+        self.scaleY     = scaleY
+        self.centerX    = 0
+        self.centerY    = 0
+        self.amplitudeX = 0
+        self.amplitudeY = 0
+        self.x          = 0
+        self.y          = 0
+
+    def fit( self, eye ):
+        # Center on eye's display and size the amplitudes to its travel range
+        rangeX          = ( eye.maxX - eye.width )  // 2 + eye.overscan
+        rangeY          = ( eye.maxY - eye.height ) // 2 + eye.overscan
+        self.centerX    = eye.CENTER_X
+        self.centerY    = eye.CENTER_Y
+        self.amplitudeX = ( rangeX * self.scaleX ) >> SCALE_SHIFT
+        self.amplitudeY = ( rangeY * self.scaleY ) >> SCALE_SHIFT
+
+    def at( self, turnFine ):
+        self.x = self.centerX + self.axis( self.waveX, turnFine * self.freqX, self.phaseX, self.amplitudeX )
+        self.y = self.centerY + self.axis( self.waveY, turnFine * self.freqY, self.phaseY, self.amplitudeY )
+
+    def axis( self, wave, turnFine, phase, amplitude ):
+        # amplitude * wave at turnFine, interpolated between table entries
+        table    = WAVE_TABLES[ wave ]
+        index    = ( ( turnFine >> PHASE_SHIFT ) + phase ) & WAVE_MASK
+        fraction = turnFine & ( ( 1 << PHASE_SHIFT ) - 1 )
+        low      = table[ index ]
+        value    = low + ( ( ( table[ index + 1 ] - low ) * fraction ) >> PHASE_SHIFT )
+        return ( amplitude * value ) >> WAVE_SHIFT
+
+    def turnAt( self, elapsedMs ):
+        # Position within the period as a fine turn (PHASE_SHIFT fraction bits)
+        elapsedMs = elapsedMs % self.periodMs
+        return ( elapsedMs << ( 8 + PHASE_SHIFT ) ) // self.periodMs
+
+
+## Built in patterns.  Adding a pattern is adding an entry here.
+PATTERNS = {
+    "horizontal": Path( 6000, TRIANGLE, 1, WAVE_STEPS // 2, scaleY=0 ),
+    "vertical":   Path( 6000, scaleX=0, waveY=TRIANGLE, freqY=1, phaseY=WAVE_STEPS // 2 ),
+    "circle":     Path( 4000, SINE, 1, WAVE_STEPS // 4, SINE, 1, 0, SCALE_ONE * 3 // 4, SCALE_ONE * 3 // 4 ),
+    "figure8":    Path( 6000, SINE, 1, 0, SINE, 2, 0, SCALE_ONE * 3 // 4, SCALE_ONE // 2 ),
+    "scan":       Path( 8000, TRIANGLE, 6, 0, TRIANGLE, 1, 0 ),
+}
+
+
+##
+## Class PathPlayer
+##
+class PathPlayer:
+    '''
+    Plays a Path on one or more Eyeballs (a list or an eyeArray.EyeArray)
+    by elapsed time.
+
+    play( path, now, frameMs )  - start path at time now; with frameMs the
+                                  positions for one period, one per frame,
+                                  are precomputed into a cyclic table
+    update( now )               - move the eyes to the path position for now
+
+    The position tables are kept between plays and only grow, so changing
+    mode does not allocate once the longest path has been played.
+    '''
+
+    def __init__( self, eyes ):
+        self.eyes    = eyes
+        self.group   = eyes if hasattr( eyes, "drawAt" ) else None
+        self.path    = None
+        self.start   = 0
+        self.frames  = 0
+        self.tableX  = array('h')
+        self.tableY  = array('h')
+
+    def play( self, path, now, frameMs=None ):
+        path.fit( self.eyes[0] )
+        self.path   = path
+        self.start  = now
+        self.frames = 0
+        if ( frameMs is None ):
+            return
+
+        frames = max( 1, path.periodMs // frameMs )
+        if ( len( self.tableX ) < frames ):
+            self.tableX = array('h', bytes( 2 * frames ))
+            self.tableY = array('h', bytes( 2 * frames ))
+        for frame in range( frames ):
+            path.at( path.turnAt( ( frame * path.periodMs ) // frames ) )
+            self.tableX[ frame ] = path.x
+            self.tableY[ frame ] = path.y
+        self.frames = frames
+
+    def stop( self ):
+        self.path = None
+
+    def update( self, now ):
+        path = self.path
+        if ( path is None ):
+            return
+        elapsed = ticks_diff( now, self.start ) % path.periodMs
+        if ( self.frames ):
+            frame = ( elapsed * self.frames ) // path.periodMs
+            x     = self.tableX[ frame ]
+            y     = self.tableY[ frame ]
+        else:
+            path.at( path.turnAt( elapsed ) )
+            x     = path.x
+            y     = path.y
+        if ( self.group is not None ):
+            self.group.drawAt( x, y )
+            return
+        for eye in self.eyes:
+            eye.drawAt( x, y )
@@ -0,0 +1,264 @@
+##
+# PupilDilation Class
+#
+# Pupil dilation for an eye image.  Variants of the iris with a larger or
+# smaller pupil are generated from the one source image, either on the host
+# or at boot, and kept as row span deltas against the source.  On the
+# device only the square around the pupil ring is redrawn when the
+# dilation level changes.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyePupil.py
+
+    Module: Pre-scaled pupil variants with a small cache of ready to send regions.
+"""
+
+import math
+import ustruct as struct
+
+import pixelArena
+
+from eyeCache  import LRUCache
+from eyeDelta  import SpanDelta, makeDelta, copyRegion
+
+# File header for saved variants: magic, level count, box x0, y0, x1, y1,
+# image width, image height
+_FILE_MAGIC  = b'PUPL'
+_FILE_HEADER = "<4sHHHHHHH"
+_SPAN_HEADER = "<HI"         # span triple count, data byte count
+
+
+# pupilBox( width, height, centerX, centerY, outerRadius )
+#
+# Returns the square (x0, y0, x1, y1) around the dilation ring, clipped to
+# the image.  Every variant only differs from the source inside this box.
+def pupilBox( width, height, centerX, centerY, outerRadius ):
+    return ( max( 0, centerX - outerRadius ),     max( 0, centerY - outerRadius ),
+             min( width, centerX + outerRadius + 1 ), min( height, centerY + outerRadius + 1 ) )
+
+
+# makePupilVariant( buffer, width, height, box, centerX, centerY,
+#                   pupilRadius, outerRadius, newRadius )
+#
+# Renders the box region of the RGB565 image with the pupil scaled from
+# pupilRadius to newRadius.  Pixels inside newRadius sample the original
+# pupil, pixels between newRadius and outerRadius sample the iris between
+# pupilRadius and outerRadius, so the iris texture is squeezed or stretched
+# and the edge of the ring lines up with the untouched image outside it.
+#
+# Returns a bytearray holding only the box region.
+def makePupilVariant( buffer, width, height, box, centerX, centerY,
+                      pupilRadius, outerRadius, newRadius ):
+    region = copyRegion( buffer, width, box )
+    x0, y0, x1, y1 = box
+    boxWidth = x1 - x0
+    outer2   = outerRadius * outerRadius
+
+    for row in range( y0, y1 ):
+        dy = row - centerY
+        for column in range( x0, x1 ):
+            dx = column - centerX
+            d2 = dx * dx + dy * dy
+            if ( d2 >= outer2 ):
+                continue
+
+            distance = math.sqrt( d2 )
+            if ( distance < newRadius ):
+                source = distance * pupilRadius / newRadius
+            else:
+                source = pupilRadius + ( distance - newRadius ) * \
+                         ( outerRadius - pupilRadius ) / ( outerRadius - newRadius )
+
+            if ( distance > 0 ):
+                sx = centerX + int( round( dx * source / distance ) )
+                sy = centerY + int( round( dy * source / distance ) )
+            else:
+                sx = centerX
+                sy = centerY
+
+            src = ( sy * width + sx ) * 2
+            dst = ( (row - y0) * boxWidth + column - x0 ) * 2
+            region[ dst ]     = buffer[ src ]
+            region[ dst + 1 ] = buffer[ src + 1 ]
+
+    return region
+
+
+# makePupilVariants( buffer, width, height, radii, pupilRadius,
+#                    outerRadius=None, centerX=None, centerY=None )
+#
+# Generates one SpanDelta per entry of radii (pupil radius in pixels for
+# each dilation level).  The pupil is assumed to be centered in the image
+# unless centerX / centerY are given.  outerRadius defaults to halfway
+# between the largest pupil and the edge of the image.
+#
+# Returns (box, deltas) for PupilDilation.
+def makePupilVariants( buffer, width, height, radii, pupilRadius,
+                       outerRadius=None, centerX=None, centerY=None ):
+    if ( centerX is None ):
+        centerX = width  // 2
+    if ( centerY is None ):
+        centerY = height // 2
+    if ( outerRadius is None ):
+        edge        = min( centerX, centerY, width - 1 - centerX, height - 1 - centerY )
+        outerRadius = ( max( radii ) + edge ) // 2
+
+    if ( max( radii ) >= outerRadius ):
+        raise ValueError( "Pupil radius {} must be less than the outer radius {}".format(
+            max( radii ), outerRadius ) )
+
+    box    = pupilBox( width, height, centerX, centerY, outerRadius )
+    deltas = []
+    for newRadius in radii:
+        region = makePupilVariant( buffer, width, height, box, centerX, centerY,
+                                   pupilRadius, outerRadius, newRadius )
+        deltas.append( makeDelta( buffer, region, width, height, box ) )
+    return box, deltas
+
+
+# saveVariants( fileName, box, deltas )
+#
+# Writes generated variants to a binary file so they can be produced on the
+# host and only loaded on the device.
+def saveVariants( fileName, box, deltas ):
+    width  = deltas[0].width
+    height = deltas[0].height
+    with open( fileName, "wb" ) as f:
+        f.write( struct.pack( _FILE_HEADER, _FILE_MAGIC, len( deltas ),
+                              box[0], box[1], box[2], box[3], width, height ) )
+        for delta in deltas:
+            f.write( struct.pack( _SPAN_HEADER, len( delta.spans ), len( delta.data ) ) )
+            f.write( delta.spans )
+            f.write( delta.data )
+
+
+# loadVariants( fileName )
+#
+# Reads variants written by saveVariants().
+#
+# Returns (box, deltas) for PupilDilation.
+def loadVariants( fileName ):
+    with open( fileName, "rb" ) as f:
+        header = f.read( struct.calcsize( _FILE_HEADER ) )
+        magic, levels, x0, y0, x1, y1, width, height = struct.unpack( _FILE_HEADER, header )
+        if ( magic != _FILE_MAGIC ):
+            raise ValueError( "Not a pupil variant file: {}".format( fileName ) )
+
+        deltas = []
+        for _ in range( levels ):
+            spanCount, dataCount = struct.unpack( _SPAN_HEADER, f.read( struct.calcsize( _SPAN_HEADER ) ) )
+            delta = SpanDelta( width, height )
+            spans = bytearray( spanCount * 2 )
+            f.readinto( spans )
+            for i in range( 0, spanCount * 2, 6 ):
+                row    = spans[ i ]     | ( spans[ i + 1 ] << 8 )
+                first  = spans[ i + 2 ] | ( spans[ i + 3 ] << 8 )
+                count  = spans[ i + 4 ] | ( spans[ i + 5 ] << 8 )
+                delta.addSpan( row, first, f.read( count * 2 ) )
+            deltas.append( delta )
+            if ( len( delta.data ) != dataCount ):
+                raise ValueError( "Truncated pupil variant file: {}".format( fileName ) )
+
+    return ( x0, y0, x1, y1 ), deltas
+
+
+##
+## Class PupilDilation
+##
+class PupilDilation:
+    '''
+    Switches an eye image between pupil dilation levels.
+
+    buffer  - RGB565 source image (shared, never modified)
+    width   - source image width in pixels
+    box     - (x0, y0, x1, y1) region that any variant changes
+    deltas  - one SpanDelta per dilation level
+    owner   - pixel arena owner of the full image (one per instance by
+              default, so every PupilDilation keeps its own)
+
+    The box region for a level is composed from the source and the level's
+    delta the first time it is needed and kept in an LRUCache, so changing
+    level costs one blit of the box and no decoding for recently used levels.
+
+    Redrawing the whole eye uses fullImage( level ), the source with the
+    level applied, so the pupil box goes out once as part of the image
+    instead of being sent again over it.  It is composed into owner's
+    arena block, as large as the source, when the level differs from the
+    last one asked for.
+    '''
+
+    def __init__( self, buffer, width, box, deltas, cacheEntries=3, owner=None ):
+        self.buffer  = buffer
+        self.width   = width
+        self.box     = box
+        self.deltas  = deltas
+        self.levels  = len( deltas )
+        self.cache   = LRUCache( cacheEntries )
+        self.owner   = owner if owner is not None else "pupil {}".format( id( self ) )
+
+        x0, y0, x1, y1 = box
+        self.boxWidth  = x1 - x0
+        self.boxHeight = y1 - y0
+        self.image      = None
+        self.imageLevel = None
+
+    def region( self, level ):
+        # RGB565 pixels of the box with dilation level applied
+        return self.cache.getOrCreate( level, self.compose )
+
+    def fullImage( self, level ):
+        # The whole image with level applied (None gives the source)
+        if ( level is None ):
+            return self.buffer
+        if ( self.image is None ):
+            self.image = pixelArena.get( self.owner, len( self.buffer ) )
+        if ( level != self.imageLevel ):
+            self.image[ : ] = self.buffer
+            self.deltas[ level ].applyTo( self.image )
+            self.imageLevel = level
+        return self.image
+
+    def compose( self, level ):
+        # Build the box for level (None gives the unmodified source pixels)
+        region = copyRegion( self.buffer, self.width, self.box )
+        if ( level is not None ):
+            self.deltas[ level ].applyTo( region, self.box[0], self.box[1], self.boxWidth )
+        return region
+
+    def rows( self, level ):
+        # (first, end) image rows that level changes, or None for no change
+        if ( level is None or self.deltas[ level ].box is None ):
+            return None
+        box = self.deltas[ level ].box
+        return ( box[1], box[3] )
+
+    def draw( self, display, x, y, level, previous=-1 ):
+        # Draw level over an image whose top left corner is at (x, y).
+        #    level of None restores the source pixels.
+        #    When the previously drawn level is given, only the rows of the
+        #    box changed by either level are sent.
+        y0   = self.box[1]
+        y1   = self.box[3]
+        if ( previous != -1 ):
+            old = self.rows( previous )
+            new = self.rows( level )
+            if ( old is None ):
+                old = new
+            if ( new is None ):
+                new = old
+            if ( old is None ):
+                return
+            y0 = min( old[0], new[0] )
+            y1 = max( old[1], new[1] )
+
+        rowBytes = self.boxWidth * 2
+        start    = ( y0 - self.box[1] ) * rowBytes
+        # A mirrored display shows the image reversed, pupil box included
+        boxX = x + self.box[0]
+        if ( display.mirror ):
+            boxX = x + self.width - self.box[2]
+        display.blit_buffer( self.region( level ), boxX, y + y0, self.boxWidth, y1 - y0,
+                             offset=start )
@@ -0,0 +1,359 @@
+##
+# Scene Class
+#
+# An ordered stack of layers (sclera, iris, pupil, highlight, lids, HUD)
+# composed into a small scratch tile with framebuf and sent to the panel
+# one window at a time, redrawing only the part of the frame that changed.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeScene.py
+
+    Module: framebuf backed layered scene compositor.
+
+    Layers mark what they change with Scene.invalidate(); render() then
+    redraws only the bounding box of those changes.  The box is cut into
+    bands of whole rows that fit the tile, every visible layer is drawn
+    into the band bottom to top with FrameBuffer.blit (native code, with a
+    transparent key color), and the band goes out in one window.  A frame
+    costs the bytes of the dirty area however many layers overlap it.
+
+    framebuf is built into MicroPython only; without it Scene raises
+    RuntimeError and the rest of the program can keep drawing directly.
+
+    Pixel byte order: buffers hold RGB565 high byte first, as sent to the
+    panel, while framebuf reads pixels in the CPU's (little endian) order.
+    Copying pixels does not care, but colors given to framebuf (fill
+    colors, key colors) are byte swapped with native() first.
+"""
+
+try:
+    import framebuf         # MicroPython
+except ImportError:
+    framebuf = None
+
+import pixelArena
+
+## Pixels per tile; the tile buffer is twice this many bytes
+TILE_PIXELS = 2048
+
+## Tile shapes kept before the cache of tile framebufs starts over
+TILE_SHAPES = 24
+
+## No transparent color
+NO_KEY = -1
+
+# native( color )
+#
+# A normal RGB565 color in the byte order framebuf uses for the high byte
+# first buffers of this program.
+def native( color ):
+    return ( ( color & 0xFF ) << 8 ) | ( color >> 8 )
+
+
+##
+## Class Layer
+##
+class Layer:
+    '''
+    Base of every layer: a rectangle x, y, width, height in display
+    coordinates that render() draws into the tile.  A layer that is not
+    visible is skipped.  Changing a layer invalidates what it covered
+    before and what it covers now.
+    '''
+
+    def __init__( self, x=0, y=0, width=0, height=0 ):
+        self.scene   = None
+        self.x       = x
+        self.y       = y
+        self.width   = width
+        self.height  = height
+        self.visible = True
+
+    def invalidate( self ):
+        if ( self.scene is not None ):
+            self.scene.invalidate( self.x, self.y, self.width, self.height )
+
+    def show( self, visible=True ):
+        if ( visible != self.visible ):
+            self.visible = visible
+            self.invalidate()
+
+    def overlaps( self, x0, y0, x1, y1 ):
+        return ( self.x < x1 and self.x + self.width > x0 and
+                 self.y < y1 and self.y + self.height > y0 )
+
+    def render( self, scene, tile, y0, y1 ):
+        # Draw rows y0 to y1 - 1 of the tile (display rows)
+        pass
+
+
+##
+## Class ColorLayer
+##
+class ColorLayer( Layer ):
+    '''
+    Solid background color over the whole display.
+    '''
+
+    def __init__( self, color, width=240, height=240 ):
+        super().__init__( 0, 0, width, height )
+        self.color = native( color )
+
+    def setColor( self, color ):
+        self.color = native( color )
+        self.invalidate()
+
+    def render( self, scene, tile, y0, y1 ):
+        tile.fill( self.color )
+
+
+##
+## Class ScleraLayer
+##
+class ScleraLayer( Layer ):
+    '''
+    An eyeSclera.ScleraBackground over the whole display, decoded straight
+    into the tile.  It overwrites the tile, so it belongs at the bottom.
+    On a mirrored display the band is taken from the mirrored columns, as
+    ScleraBackground.restore does.
+    '''
+
+    def __init__( self, sclera ):
+        super().__init__( 0, 0, sclera.size, sclera.size )
+        self.sclera = sclera
+
+    def render( self, scene, tile, y0, y1 ):
+        width  = scene.tileWidth
+        column = scene.tileX
+        if ( scene.display.mirror ):
+            column = self.sclera.size - scene.tileX - width
+        self.sclera.decode( scene.tileBytes, column, y0, width, y1 - y0 )
+
+
+##
+## Class SpriteLayer
+##
+class SpriteLayer( Layer ):
+    '''
+    An RGB565 image (iris, pupil, highlight, HUD icon) drawn at x, y.
+    Pixels of color key are transparent; key of NO_KEY draws every pixel.
+
+    moveTo( x, y )          - move the image
+    setImage( buffer )      - show another image of the same size, such
+                              as the next pupil size or animation frame
+    '''
+
+    def __init__( self, buffer, width, height, x=0, y=0, key=NO_KEY ):
+        super().__init__( x, y, width, height )
+        self.key   = NO_KEY if key == NO_KEY else native( key )
+        self.frame = framebuf.FrameBuffer( buffer, width, height, framebuf.RGB565 )
+
+    def moveTo( self, x, y ):
+        if ( x == self.x and y == self.y ):
+            return
+        self.invalidate()
+        self.x = x
+        self.y = y
+        self.invalidate()
+
+    def setImage( self, buffer ):
+        self.frame = framebuf.FrameBuffer( buffer, self.width, self.height, framebuf.RGB565 )
+        self.invalidate()
+
+    def render( self, scene, tile, y0, y1 ):
+        tile.blit( self.frame, scene.place( self.x, self.width ), self.y - y0, self.key )
+
+
+##
+## Class LidLayer
+##
+class LidLayer( Layer ):
+    '''
+    Eyelids from an eyeball.EyelidCurve at openness level (0 closed to
+    lids.levels - 1 open).  setLevel() invalidates only the rows whose
+    open span changed.
+    '''
+
+    def __init__( self, lids, level=None ):
+        super().__init__( 0, 0, lids.size, lids.size )
+        self.lids  = lids
+        self.level = lids.levels - 1 if level is None else level
+        self.color = native( lids.color )
+
+    def setLevel( self, level ):
+        lids = self.lids
+        if ( level == self.level ):
+            return
+        first = -1
+        last  = -1
+        reach = 0
+        for row in range( lids.size ):
+            gapOld = lids.gap( self.level, row )
+            gapNew = lids.gap( level, row )
+            if ( gapOld != gapNew ):
+                if ( first < 0 ):
+                    first = row
+                last  = row
+                reach = max( reach, gapOld, gapNew )
+        self.level = level
+        if ( first >= 0 and self.scene is not None ):
+            self.scene.invalidate( lids.center - reach, first, 2 * reach, last + 1 - first )
+
+    def render( self, scene, tile, y0, y1 ):
+        lids   = self.lids
+        level  = self.level
+        center = lids.center
+        left   = scene.tileX
+        right  = left + scene.tileWidth
+        color  = self.color
+        for row in range( y0, y1 ):
+            gap   = lids.gap( level, row )
+            split = min( center - gap, right )
+            if ( split > left ):
+                tile.fill_rect( scene.place( left, split - left ), row - y0, split - left, 1, color )
+            split = max( center + gap, left )
+            if ( right > split ):
+                tile.fill_rect( scene.place( split, right - split ), row - y0, right - split, 1, color )
+
+
+##
+## Class TextLayer
+##
+class TextLayer( Layer ):
+    '''
+    A line of HUD text in framebuf's 8 x 8 font.  On a mirrored display
+    the text reads mirrored, like everything else on that panel.
+    '''
+
+    def __init__( self, text, x, y, color=0xFFFF ):
+        super().__init__( x, y, 8 * len( text ), 8 )
+        self.text  = text
+        self.color = native( color )
+
+    def setText( self, text ):
+        if ( text == self.text ):
+            return
+        self.invalidate()
+        self.text  = text
+        self.width = 8 * len( text )
+        self.invalidate()
+
+    def render( self, scene, tile, y0, y1 ):
+        tile.text( self.text, scene.place( self.x, self.width ), self.y - y0, self.color )
+
+
+##
+## Class Scene
+##
+class Scene:
+    '''
+    Layers of one display, drawn in the order they were added (the first
+    at the bottom).  The bottom layer must cover the whole display (a
+    ColorLayer or ScleraLayer), since the tile is not cleared between bands.
+
+    add( layer )            - put a layer on top and invalidate its area
+    invalidate( x, y, w, h) - add a rectangle to the region to redraw
+    render()                - redraw the dirty region; returns False if
+                              there was nothing to do
+
+    The dirty region is one bounding box, like the erase and draw box of
+    Eyeball.drawAt.  On a mirrored display (see GC9A01.set_mirror) each
+    band is sent reversed, so layers are placed in the tile from the other
+    side (see place()) and appear mirrored as a whole.
+    '''
+
+    def __init__( self, display, layers=(), tilePixels=TILE_PIXELS ):
+        if ( framebuf is None ):
+            raise RuntimeError( "eyeScene needs the framebuf module (MicroPython)" )
+        self.display    = display
+        self.layers     = []
+        self.tilePixels = tilePixels
+        self.tile       = None
+        self.frames     = {}    # ( width << 16 ) | rows -> tile FrameBuffer
+        self.views      = {}    # ( width << 16 ) | rows -> view of the tile buffer
+        self.tileBytes  = None
+        self.tileX      = 0
+        self.tileWidth  = 0
+        self.clean()
+
+        for layer in layers:
+            self.add( layer )
+
+    def clean( self ):
+        self.dirtyX0 = self.display.width
+        self.dirtyY0 = self.display.height
+        self.dirtyX1 = 0
+        self.dirtyY1 = 0
+
+    def add( self, layer ):
+        layer.scene = self
+        self.layers.append( layer )
+        layer.invalidate()
+        return layer
+
+    def invalidate( self, x, y, width, height ):
+        if ( width <= 0 or height <= 0 ):
+            return
+        self.dirtyX0 = min( self.dirtyX0, x )
+        self.dirtyY0 = min( self.dirtyY0, y )
+        self.dirtyX1 = max( self.dirtyX1, x + width )
+        self.dirtyY1 = max( self.dirtyY1, y + height )
+
+    def invalidateAll( self ):
+        self.invalidate( 0, 0, self.display.width, self.display.height )
+
+    def place( self, x, width ):
+        # Tile column of the first column of a rectangle at display column
+        # x, width wide, in the band being rendered
+        if ( self.display.mirror ):
+            return self.tileX + self.tileWidth - x - width
+        return x - self.tileX
+
+    def tileFrame( self, width, rows ):
+        # FrameBuffer and byte view of the start of the tile for a band of
+        # width x rows, kept per shape so rendering does not allocate
+        shape = ( width << 16 ) | rows
+        frame = self.frames.get( shape )
+        if ( frame is None ):
+            if ( len( self.frames ) >= TILE_SHAPES ):
+                self.frames = {}
+                self.views  = {}
+            view  = self.tile[ 0 : width * rows * 2 ]
+            frame = framebuf.FrameBuffer( view, width, rows, framebuf.RGB565 )
+            self.frames[ shape ] = frame
+            self.views[ shape ]  = view
+        self.tileBytes = self.views[ shape ]
+        return frame
+
+    def render( self ):
+        display = self.display
+        x0 = max( self.dirtyX0, 0 )
+        y0 = max( self.dirtyY0, 0 )
+        x1 = min( self.dirtyX1, display.width )
+        y1 = min( self.dirtyY1, display.height )
+        self.clean()
+        if ( x0 >= x1 or y0 >= y1 ):
+            return False
+
+        if ( self.tile is None ):
+            self.tile = pixelArena.get( "scene tile", self.tilePixels * 2 )
+
+        width   = x1 - x0
+        perBand = max( 1, self.tilePixels // width )
+        layers  = self.layers
+        self.tileX     = x0
+        self.tileWidth = width
+        row = y0
+        while ( row < y1 ):
+            rows = min( perBand, y1 - row )
+            tile = self.tileFrame( width, rows )
+            for i in range( len( layers ) ):
+                layer = layers[ i ]
+                if ( layer.visible and layer.overlaps( x0, row, x1, row + rows ) ):
+                    layer.render( self, tile, row, row + rows )
+            display.blit_buffer( self.tileBytes, x0, row, width, rows )
+            row += rows
+        return True
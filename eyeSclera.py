@@ -0,0 +1,216 @@
+##
+# ScleraBackground Class
+#
+# A full panel background image (the white of the eye with veins and
+# shading) kept as 4 bit palette indices, so that erasing behind a moving
+# iris restores the texture instead of filling with one color.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeSclera.py
+
+    Module: Compact textured sclera background with region restore.
+
+    The background is size x size pixels of 16 palette colors, two pixels
+    per byte (a 240 x 240 panel takes 28800 bytes instead of 115200 as
+    RGB565).  restore() decodes only the requested rectangle into a small
+    block buffer and sends it, so erasing costs the bytes of the uncovered
+    region and not of the whole panel.
+
+    File format (see saveSclera / loadSclera), little endian:
+        'SCLR', size (H), 16 palette colors (H, normal RGB565), indices
+"""
+
+import ustruct as struct
+
+from random import getrandbits
+
+import pixelArena
+
+from eyeIris import blendColor
+from eyeMath import isqrt
+from eyePath import WAVE_TABLES, WAVE_SHIFT, SINE
+
+## Colors per background
+SCLERA_COLORS = 16
+
+## Pixels decoded per blit; the block buffer is twice this many bytes
+BLOCK_PIXELS  = 1024
+
+_SCLERA_MAGIC  = b'SCLR'
+_SCLERA_HEADER = "<4sH"
+
+##
+## Class ScleraBackground
+##
+class ScleraBackground:
+    '''
+    palette - 16 normal RGB565 colors
+    indices - bytearray of size * size / 2, even column in the high nibble
+
+    restore( display, x, y, width, height ) redraws a rectangle of the
+    background; fill( display ) redraws the whole panel.  On a mirrored
+    display (see GC9A01.set_mirror) the whole background appears mirrored,
+    so a restored region is taken from the mirrored columns to match.
+    '''
+
+    def __init__( self, size, palette, indices ):
+        self.size    = size
+        self.indices = indices
+        self.high    = bytearray( SCLERA_COLORS )
+        self.low     = bytearray( SCLERA_COLORS )
+        self.setPalette( palette )
+        self.block   = None
+        self.views   = {}     # Pixel count -> view of the start of block
+
+    def setPalette( self, palette ):
+        # Colors as the two bytes sent for each pixel, high byte first
+        for i in range( SCLERA_COLORS ):
+            self.high[ i ] = palette[ i ] >> 8
+            self.low[ i ]  = palette[ i ] & 0xFF
+
+    def fill( self, display ):
+        self.restore( display, 0, 0, self.size, self.size )
+
+    def restore( self, display, x, y, width, height ):
+        # Clip to the background, then send as many rows per blit as fit
+        # in the block buffer
+        if ( x < 0 ):
+            width += x
+            x      = 0
+        if ( y < 0 ):
+            height += y
+            y       = 0
+        width  = min( width,  self.size - x )
+        height = min( height, self.size - y )
+        if ( width <= 0 or height <= 0 ):
+            return
+
+        if ( self.block is None ):
+            self.block = pixelArena.get( "sclera block", BLOCK_PIXELS * 2 )
+        block   = self.block
+        column  = ( self.size - x - width ) if display.mirror else x
+        perBlit = max( 1, BLOCK_PIXELS // width )
+        row     = y
+        end     = y + height
+        while ( row < end ):
+            rows = min( perBlit, end - row )
+            self.decode( block, column, row, width, rows )
+            display.blit_buffer( self.blockView( width * rows ), x, row, width, rows )
+            row += rows
+
+    def blockView( self, pixels ):
+        # Views are kept per size, like GC9A01._fill_view, so erasing the
+        # same strip every frame does not allocate
+        view = self.views.get( pixels )
+        if ( view is None ):
+            view = self.block[ 0 : pixels * 2 ]
+            self.views[ pixels ] = view
+        return view
+
+    def decode( self, block, x, y, width, height ):
+        # Expand a rectangle of indices into RGB565 pixels in block
+        indices = self.indices
+        high    = self.high
+        low     = self.low
+        size    = self.size
+        out     = 0
+        for row in range( y, y + height ):
+            base = row * size
+            for column in range( x, x + width ):
+                packed = indices[ ( base + column ) >> 1 ]
+                if ( column & 1 ):
+                    index = packed & 0x0F
+                else:
+                    index = packed >> 4
+                block[ out ]     = high[ index ]
+                block[ out + 1 ] = low[ index ]
+                out += 2
+
+
+# scleraBytes( size=240 )
+#
+# Bytes of pixel arena a size x size ScleraBackground takes, for sizing
+# pixelArena.init(): the packed color indices (owner "sclera") and the
+# block buffer restore() decodes into (owner "sclera block").
+def scleraBytes( size=240 ):
+    align = pixelArena.ALIGN - 1
+    return ( ( size * size // 2 + align ) & ~align ) + BLOCK_PIXELS * 2
+
+
+# renderSclera( size=240, veins=10, white=0xFFFF, shade=0xD69A, vein=0xC104 )
+#
+# Procedural sclera: white in the middle darkening toward shade at the edge
+# of the round panel, with thin random veins of color vein running inward
+# from the edge.  Palette entries 0-11 are the shading ramp and 12-15 the
+# vein from strong to faint.
+#
+# Returns a ScleraBackground.
+def renderSclera( size=240, veins=10, white=0xFFFF, shade=0xD69A, vein=0xC104 ):
+    palette = []
+    for i in range( 12 ):
+        palette.append( blendColor( white, shade, ( i * 256 ) // 11 ) )
+    for i in range( 4 ):
+        palette.append( blendColor( vein, white, i * 48 ) )
+
+    half    = size // 2
+    indices = pixelArena.get( "sclera", size * size // 2 )
+
+    # Shading ramp from the center (0) to the panel edge (11); it starts
+    # at a third of the radius so most of the eye stays white
+    inner = half // 3
+    for row in range( size ):
+        dy = row - half
+        for column in range( 0, size, 2 ):
+            dx    = column - half
+            shadeLevel = ( ( isqrt( dx * dx + dy * dy ) - inner ) * 11 ) // ( half - inner )
+            shadeLevel = min( max( shadeLevel, 0 ), 11 )
+            indices[ ( row * size + column ) >> 1 ] = ( shadeLevel << 4 ) | shadeLevel
+
+    # Veins: random walks from the edge toward the center, fading out
+    sine = WAVE_TABLES[ SINE ]
+    for _ in range( veins ):
+        angle  = getrandbits( 8 )
+        x      = half + ( ( half * sine[ ( angle + 64 ) & 255 ] ) >> WAVE_SHIFT )
+        y      = half + ( ( half * sine[ angle ] ) >> WAVE_SHIFT )
+        length = half // 2 + getrandbits( 5 )
+        for step in range( length ):
+            x += ( ( half - x ) * 2 ) // half + getrandbits( 2 ) - 1
+            y += ( ( half - y ) * 2 ) // half + getrandbits( 2 ) - 1
+            if ( 0 <= x < size and 0 <= y < size ):
+                _setIndex( indices, size, x, y, 12 + ( step * 4 ) // length )
+
+    return ScleraBackground( size, palette, indices )
+
+def _setIndex( indices, size, x, y, index ):
+    offset = ( y * size + x ) >> 1
+    if ( x & 1 ):
+        indices[ offset ] = ( indices[ offset ] & 0xF0 ) | index
+    else:
+        indices[ offset ] = ( indices[ offset ] & 0x0F ) | ( index << 4 )
+
+# saveSclera( sclera, fileName )
+#
+# Writes the background in the SCLR file format.
+def saveSclera( sclera, fileName ):
+    with open( fileName, "wb" ) as f:
+        f.write( struct.pack( _SCLERA_HEADER, _SCLERA_MAGIC, sclera.size ) )
+        for i in range( SCLERA_COLORS ):
+            f.write( struct.pack( "<H", ( sclera.high[ i ] << 8 ) | sclera.low[ i ] ) )
+        f.write( sclera.indices )
+
+# loadSclera( fileName )
+#
+# Reads a background written by saveSclera, with the indices read straight
+# into a pixel arena block.
+def loadSclera( fileName ):
+    with open( fileName, "rb" ) as f:
+        magic, size = struct.unpack( _SCLERA_HEADER, f.read( struct.calcsize( _SCLERA_HEADER ) ) )
+        if ( magic != _SCLERA_MAGIC ):
+            raise ValueError( "Not a sclera file: {}".format( fileName ) )
+        palette = struct.unpack( "<{}H".format( SCLERA_COLORS ), f.read( 2 * SCLERA_COLORS ) )
+        indices = pixelArena.get( "sclera", size * size // 2 )
+        f.readinto( indices )
+    return ScleraBackground( size, palette, indices )
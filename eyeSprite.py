@@ -0,0 +1,119 @@
+##
+# PaddedSprite Class
+#
+# Copies of an eye image surrounded by a margin of background color.  When
+# the eye moves by no more than the margin, one blit of the padded copy at
+# the new position both erases the trailing edge of the old image and draws
+# the new one, so a step (including a diagonal one) is a single window.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeSprite.py
+
+    Module: Background padded eye images for single-window moves.
+"""
+
+import pixelArena
+
+# padImage( buffer, width, height, marginX, marginY, background, target=None )
+#
+# Builds a (width + 2 * marginX) x (height + 2 * marginY) RGB565 image with
+# the source image in the middle and background color all around it.
+#
+# Returns the padded buffer (target if one was given).
+def padImage( buffer, width, height, marginX, marginY, background, target=None ):
+    paddedWidth  = width  + 2 * marginX
+    paddedHeight = height + 2 * marginY
+    rowBytes     = paddedWidth * 2
+    if ( target is None ):
+        target = bytearray( rowBytes * paddedHeight )
+
+    # One row of background, copied over the margins
+    backgroundRow = bytearray( [ background >> 8, background & 0xFF ] ) * paddedWidth
+    source        = memoryview( buffer )
+    marginBytes   = marginX * 2
+    imageBytes    = width * 2
+
+    for row in range( paddedHeight ):
+        start = row * rowBytes
+        if ( row < marginY or row >= marginY + height ):
+            target[ start : start + rowBytes ] = backgroundRow
+            continue
+        src = ( row - marginY ) * imageBytes
+        target[ start : start + marginBytes ] = backgroundRow[ 0 : marginBytes ]
+        target[ start + marginBytes : start + marginBytes + imageBytes ] = source[ src : src + imageBytes ]
+        target[ start + marginBytes + imageBytes : start + rowBytes ] = backgroundRow[ 0 : marginBytes ]
+
+    return target
+
+
+##
+## Class PaddedSprite
+##
+class PaddedSprite:
+    '''
+    Padded copies of one eye image, one per (stepX, stepY) step size the eye
+    is expected to move with.  Each copy has a margin of exactly the step
+    size, so it covers both the old and the new position of a single step
+    and no more.  Copies are keyed by stepX * 256 + stepY rather than by a
+    tuple so that looking one up does not allocate in the frame loop.
+
+    The copies are built once (from the pixel arena, owners "<owner>
+    <x>x<y>"; owner is one per instance by default) and shared by every
+    Eyeball showing the same image.  Each costs
+    (width + 2 * stepX) * (height + 2 * stepY) * 2 bytes; see paddedBytes()
+    to size the arena for them.
+
+    cover( dx, dy ) picks the first copy, in the order the steps were
+    given, whose margins cover a move of dx, dy pixels, so eyes moved by
+    elapsed time (a few pixels a frame) use one copy for every small step.
+    '''
+
+    def __init__( self, buffer, width, height, background=0xFFFF, steps=((1, 1),),
+                  owner=None ):
+        self.width      = width
+        self.height     = height
+        self.background = background
+        self.buffers    = {}
+        self.keys       = []
+        self.owner      = owner if owner is not None else "pad {}".format( id( self ) )
+        for step in steps:
+            self.addStep( buffer, step[0], step[1] )
+
+    def addStep( self, buffer, stepX, stepY ):
+        size  = ( self.width + 2 * stepX ) * ( self.height + 2 * stepY ) * 2
+        owner = "{} {}x{}".format( self.owner, stepX, stepY )
+        self.buffers[ stepX * 256 + stepY ] = padImage( buffer, self.width, self.height,
+                                                        stepX, stepY, self.background,
+                                                        pixelArena.get( owner, size ) )
+        self.keys.append( stepX * 256 + stepY )
+
+    def hasStep( self, stepX, stepY ):
+        return ( stepX * 256 + stepY ) in self.buffers
+
+    def cover( self, dx, dy ):
+        # Key of a copy whose margins cover a move of dx, dy, or -1
+        dx = abs( dx )
+        dy = abs( dy )
+        for key in self.keys:
+            if ( ( key >> 8 ) >= dx and ( key & 0xFF ) >= dy ):
+                return key
+        return -1
+
+    def draw( self, display, x, y, stepX, stepY ):
+        # Draw the padded copy for the step size with the image at (x, y)
+        display.blit_buffer( self.buffers[ stepX * 256 + stepY ], x - stepX, y - stepY,
+                             self.width + 2 * stepX, self.height + 2 * stepY )
+
+
+# paddedBytes( width, height, steps )
+#
+# Bytes of pixel arena taken by the padded copies of a width x height
+# image for the ( stepX, stepY ) steps of a PaddedSprite.
+def paddedBytes( width, height, steps ):
+    size = 0
+    for step in steps:
+        size += ( width + 2 * step[0] ) * ( height + 2 * step[1] ) * 2
+    return size
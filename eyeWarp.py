@@ -0,0 +1,284 @@
+##
+# GazeWarp Class
+#
+# Perspective for the iris: when a real eye turns to the side the iris is
+# seen at an angle and foreshortens into an ellipse.  Variants of the eye
+# image for a few gaze angles are generated from the one source image,
+# on the host or at boot, and kept as row span deltas against it.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    eyeWarp.py
+
+    Module: Pre-warped iris variants keyed by quantized gaze angle.
+
+    The gaze angle is quantized to steps levels either side of straight
+    ahead on each axis, giving ( 2 * steps + 1 ) ** 2 variants.  Each
+    frame the eye picks the variant nearest its position on the display;
+    the images of recently used variants are kept composed in an LRUCache,
+    so switching between them costs nothing but the blit that moving the
+    eye needs anyway.  The images are pixel arena blocks (see warpBytes),
+    not heap buffers.
+
+    File format (see saveWarps / loadWarps), little endian:
+        'WARP', steps (H), maxAngle (H), width (H), height (H),
+        then per variant: span triple count (H), data bytes (I), spans, data
+"""
+
+import math
+import ustruct as struct
+
+import pixelArena
+
+from eyeCache  import LRUCache
+from eyeDelta  import makeDelta
+
+_FILE_MAGIC  = b'WARP'
+_FILE_HEADER = "<4sHHHH"
+_SPAN_HEADER = "<HI"         # span triple count, data byte count
+
+## Gaze angle at the end of the travel range, in degrees
+MAX_ANGLE = 35
+
+
+# warpBytes( width, height, cacheEntries=3 )
+#
+# Bytes of pixel arena a GazeWarp of cacheEntries images of width x height
+# takes, for sizing pixelArena.init().  A new variant is composed before
+# the oldest is evicted, so that is one image more than the cache holds.
+def warpBytes( width, height, cacheEntries=3 ):
+    return ( cacheEntries + 1 ) * ( ( width * height * 2 + pixelArena.ALIGN - 1 ) & ~( pixelArena.ALIGN - 1 ) )
+
+
+# warpKey( steps, levelX, levelY )
+#
+# Variant number of gaze levels levelX, levelY (each -steps to steps).
+def warpKey( steps, levelX, levelY ):
+    return ( levelY + steps ) * ( 2 * steps + 1 ) + levelX + steps
+
+
+# makeWarpVariant( buffer, width, height, levelX, levelY, steps,
+#                  maxAngle=MAX_ANGLE, key=0xFFFF )
+#
+# Renders the RGB565 image as seen with the gaze turned by levelX / steps
+# and levelY / steps of maxAngle.  The image is squeezed by the cosine of
+# the angle along the direction of the gaze, about its center; pixels
+# that sample outside the image get the key color (the background of the
+# eye image).
+#
+# Returns a bytearray of the whole image.
+def makeWarpVariant( buffer, width, height, levelX, levelY, steps,
+                     maxAngle=MAX_ANGLE, key=0xFFFF ):
+    variant = bytearray( buffer )
+    length  = math.sqrt( levelX * levelX + levelY * levelY )
+    if ( length == 0 ):
+        return variant
+
+    angle   = math.radians( maxAngle * min( length / steps, 1.0 ) )
+    stretch = 1.0 / math.cos( angle ) - 1.0
+    unitX   = levelX / length
+    unitY   = levelY / length
+    centerX = ( width  - 1 ) / 2
+    centerY = ( height - 1 ) / 2
+
+    for row in range( height ):
+        dy = row - centerY
+        for column in range( width ):
+            dx    = column - centerX
+            along = ( dx * unitX + dy * unitY ) * stretch
+            sx    = int( round( centerX + dx + along * unitX ) )
+            sy    = int( round( centerY + dy + along * unitY ) )
+            dst   = ( row * width + column ) * 2
+            if ( 0 <= sx < width and 0 <= sy < height ):
+                src = ( sy * width + sx ) * 2
+                variant[ dst ]     = buffer[ src ]
+                variant[ dst + 1 ] = buffer[ src + 1 ]
+            else:
+                variant[ dst ]     = key >> 8
+                variant[ dst + 1 ] = key & 0xFF
+
+    return variant
+
+
+# makeWarpVariants( buffer, width, height, steps=1, maxAngle=MAX_ANGLE, key=0xFFFF )
+#
+# Generates the SpanDelta of every variant, indexed by warpKey(); the
+# straight ahead variant is an empty delta.
+#
+# Returns a list of SpanDelta for GazeWarp.
+def makeWarpVariants( buffer, width, height, steps=1, maxAngle=MAX_ANGLE, key=0xFFFF ):
+    deltas = []
+    for levelY in range( -steps, steps + 1 ):
+        for levelX in range( -steps, steps + 1 ):
+            variant = makeWarpVariant( buffer, width, height, levelX, levelY, steps, maxAngle, key )
+            deltas.append( makeDelta( buffer, variant, width, height ) )
+    return deltas
+
+
+# saveWarps( fileName, deltas, steps, maxAngle=MAX_ANGLE )
+#
+# Writes generated variants to a binary file so they can be produced on the
+# host and only loaded on the device.
+def saveWarps( fileName, deltas, steps, maxAngle=MAX_ANGLE ):
+    with open( fileName, "wb" ) as f:
+        f.write( struct.pack( _FILE_HEADER, _FILE_MAGIC, steps, maxAngle,
+                              deltas[0].width, deltas[0].height ) )
+        for delta in deltas:
+            f.write( struct.pack( _SPAN_HEADER, len( delta.spans ), len( delta.data ) ) )
+            f.write( delta.spans )
+            f.write( delta.data )
+
+
+# loadWarps( fileName )
+#
+# Indexes variants written by saveWarps().  Only the span tables are read;
+# the pixels stay in the file until a variant is composed, so the variants
+# of a whole image cost a few hundred bytes of RAM.  The file is left open
+# for the deltas to read from (see GazeWarp.close).
+#
+# Returns (steps, deltas) for GazeWarp.
+def loadWarps( fileName ):
+    deltas = []
+    f = open( fileName, "rb" )
+    try:
+        header = f.read( struct.calcsize( _FILE_HEADER ) )
+        magic, steps, maxAngle, width, height = struct.unpack( _FILE_HEADER, header )
+        if ( magic != _FILE_MAGIC ):
+            raise ValueError( "Not a gaze warp file: {}".format( fileName ) )
+
+        spanHeader = struct.calcsize( _SPAN_HEADER )
+        for _ in range( ( 2 * steps + 1 ) ** 2 ):
+            spanCount, dataCount = struct.unpack( _SPAN_HEADER, f.read( spanHeader ) )
+            spans = bytearray( spanCount * 2 )
+            if ( f.readinto( spans ) != len( spans ) ):
+                raise ValueError( "Truncated gaze warp file: {}".format( fileName ) )
+            deltas.append( FileDelta( f, width, height, spans, f.tell() ) )
+            f.seek( dataCount, 1 )
+    except:
+        f.close()
+        raise
+
+    return steps, deltas
+
+
+##
+## Class FileDelta
+##
+class FileDelta:
+    '''
+    A SpanDelta whose pixel data stays in a file written by saveWarps().
+    applyTo() reads each span straight into the target buffer from the
+    open file, which every delta of the file shares.
+    '''
+
+    def __init__( self, file, width, height, spans, offset ):
+        self.file     = file
+        self.width    = width
+        self.height   = height
+        self.spans    = spans       # Little endian [row, first, count] triples
+        self.offset   = offset      # File position of the pixel data
+
+    def applyTo( self, target, x0=0, y0=0, width=None ):
+        if ( width is None ):
+            width = self.width
+        spans  = self.spans
+        view   = memoryview( target )
+        f      = self.file
+        f.seek( self.offset )
+        for i in range( 0, len( spans ), 6 ):
+            row   = spans[ i ]     | ( spans[ i + 1 ] << 8 )
+            first = spans[ i + 2 ] | ( spans[ i + 3 ] << 8 )
+            count = spans[ i + 4 ] | ( spans[ i + 5 ] << 8 )
+            start = ( ( row - y0 ) * width + first - x0 ) * 2
+            f.readinto( view[ start : start + count * 2 ] )
+
+
+##
+## Class GazeWarp
+##
+class GazeWarp:
+    '''
+    Picks and composes the warped variant of an eye image for a position.
+
+    buffer  - RGB565 source image (shared, never modified)
+    steps   - gaze levels either side of straight ahead
+    deltas  - SpanDelta (or FileDelta) per variant, indexed by warpKey()
+
+    image( key ) returns the variant's whole image, composed on first use
+    and kept in an LRUCache of cacheEntries images.  Every eye showing a
+    variant pins it (see Eyeball.setWarp), so a buffer on a display is
+    never reused for another variant; buffers of evicted variants are.
+    The straight ahead variant is the source buffer itself.
+
+    Image buffers are pixel arena blocks, owners "<owner> 0", "<owner> 1"
+    and so on, taken as the cache fills; owner is one per instance by
+    default.  warpBytes() is the arena they need.
+    close() gives them back and closes the variant file.
+    '''
+
+    def __init__( self, buffer, width, height, steps, deltas, cacheEntries=3, owner=None ):
+        self.buffer = buffer
+        self.width  = width
+        self.height = height
+        self.steps  = steps
+        self.deltas = deltas
+        self.center = warpKey( steps, 0, 0 )
+        self.spare  = []
+        self.made   = 0
+        self.owner  = owner if owner is not None else "warp {}".format( id( self ) )
+        self.cache  = LRUCache( cacheEntries, onEvict=self.recycle )
+
+    def keyFor( self, eye, x, y ):
+        # Variant for eye at (x, y): the offset from the center position
+        # as a share of the travel either side of it, rounded to a level
+        steps  = self.steps
+        rangeX = max( 1, eye.rangeX // 2 + eye.overscan )
+        rangeY = max( 1, eye.rangeY // 2 + eye.overscan )
+        levelX = ( 2 * ( x - eye.CENTER_X ) * steps + rangeX ) // ( 2 * rangeX )
+        levelY = ( 2 * ( y - eye.CENTER_Y ) * steps + rangeY ) // ( 2 * rangeY )
+        levelX = min( max( levelX, -steps ), steps )
+        levelY = min( max( levelY, -steps ), steps )
+        return warpKey( steps, levelX, levelY )
+
+    def image( self, key ):
+        # Image of variant key, pinned until release( key )
+        if ( key == self.center ):
+            return self.buffer
+        image = self.cache.getOrCreate( key, self.compose )
+        self.cache.pin( key )
+        return image
+
+    def release( self, key ):
+        if ( key != self.center ):
+            self.cache.unpin( key )
+
+    def compose( self, key ):
+        if ( self.spare ):
+            image = self.spare.pop()
+        else:
+            image = pixelArena.get( "{} {}".format( self.owner, self.made ), len( self.buffer ) )
+            self.made += 1
+        image[ : ] = self.buffer
+        self.deltas[ key ].applyTo( image )
+        return image
+
+    def recycle( self, key, image ):
+        # Keep evicted images for the next compose
+        self.spare.append( image )
+
+    def close( self ):
+        # Give the image buffers back to the arena and close the variant
+        # file; no eye may show a variant afterwards
+        self.cache.clear()
+        self.spare = []
+        for i in range( self.made ):
+            pixelArena.release( "{} {}".format( self.owner, i ) )
+        self.made = 0
+        files = []
+        for delta in self.deltas:
+            if ( isinstance( delta, FileDelta ) and delta.file not in files ):
+                files.append( delta.file )
+        for f in files:
+            f.close()
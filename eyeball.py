@@ -13,7 +13,12 @@
     Module: Class that contains information about an eye ball bitmap.
 """
 
+from array   import array
+
 from machine import ADC,  Pin
+from utime   import ticks_diff
+
+from eyeMath import isqrt
 
 ## Potentiometer Pins
 # PIN_ADC_LEFT    =  Pin(27, mode=Pin.IN, pull=Pin.PULL_DOWN)
@@ -27,6 +32,97 @@ potMax          =  const(65535)
 ## Debug mode on if True
 DEBUG_MODE = False
 
+## Default eyelid color, a skin tone (normal RGB565)
+LID_COLOR  = 0xE56D
+
+##
+## Class EyelidCurve
+##
+class EyelidCurve:
+    '''
+    Precomputed lid edge tables for a size x size display, shared by every
+    eye on a display of that size.
+
+    Each lid edge is a parabola with its apex on the vertical center line;
+    it bends radius pixels away from the apex over radius pixels sideways.
+    A row d rows past the apex is open for curve[ d ] pixels either side of
+    the center line.  apexUpper / apexLower hold the apex row of each lid
+    for every openness level, from 0 (closed) to levels - 1 (fully open).
+
+    gap( level, row ) is the half width of the open span of row at level:
+    columns center - gap to center + gap - 1 show the eye, the rest of the
+    row is lid.  0 means the row is all lid.  With roundPanel the gap never
+    exceeds the visible half width of the row on the round panel, so lid
+    pixels in the hidden corners are never sent.
+
+    The gaps of every level are worked out once into spans ( levels x size,
+    one byte each while the half width fits), so gap() is one lookup.
+    Rows firstOpen[ level ] to lastOpen[ level ] - 1 are the only rows
+    with a gap at that level.
+    '''
+
+    def __init__( self, size=240, levels=16, radius=120, color=LID_COLOR, roundPanel=True ):
+        self.size    = size
+        self.center  = size // 2
+        self.levels  = levels
+        self.color   = color
+
+        center       = self.center
+        self.curve   = array('h', bytes( 2 * ( size + 1 ) ))
+        for depth in range( size + 1 ):
+            self.curve[ depth ] = min( isqrt( depth * radius ), center )
+
+        # Visible half width of each row; rows are sampled at their middle
+        self.visible = array('h', bytes( 2 * size ))
+        for row in range( size ):
+            if ( roundPanel ):
+                offset = 2 * ( row - center ) + 1
+                self.visible[ row ] = min( ( isqrt( 4 * center * center - offset * offset ) + 1 ) >> 1, center )
+            else:
+                self.visible[ row ] = center
+
+        # Open: the lid edge reaches the panel edge only at the corners
+        closed          = center
+        openUpper       = -( ( center * center ) // radius )
+        self.apexUpper  = array('h', bytes( 2 * levels ))
+        self.apexLower  = array('h', bytes( 2 * levels ))
+        for level in range( levels ):
+            apex = closed + ( ( openUpper - closed ) * level ) // ( levels - 1 )
+            self.apexUpper[ level ] = apex
+            self.apexLower[ level ] = size - 1 - apex
+
+        if ( center < 256 ):
+            self.spans = bytearray( levels * size )
+        else:
+            self.spans = array('H', bytes( 2 * levels * size ))
+        self.firstOpen = array('h', bytes( 2 * levels ))
+        self.lastOpen  = array('h', bytes( 2 * levels ))
+        for level in range( levels ):
+            first = size
+            last  = 0
+            for row in range( size ):
+                gap = self.span( level, row )
+                self.spans[ level * size + row ] = gap
+                if ( gap > 0 ):
+                    first = min( first, row )
+                    last  = row + 1
+            self.firstOpen[ level ] = min( first, last )
+            self.lastOpen[ level ]  = last
+
+    def span( self, level, row ):
+        # Half width of the open span, from the curve (see gap())
+        below = row - self.apexUpper[ level ]
+        above = self.apexLower[ level ] - row
+        if ( below <= 0 or above <= 0 ):
+            return 0
+        size = self.size
+        return min( self.curve[ below if below < size else size ],
+                    self.curve[ above if above < size else size ],
+                    self.visible[ row ] )
+
+    def gap( self, level, row ):
+        return self.spans[ level * self.size + row ]
+
 ##
 ## Class Eyeball
 ##
@@ -50,6 +146,11 @@ class Eyeball:
     MOVE_UP    = -1
     MOVE_DOWN  =  1
     
+    # Image quality settings (see setQuality)
+    QUALITY_FULL = 0    # Always draw the full resolution buffer
+    QUALITY_LOW  = 1    # Always draw the reduced resolution buffer
+    QUALITY_AUTO = 2    # Reduced resolution only while moving fast
+    
     def __init__(self, eyeBuffer, width, height, display, maxX=240,  maxY=240, background=0xFFFF):
         self.buffer     = eyeBuffer
         self.width      = width
@@ -79,8 +180,56 @@ class Eyeball:
         self.factorX    = potMax / (self.maxX - self.width)
         self.factorY    = potMax / (self.maxY - self.height)
         
+        # Integer ranges used by changeDestination() so that reading the
+        # potentiometers does not create floating point objects every frame
+        self.rangeX     = self.maxX - self.width
+        self.rangeY     = self.maxY - self.height
+        
+        # Pixels the iris may move past each edge of the display (see setOverscan)
+        self.overscan   = 0
+        
+        # Send only the pixels inside the round panel (see setRoundMask)
+        self.roundMask  = False
+        
         self.delta      = 1 # destination is the same if within +/- delta
 
+        # Optional pupil dilation (see eyePupil.PupilDilation)
+        #    pupilLevel of None means the undilated source image
+        self.pupil      = None
+        self.pupilLevel = None
+
+        # Optional textured background (see setSclera)
+        self.sclera     = None
+
+        # Optional compositing over the textured background (see setComposite)
+        self.composite  = None
+
+        # Optional gaze dependent variants of the image (see setWarp)
+        #    warpKey is the variant self.buffer holds now
+        self.warp       = None
+        self.warpKey    = 0
+
+        # Optional background padded copies of the buffer (see eyeSprite.PaddedSprite)
+        self.padded     = None
+
+        # Optional time based motion (see setMotion)
+        self.motion     = None
+
+        # Optional eyelids (see setLids)
+        #    lidLevel from 0 (closed) to lids.levels - 1 (open)
+        self.lids       = None
+        self.lidLevel   = 0
+        self.blinkStart = 0
+        self.blinkClose = 0
+        self.blinkOpen  = 0
+        self.blinking   = False
+
+        # Optional reduced resolution copy of the buffer (see setLowResolution)
+        self.lowBuffer  = None
+        self.lowScale   = 1
+        self.quality    = self.QUALITY_FULL
+        self.fastStep   = 2 # QUALITY_AUTO uses lowBuffer for steps >= fastStep
+
         # Initialize display to background color
         self.display.fill(self.background)
         
@@ -96,10 +245,404 @@ class Eyeball:
         print("Display Height:  ", self.maxY)
         
     def clear(self):
-        self.display.fill(self.background)
+        if ( self.sclera is not None ):
+            self.sclera.fill( self.display )
+        else:
+            self.display.fill(self.background)
+        
+        # Clearing the display removes the lids: they are open again
+        if ( self.lids is not None ):
+            self.lidLevel = self.lids.levels - 1
+            self.blinking = False
         
     def show(self):
-        self.display.blit_buffer( self.buffer, self.x, self.y, self.width, self.height )
+        self.selectWarp()
+        self.drawImage()
+        if ( not self.lidsOpen() ):
+            self.coverLids( self.x, self.y, self.width, self.height )
+        
+    def drawImage(self):
+        # Draw the eye image (and pupil) at (x, y), ignoring the lids
+        if ( self.useLowResolution() ):
+            self.display.blit_scaled( self.lowBuffer, self.x, self.y, self.width, self.height, self.lowScale )
+            return
+        image = self.shownImage()
+        if ( self.composited() ):
+            self.composite.draw( self.display, self.x, self.y, self.sclera, image,
+                                 self.pupilLevel )
+        else:
+            self.display.blit_buffer( image, self.x, self.y, self.width, self.height, None, self.roundMask )
+        
+    def composited( self ):
+        # True if the image is drawn through the composite
+        return self.composite is not None and self.sclera is not None and not self.warped()
+        
+    def shownImage( self ):
+        # The full resolution image as shown: with a dilated pupil that is
+        # the pupil variant of the whole image, so the pupil box is sent as
+        # part of the image and not a second time over it
+        if ( self.pupilLevel is not None and not self.warped() ):
+            return self.pupil.fullImage( self.pupilLevel )
+        return self.buffer
+        
+    def setImage( self, eyeBuffer, width, height ):
+        # Switch to a different eye design (e.g. from eyeAssets.AssetManager).
+        # Pupil, warp and reduced resolution copies belong to the old design
+        # and are dropped.  The eye keeps its position, clipped to the display.
+        self.buffer     = eyeBuffer
+        self.width      = width
+        self.height     = height
+        self.pupil      = None
+        self.pupilLevel = None
+        self.lowBuffer  = None
+        self.padded     = None
+        self.composite  = None
+        if ( self.warp is not None ):
+            self.warp.release( self.warpKey )
+            self.warp   = None
+        
+        self.CENTER_X   = int( (self.maxX - self.width)  / 2)
+        self.CENTER_Y   = int( (self.maxY - self.height) / 2)
+        self.factorX    = potMax / (self.maxX - self.width)
+        self.factorY    = potMax / (self.maxY - self.height)
+        self.rangeX     = self.maxX - self.width
+        self.rangeY     = self.maxY - self.height
+        
+        self.x          = min( self.x, self.maxX - self.width + self.overscan )
+        self.y          = min( self.y, self.maxY - self.height + self.overscan )
+        self.targetX    = min( self.targetX, self.maxX - self.width + self.overscan )
+        self.targetY    = min( self.targetY, self.maxY - self.height + self.overscan )
+        
+    def setOverscan( self, pixels ):
+        # Let the iris move up to pixels past every edge of the display,
+        # for a wider gaze range on the round panel.  The display clips
+        # whatever part of the image is off the panel.
+        self.overscan = pixels
+        
+    def setRoundMask( self, enable ):
+        # Only send pixels inside the round panel when drawing the full image
+        self.roundMask = enable
+        
+    def setMirror( self, enable ):
+        # Show the image reversed left to right on this eye's display, so one
+        # buffer serves both a left and a right eye.  Positions stay in
+        # unmirrored screen coordinates; the display flips the columns.
+        self.display.set_mirror( enable )
+        
+    def setSclera( self, sclera ):
+        # Use an eyeSclera.ScleraBackground instead of the background color.
+        # Erasing then restores the texture under the uncovered region.
+        # Call clear() afterwards to draw the whole background.
+        self.sclera = sclera
+        
+    def setComposite( self, composite ):
+        # Draw through an eyeComposite.CompositeSprite built from this eye's
+        # buffer, so the corners of the image show the sclera texture
+        # instead of the key color.  Only used while a sclera is set.
+        self.composite = composite
+        
+    def fillBackground( self, x, y, width, height ):
+        # Erase a rectangle to the background (color or sclera texture)
+        if ( self.sclera is not None ):
+            self.sclera.restore( self.display, x, y, width, height )
+        else:
+            self.display.fill_rect( x, y, width, height, self.background )
+        
+    def setWarp( self, warp ):
+        # Attach an eyeWarp.GazeWarp built from this eye's buffer; the eye
+        # then shows the variant for the gaze angle of its position.  The
+        # pupil dilation, padded and composite copies are of the unwarped
+        # image, so they are only used while the eye looks straight ahead.
+        if ( self.warp is not None ):
+            self.warp.release( self.warpKey )
+            self.buffer = self.warp.buffer
+        self.warp    = warp
+        self.warpKey = warp.center
+        self.selectWarp()
+        
+    def warped( self ):
+        return self.warp is not None and self.warpKey != self.warp.center
+        
+    def selectWarp( self ):
+        # Switch self.buffer to the variant for the current position
+        warp = self.warp
+        if ( warp is None ):
+            return
+        key = warp.keyFor( self, self.x, self.y )
+        if ( key == self.warpKey ):
+            return
+        self.buffer = warp.image( key )
+        warp.release( self.warpKey )
+        self.warpKey = key
+        
+    def setPadded( self, padded ):
+        # Attach an eyeSprite.PaddedSprite built from this eye's buffer
+        self.padded = padded
+        
+    def drawPadded( self, oldX, oldY ):
+        # Erase and draw a move from (oldX, oldY) in one blit of a padded
+        # copy whose margins cover it.
+        # Returns False if no padded copy fits this move.
+        if ( self.padded is None or self.sclera is not None or self.useLowResolution() ):
+            # Padded copies have a solid color margin
+            return False
+        if ( self.warped() or self.pupilLevel is not None ):
+            # Padded copies are of the unwarped image with the source pupil
+            return False
+        key = self.padded.cover( self.x - oldX, self.y - oldY )
+        if ( key < 0 ):
+            return False
+        stepX = key >> 8
+        stepY = key & 0xFF
+        
+        # The display clips the part of the padded window off the panel
+        self.padded.draw( self.display, self.x, self.y, stepX, stepY )
+        if ( not self.lidsOpen() ):
+            self.coverLids( self.x - stepX, self.y - stepY, self.width + 2 * stepX, self.height + 2 * stepY )
+        return True
+        
+    def setMotion( self, motion ):
+        # Attach an eyeMotion.Motion; animate() then moves the eye toward
+        # (targetX, targetY) by elapsed time instead of by stepX / stepY
+        motion.jumpTo( self.x, self.y )
+        self.motion = motion
+        
+    def animate( self, now ):
+        # Advance the attached motion to time now (ticks_ms) and redraw the
+        # eye if its pixel position changed
+        motion = self.motion
+        if ( motion.x != self.x or motion.y != self.y ):
+            # The eye was placed by other code (moveCenter, moveEyeball)
+            motion.jumpTo( self.x, self.y )
+        if ( motion.targetX != self.targetX or motion.targetY != self.targetY ):
+            motion.moveTo( self.targetX, self.targetY, now )
+        if ( motion.update( now ) ):
+            self.drawAt( motion.x, motion.y )
+        
+    def drawAt( self, newX, newY ):
+        # Move the eye to (newX, newY) in one go, erasing only the strips of
+        # the old image that the new one does not cover.  Jumps of any size
+        # cost at most two fills plus the blit.
+        oldX   = self.x
+        oldY   = self.y
+        dx     = newX - oldX
+        dy     = newY - oldY
+        if ( dx == 0 and dy == 0 ):
+            return
+        self.x = newX
+        self.y = newY
+        self.selectWarp()
+        
+        # Erase and draw in one window if a padded copy covers this step
+        if ( self.drawPadded( oldX, oldY ) ):
+            return
+        
+        width  = self.width
+        height = self.height
+        if ( abs( dx ) >= width or abs( dy ) >= height ):
+            # No overlap: erase the whole old image
+            self.fillBackground( oldX, oldY, width, height )
+        else:
+            # Column strip on the side the eye moved away from
+            if ( dx > 0 ):
+                self.fillBackground( oldX, oldY, dx, height )
+            elif ( dx < 0 ):
+                self.fillBackground( newX + width, oldY, -dx, height )
+            
+            # Row strip, skipping the columns already erased
+            left  = max( oldX, newX )
+            right = min( oldX, newX ) + width
+            if ( dy > 0 ):
+                self.fillBackground( left, oldY, right - left, dy )
+            elif ( dy < 0 ):
+                self.fillBackground( left, newY + height, right - left, -dy )
+        
+        self.drawImage()
+        if ( not self.lidsOpen() ):
+            # Lids over both the old and the new position
+            self.coverLids( min( oldX, newX ), min( oldY, newY ), width + abs( dx ), height + abs( dy ) )
+        
+    def setLids( self, lids ):
+        # Attach an EyelidCurve; the lids start fully open
+        self.lids     = lids
+        self.lidLevel = lids.levels - 1
+        self.blinking = False
+        
+    def lidsOpen( self ):
+        return self.lids is None or self.lidLevel == self.lids.levels - 1
+        
+    def setLidLevel( self, level ):
+        # Move the lids to openness level, drawing only the rows whose open
+        # span changes.  Neighbouring rows with the same change are drawn
+        # as one rectangle.
+        lids = self.lids
+        old  = self.lidLevel
+        if ( lids is None or level == old ):
+            return
+        
+        # Rows closed at both levels cannot change; walk the rest of the
+        # two span tables side by side
+        spans    = lids.spans
+        size     = lids.size
+        first    = min( lids.firstOpen[ old ], lids.firstOpen[ level ] )
+        last     = max( lids.lastOpen[ old ], lids.lastOpen[ level ] )
+        oldBase  = old * size
+        newBase  = level * size
+        runStart = -1
+        runOld   = 0
+        runNew   = 0
+        for row in range( first, last ):
+            gapOld = spans[ oldBase + row ]
+            gapNew = spans[ newBase + row ]
+            if ( runStart >= 0 and ( gapOld != runOld or gapNew != runNew ) ):
+                self.drawLidRows( runStart, row - runStart, runOld, runNew )
+                runStart = -1
+            if ( runStart < 0 and gapOld != gapNew ):
+                runStart = row
+                runOld   = gapOld
+                runNew   = gapNew
+        if ( runStart >= 0 ):
+            self.drawLidRows( runStart, last - runStart, runOld, runNew )
+        
+        self.lidLevel = level
+        
+    def drawLidRows( self, row, height, gapOld, gapNew ):
+        # Rows whose open span changed from gapOld to gapNew either side of
+        # the center line: paint lid over the part that closed, or restore
+        # the eye and background under the part that opened
+        center = self.lids.center
+        if ( gapNew < gapOld ):
+            color = self.lids.color
+            self.display.fill_rect( center - gapOld, row, gapOld - gapNew, height, color )
+            self.display.fill_rect( center + gapNew, row, gapOld - gapNew, height, color )
+        else:
+            self.restoreRect( center - gapNew, row, gapNew - gapOld, height )
+            self.restoreRect( center + gapOld, row, gapNew - gapOld, height )
+        
+    def restoreRect( self, x, y, width, height ):
+        # Redraw what lies under the lids in a rectangle: the part on the
+        # eye image from the buffer, the rest from the background
+        x0 = max( x, self.x )
+        y0 = max( y, self.y )
+        x1 = min( x + width,  self.x + self.width )
+        y1 = min( y + height, self.y + self.height )
+        if ( x0 >= x1 or y0 >= y1 ):
+            self.fillBackground( x, y, width, height )
+            return
+        
+        if ( y0 > y ):
+            self.fillBackground( x, y, width, y0 - y )
+        if ( y + height > y1 ):
+            self.fillBackground( x, y1, width, y + height - y1 )
+        if ( x0 > x ):
+            self.fillBackground( x, y0, x0 - x, y1 - y0 )
+        if ( x + width > x1 ):
+            self.fillBackground( x1, y0, x + width - x1, y1 - y0 )
+        
+        # On a mirrored display the columns come from the other side
+        column = x0 - self.x
+        if ( self.display.mirror ):
+            column = self.x + self.width - x1
+        image = self.shownImage()
+        if ( self.composited() and self.composite.cache is not None ):
+            # The kept composite, so the corners show the sclera
+            image = self.composite.compose( self.display, self.x, self.y, self.sclera, image,
+                                            self.pupilLevel )
+        start = ( ( y0 - self.y ) * self.width + column ) * 2
+        self.display.blit_buffer( image, x0, y0, x1 - x0, y1 - y0, self.width,
+                                  offset=start )
+        
+    def coverLids( self, x, y, width, height ):
+        # Paint the lids over a rectangle that was just drawn
+        lids     = self.lids
+        level    = self.lidLevel
+        center   = lids.center
+        color    = lids.color
+        y0       = max( y, 0 )
+        y1       = min( y + height, lids.size )
+        x1       = x + width
+        spans    = lids.spans
+        base     = level * lids.size
+        runStart = -1
+        runGap   = 0
+        for row in range( y0, y1 + 1 ):
+            gap = spans[ base + row ] if row < y1 else -1
+            if ( runStart >= 0 and gap != runGap ):
+                # Lid columns of the run that fall inside the rectangle
+                left  = min( center - runGap, x1 )
+                if ( left > x ):
+                    self.display.fill_rect( x, runStart, left - x, row - runStart, color )
+                right = max( center + runGap, x )
+                if ( right < x1 ):
+                    self.display.fill_rect( right, runStart, x1 - right, row - runStart, color )
+                runStart = -1
+            if ( runStart < 0 ):
+                runStart = row
+                runGap   = gap
+        
+    def blink( self, now, closeMs=70, openMs=110 ):
+        # Start a blink at time now (ticks_ms): close, then open again
+        if ( self.lids is None ):
+            return
+        self.blinkStart = now
+        self.blinkClose = closeMs
+        self.blinkOpen  = openMs
+        self.blinking   = True
+        
+    def updateBlink( self, now ):
+        # Advance a blink to time now.  Returns True while blinking.
+        if ( not self.blinking ):
+            return False
+        last    = self.lids.levels - 1
+        elapsed = ticks_diff( now, self.blinkStart )
+        if ( elapsed < self.blinkClose ):
+            level = last - ( elapsed * last ) // self.blinkClose
+        elif ( elapsed < self.blinkClose + self.blinkOpen ):
+            level = ( ( elapsed - self.blinkClose ) * last ) // self.blinkOpen
+        else:
+            level         = last
+            self.blinking = False
+        self.setLidLevel( level )
+        return self.blinking
+        
+    def setLowResolution( self, lowBuffer, scale=2 ):
+        # Attach a copy of the image reduced by scale (see eyeBitmap.halveEye).
+        # It is drawn enlarged to the same width and height as the buffer.
+        self.lowBuffer = lowBuffer
+        self.lowScale  = scale
+        
+    def setQuality( self, quality, fastStep=2 ):
+        self.quality  = quality
+        self.fastStep = fastStep
+        
+    def useLowResolution( self ):
+        # True if show() should draw the reduced resolution buffer
+        if ( self.lowBuffer is None or self.quality == self.QUALITY_FULL ):
+            return False
+        if ( self.quality == self.QUALITY_LOW ):
+            return True
+        
+        # QUALITY_AUTO: full resolution once the eye is still or has arrived
+        moving = ( self.horizontal != self.MOVE_STOP or self.vertical != self.MOVE_STOP )
+        if ( not moving or self.atDestination() ):
+            return False
+        return max( self.stepX, self.stepY ) >= self.fastStep
+        
+    def setPupil( self, pupil ):
+        # Attach a PupilDilation built from this eye's buffer
+        self.pupil      = pupil
+        self.pupilLevel = None
+        
+    def dilate( self, level ):
+        # Change the pupil dilation level, redrawing only the pupil ring.
+        #    level of None restores the source image
+        if ( self.pupil is None or level == self.pupilLevel ):
+            return
+        
+        previous        = self.pupilLevel
+        self.pupilLevel = level
+        if ( not self.warped() ):
+            self.pupil.draw( self.display, self.x, self.y, level, previous )
         
         
     def setDirection( self, newHorizontal = 0, newVertical = 0 ):
@@ -117,12 +660,12 @@ class Eyeball:
         if ( self.horizontal != self.MOVE_STOP ):
             if ( self.horizontal == self.MOVE_RIGHT ):
                 # Moving right
-                if ( (self.x + self.stepX + self.width) >= self.maxX ):
+                if ( (self.x + self.stepX + self.width) >= self.maxX + self.overscan ):
                     # Reverse direction
                     self.horizontal = self.MOVE_LEFT
             else:
                 # Moving left
-                if ( (self.x - self.stepX) < 0 ):
+                if ( (self.x - self.stepX) < -self.overscan ):
                     # Reverse Direction
                     self.horizontal = self.MOVE_RIGHT
           
@@ -134,12 +677,12 @@ class Eyeball:
         if ( self.vertical != self.MOVE_STOP ):
             if ( self.vertical == self.MOVE_UP ):
                 # Moving up
-                if ( ( self.y - self.stepY ) < 0 ):
+                if ( ( self.y - self.stepY ) < -self.overscan ):
                     # Reverse Direction
                     self.vertical = self.MOVE_DOWN
             else:
                 # Moving Down
-                if ( ( self.y + self.stepY + self.height ) >= self.maxY ):
+                if ( ( self.y + self.stepY + self.height ) >= self.maxY + self.overscan ):
                     # Reverse Direction
                     self.vertical = self.MOVE_UP
                     
@@ -191,9 +734,10 @@ class Eyeball:
         self.targetY = newY
         
     def changeDestination( self, xPot, yPot ):
-        # Change Pot value from [0..36535] to [0..max[X/Y]]
-        newX  = int( xPot / self.factorX )
-        newY  = int( yPot / self.factorY )
+        # Change Pot value from [0..36535] to [-overscan..max[X/Y]+overscan]
+        overscan = self.overscan
+        newX  = ( xPot * (self.rangeX + 2 * overscan) ) // potMax - overscan
+        newY  = ( yPot * (self.rangeY + 2 * overscan) ) // potMax - overscan
         
         noChangeX = False
         noChangeY = False
@@ -254,6 +798,10 @@ class Eyeball:
         # Move (x,y) of Iris to new position
         self.move( stopAtTarget )
     
+        # Erase and draw in one window if a padded copy covers this step
+        if ( self.drawPadded( OldX, OldY ) ):
+            return
+    
         # Clear Horizontal Afterimage
         if ( self.horizontal != 0 ):
             y = OldY
@@ -266,12 +814,12 @@ class Eyeball:
                 # Moving left
                 x      = OldX + self.width - self.stepX
             
-            self.display.fill_rect( x, y, width, height,  self.background )
+            self.fillBackground( x, y, width, height )
     
         # Clear Vertical Afterimage
         if ( self.vertical != 0 ):
             x      = OldX
-            height = self.stepY + 1
+            height = self.stepY
             width  = self.width
             if ( self.vertical > 0 ):
                 # Moving Up
@@ -280,7 +828,7 @@ class Eyeball:
                 # Moving Down
                 y  = OldY
             
-            self.display.fill_rect( x, y, width, height, self.background )
+            self.fillBackground( x, y, width, height )
 
         
         # Draw Eyeball in new position
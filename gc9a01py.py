@@ -47,9 +47,14 @@ C version of the driver at https://github.com/russhughes/gc9a01_mpy
 # pylint: disable=invalid-name,import-error
 
 import time
+import micropython
 from micropython import const
 import ustruct as struct
 
+import pixelArena
+
+from pixelDecode import paletteBytes, decodePixels
+
 # commands
 GC9A01_SWRESET = const(0x01)
 GC9A01_SLPIN = const(0x10)
@@ -65,6 +70,7 @@ GC9A01_VSCRDEF = const(0x33)
 GC9A01_COLMOD = const(0x3A)
 GC9A01_MADCTL = const(0x36)
 GC9A01_VSCSAD = const(0x37)
+GC9A01_RAMWRC = const(0x3C)
 
 # Color definitions
 BLACK = const(0x0000)
@@ -82,6 +88,12 @@ _DECODE_PIXEL = ">BBB"
 
 _BUFFER_SIZE = const(256)
 
+# Pixel arena owners of the two band buffers of blit_rows()
+_ROW_OWNERS = ("rows 0", "rows 1")
+
+# Bytes in the band buffer that clipped rows are packed into
+_CLIP_BYTES = const(2048)
+
 _BIT7 = const(0x80)
 _BIT6 = const(0x40)
 _BIT5 = const(0x20)
@@ -102,6 +114,26 @@ ROTATIONS = [
     0xa8]   # 7 - INVERTED_LANDSCAPE_MIRRORED]
 
 
+def _round_spans(size):
+    """
+    Build the first and end (exclusive) visible column of every row of a
+    round panel size pixels across.
+    """
+    start = bytearray(size)
+    end = bytearray(size)
+    radius = size / 2
+    for row in range(size):
+        dy = row + 0.5 - radius
+        half = (radius * radius - dy * dy) ** 0.5
+        first = int(radius - half)
+        start[row] = first
+        end[row] = size - first
+    return start, end
+
+
+_ROUND_START, _ROUND_END = _round_spans(240)
+
+
 def color565(red, green=0, blue=0):
     """
     Convert red, green and blue values (0-255) into a 16-bit 565 encoded color.
@@ -123,6 +155,46 @@ def _encode_pixel(color):
     return struct.pack(_ENCODE_PIXEL, color)
 
 
+@micropython.viper
+def _fill_color(buffer, color: int):
+    """
+    Fill the shared _BUFFER_SIZE pixel fill buffer with color.
+
+    The buffer is only refilled when its first and last pixels are not
+    already color.  Written pixel by pixel rather than with slice copies,
+    which would allocate a slice object each.
+    """
+    data = ptr8(buffer)
+    hi = color >> 8
+    lo = color & 0xff
+    size = _BUFFER_SIZE * 2
+    if (data[0] == hi and data[1] == lo
+            and data[size - 2] == hi and data[size - 1] == lo):
+        return
+    i = 0
+    while i < size:
+        data[i] = hi
+        data[i + 1] = lo
+        i += 2
+
+
+@micropython.viper
+def _copy_rows(dest, source, start: int, row_bytes: int, stride: int, rows: int):
+    """
+    Copy rows rows of row_bytes bytes, stride bytes apart in source from
+    byte start on, one after another into dest.  Copies front to back, so
+    dest may be source itself when start is not before the first row.
+    """
+    target = ptr8(dest)
+    data = ptr8(source)
+    i = 0
+    for _ in range(rows):
+        for j in range(row_bytes):
+            target[i + j] = data[start + j]
+        i += row_bytes
+        start += stride
+
+
 class GC9A01():
     """
     GC9A01 driver class
@@ -134,6 +206,8 @@ class GC9A01():
         reset (pin): reset pin
         backlight(pin): backlight pin
         rotation (int): display rotation
+        mirror (bool): show everything mirrored left to right while keeping
+            the caller's x coordinates (see set_mirror)
     """
 
     def __init__(
@@ -143,7 +217,8 @@ class GC9A01():
             cs=None,
             reset=None,
             backlight=None,
-            rotation=0):
+            rotation=0,
+            mirror=False):
         """
         Initialize display.
         """
@@ -161,6 +236,19 @@ class GC9A01():
         self.cs = cs
         self.backlight = backlight
         self._rotation = rotation % 8
+        self._mirror = mirror
+
+        # Preallocated command and parameter buffers so that drawing in
+        # steady state does not allocate from the heap
+        self._cmd = bytearray(1)
+        self._pos = bytearray(4)
+        self._pix = bytearray(2)
+        self._fill_views = {}
+        self._palettes = {}
+        self._rows_sent = 0
+        self._row_views = {}
+        self._row_bytes = 0
+        self._clip_views = {}
 
         self.hard_reset()
         time.sleep_ms(100)
@@ -243,7 +331,8 @@ class GC9A01():
 
         if command is not None:
             self.dc.off()
-            self.spi.write(bytes([command]))
+            self._cmd[0] = command
+            self.spi.write(self._cmd)
         if data is not None:
             self.dc.on()
             self.spi.write(data)
@@ -317,7 +406,29 @@ class GC9A01():
         """
 
         self._rotation = rotation % 8
-        self._write(GC9A01_MADCTL, bytes([ROTATIONS[self._rotation]]))
+        madctl = self._rotation ^ 4 if self._mirror else self._rotation
+        self._write(GC9A01_MADCTL, bytes([ROTATIONS[madctl]]))
+
+    @property
+    def mirror(self):
+        """bool: True if output is mirrored left to right (see set_mirror)."""
+        return self._mirror
+
+    def set_mirror(self, value):
+        """
+        Enable or disable mirrored output.
+
+        When mirrored, the mirrored counterpart of the current rotation is
+        used and column addresses are flipped, so an image drawn at x
+        appears at the same place on the panel as without mirroring, but
+        reversed left to right.  One image buffer can then serve both a left
+        and a right eye, and motion code keeps using unmirrored coordinates.
+
+        Args:
+            value (bool): if True enable mirroring
+        """
+        self._mirror = value
+        self.rotation(self._rotation)
 
     def _set_columns(self, start, end):
         """
@@ -327,9 +438,9 @@ class GC9A01():
             start (int): column start address
             end (int): column end address
         """
-        if start <= end <= self.width:
-            self._write(GC9A01_CASET, _encode_pos(
-                start, end))
+        if 0 <= start <= end < self.width:
+            struct.pack_into(_ENCODE_POS, self._pos, 0, start, end)
+            self._write(GC9A01_CASET, self._pos)
 
     def _set_rows(self, start, end):
         """
@@ -339,9 +450,9 @@ class GC9A01():
             start (int): row start address
             end (int): row end address
        """
-        if start <= end <= self.height:
-            self._write(GC9A01_RASET, _encode_pos(
-                start, end))
+        if 0 <= start <= end < self.height:
+            struct.pack_into(_ENCODE_POS, self._pos, 0, start, end)
+            self._write(GC9A01_RASET, self._pos)
 
     def _set_window(self, x0, y0, x1, y1):
         """
@@ -353,6 +464,8 @@ class GC9A01():
             x1 (int): column end address
             y1 (int): row end address
         """
+        if self._mirror:
+            x0, x1 = self.width - 1 - x1, self.width - 1 - x0
         self._set_columns(x0, x1)
         self._set_rows(y0, y1)
         self._write(GC9A01_RAMWR)
@@ -391,21 +504,275 @@ class GC9A01():
             color (int): 565 encoded color
         """
         self._set_window(x, y, x, y)
-        self._write(None, _encode_pixel(color))
+        struct.pack_into(_ENCODE_PIXEL, self._pix, 0, color)
+        self._write(None, self._pix)
 
-    def blit_buffer(self, buffer, x, y, width, height):
+    def blit_buffer(self, buffer, x, y, width, height, stride=None,
+                    round_mask=False, offset=0):
         """
         Copy buffer to display at the given location.
 
+        The image may lie partly (or entirely) off the panel; only the part
+        on the panel is sent.  A sub-rectangle of a larger image can be drawn
+        by passing the byte offset of its first pixel and the width of the
+        larger image as stride.  A whole image is sent straight from buffer
+        in one write; any other part is packed into a band buffer first (see
+        _write_rows), so drawing does not allocate slices of buffer.
+
+        With round_mask the pixels outside the round GC9A01 panel are not
+        sent either.  Rows are grouped into bands that share the same visible
+        span and each band gets its own window.
+
         Args:
             buffer (bytes): Data to copy to display
             x (int): Top left corner x coordinate
             Y (int): Top left corner y coordinate
             width (int): Width
             height (int): Height
+            stride (int): Pixels per row in buffer, defaults to width
+            round_mask (bool): Skip pixels outside the round panel
+            offset (int): Byte offset in buffer of the first pixel
         """
-        self._set_window(x, y, x + width - 1, y + height - 1)
-        self._write(None, buffer)
+        if stride is None:
+            stride = width
+
+        x0 = x if x > 0 else 0
+        y0 = y if y > 0 else 0
+        x1 = x + width if x + width < self.width else self.width
+        y1 = y + height if y + height < self.height else self.height
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        if round_mask:
+            self._blit_round(buffer, x, y, width, x0, y0, x1, y1, stride, offset)
+            return
+
+        self._set_window(x0, y0, x1 - 1, y1 - 1)
+        if (offset == 0 and stride == width and x0 == x and x1 == x + width
+                and y0 == y and y1 == y + height):
+            self._write(None, buffer)
+            return
+
+        start = offset + ((y0 - y) * stride + self._first_column(x, width, x0, x1)) * 2
+        self._write_rows(None, buffer, start, (x1 - x0) * 2, stride * 2, y1 - y0)
+
+    def _first_column(self, x, width, x0, x1):
+        """
+        Return the image column sent first when only columns x0 to x1 - 1
+        of an image width pixels wide at x are drawn.
+
+        A mirrored display reverses the pixels of every window, so the
+        visible columns of a clipped image come from the other side of it.
+        """
+        if self._mirror:
+            return x + width - x1
+        return x0 - x
+
+    def _blit_round(self, buffer, x, y, width, x0, y0, x1, y1, stride, offset):
+        """
+        Send the clipped rectangle (x0, y0) - (x1, y1) of an image at (x, y)
+        limited to the round panel, one window per band of rows with the
+        same visible span.
+        """
+        row = y0
+        while row < y1:
+            first = _ROUND_START[row] if _ROUND_START[row] > x0 else x0
+            last = _ROUND_END[row] if _ROUND_END[row] < x1 else x1
+            band = row + 1
+            while (band < y1
+                   and max(_ROUND_START[band], x0) == first
+                   and min(_ROUND_END[band], x1) == last):
+                band += 1
+
+            if first < last:
+                self._set_window(first, row, last - 1, band - 1)
+                start = offset + ((row - y) * stride
+                                  + self._first_column(x, width, first, last)) * 2
+                self._write_rows(None, buffer, start, (last - first) * 2,
+                                 stride * 2, band - row)
+            row = band
+
+    def blit_rows(self, source, x, y, width, height, band_rows=8):
+        """
+        Copy an image produced band by band to display at the given location.
+
+        The image never has to be in memory as a whole: source produces it a
+        band of rows at a time, either as a callable that fills a band
+        buffer provided here, or as an iterable (such as a generator) of
+        buffers each holding one or more whole rows.  The window is set once;
+        the first band goes out with Write Memory (RAMWR) and every later
+        band with Write Memory Continue (0x3C).  Like blit_buffer, only the
+        part of the image on the panel is sent, but every band down to the
+        last one on the panel is still produced, in order, so decoders can
+        run front to back.
+
+        A callable source is handed two band buffers in turn, so a band is
+        never filled into the buffer of the band just sent.
+
+        Args:
+            source: fill(buffer, row, rows) filling rows row to row + rows - 1
+                of the image into buffer, or an iterable of row buffers
+            x (int): Top left corner x coordinate
+            Y (int): Top left corner y coordinate
+            width (int): Width
+            height (int): Height
+            band_rows (int): Rows per band for a callable source
+        """
+        x0 = x if x > 0 else 0
+        y0 = y if y > 0 else 0
+        x1 = x + width if x + width < self.width else self.width
+        y1 = y + height if y + height < self.height else self.height
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        self._set_window(x0, y0, x1 - 1, y1 - 1)
+        self._rows_sent = 0
+        row = 0
+        if callable(source):
+            band_bytes = band_rows * width * 2
+            slot = 0
+            while row < height and y + row < y1:
+                rows = band_rows if row + band_rows <= height else height - row
+                view = self._row_view(slot, band_bytes, rows * width * 2)
+                source(view, row, rows)
+                self._send_rows(view, x, y + row, width, rows, x0, y0, x1, y1)
+                row += rows
+                slot ^= 1
+            return
+
+        for buffer in source:
+            rows = len(buffer) // (width * 2)
+            self._send_rows(buffer, x, y + row, width, rows, x0, y0, x1, y1)
+            row += rows
+            if y + row >= y1:
+                break
+
+    def _send_rows(self, buffer, x, top, width, rows, x0, y0, x1, y1):
+        """
+        Send the part within (x0, y0) - (x1, y1) of a band of rows of an
+        image at x whose first row is on display row top, continuing the
+        window started by blit_rows().
+        """
+        first = top if top > y0 else y0
+        end = top + rows if top + rows < y1 else y1
+        if first >= end:
+            return
+
+        # The first band follows RAMWR; later bands continue with 0x3C
+        command = GC9A01_RAMWRC if self._rows_sent else None
+        self._rows_sent += end - first
+        if x0 == x and x1 == x + width and first == top and end == top + rows:
+            self._write(command, buffer)
+            return
+
+        start = ((first - top) * width + self._first_column(x, width, x0, x1)) * 2
+        self._write_rows(command, buffer, start, (x1 - x0) * 2, width * 2, end - first)
+
+    def _write_rows(self, command, buffer, start, row_bytes, stride, rows):
+        """
+        Send rows rows of row_bytes bytes, stride bytes apart in buffer from
+        byte start on, as pixel data following command.
+
+        The rows are packed into the "clip" band buffer and sent a band at a
+        time through views kept per size (see _clip_view), so sending part
+        of an image needs neither slices of buffer nor one write per row.
+        """
+        band = _CLIP_BYTES // row_bytes
+        while rows > 0:
+            count = band if band < rows else rows
+            view = self._clip_view(count * row_bytes)
+            _copy_rows(view, buffer, start, row_bytes, stride, count)
+            self._write(command, view)
+            command = None
+            start += count * stride
+            rows -= count
+
+    def _clip_view(self, nbytes):
+        """
+        Return a view of the first nbytes of the clip band buffer, created
+        once per size and kept like those of _fill_view().
+        """
+        view = self._clip_views.get(nbytes)
+        if view is None:
+            view = pixelArena.get("clip", _CLIP_BYTES)[0:nbytes]
+            self._clip_views[nbytes] = view
+        return view
+
+    def _row_view(self, slot, band_bytes, nbytes):
+        """
+        Return a view of the first nbytes of band buffer slot (0 or 1) of
+        blit_rows(), each band_bytes long.
+
+        Views are kept per size, like _fill_view(), and dropped when the
+        band size changes and the buffers may move.
+        """
+        if band_bytes != self._row_bytes:
+            self._row_views = {}
+            self._row_bytes = band_bytes
+        key = (nbytes << 1) | slot
+        view = self._row_views.get(key)
+        if view is None:
+            view = pixelArena.get(_ROW_OWNERS[slot], band_bytes)[0:nbytes]
+            self._row_views[key] = view
+        return view
+
+    def blit_scaled(self, buffer, x, y, width, height, scale=2):
+        """
+        Copy a reduced size buffer to display at the given location, repeating
+        every pixel scale times across and every row scale times down.
+
+        The buffer holds ceil(width / scale) x ceil(height / scale) pixels.
+        The window is set once and the enlarged rows are streamed to it from
+        a line in the clip band buffer, so no full size copy of the image is
+        made.  Like blit_buffer, only the part of the image on the panel is
+        sent; a clipped line is moved to the start of the band buffer and
+        sent through a kept view of its visible part.
+
+        Args:
+            buffer (bytes): Reduced size data to copy to display
+            x (int): Top left corner x coordinate
+            Y (int): Top left corner y coordinate
+            width (int): Width on the display
+            height (int): Height on the display
+            scale (int): Enlargement factor
+        """
+        src_width = (width + scale - 1) // scale
+        src_row = src_width * 2
+
+        # Clip to the panel
+        x0 = x if x > 0 else 0
+        y0 = y if y > 0 else 0
+        x1 = x + width if x + width < self.width else self.width
+        y1 = y + height if y + height < self.height else self.height
+        if x0 >= x1 or y0 >= y1:
+            return
+        first = self._first_column(x, width, x0, x1)
+        line = self._clip_view(src_width * scale * 2)
+        view = self._clip_view((x1 - x0) * 2)
+        self._set_window(x0, y0, x1 - 1, y1 - 1)
+
+        # Start at the first source row with a visible enlarged row
+        skip = (y0 - y) // scale
+        row = skip * scale
+        src = skip * src_row
+        height = y1 - y
+        while row < height:
+            i = 0
+            for col in range(src, src + src_row, 2):
+                hi = buffer[col]
+                lo = buffer[col + 1]
+                for _ in range(scale):
+                    line[i] = hi
+                    line[i + 1] = lo
+                    i += 2
+            if first:
+                _copy_rows(line, line, first * 2, (x1 - x0) * 2, 0, 1)
+
+            for repeat in range(min(scale, height - row)):
+                if row + repeat >= y0 - y:
+                    self._write(None, view)
+            row += scale
+            src += src_row
 
     def rect(self, x, y, w, h, color):
         """
@@ -434,16 +801,45 @@ class GC9A01():
             height (int): Height in pixels
             color (int): 565 encoded color
         """
+        if x < 0:
+            width += x
+            x = 0
+        if y < 0:
+            height += y
+            y = 0
+        if x + width > self.width:
+            width = self.width - x
+        if y + height > self.height:
+            height = self.height - y
+        if width <= 0 or height <= 0:
+            return
+
         self._set_window(x, y, x + width - 1, y + height - 1)
-        chunks, rest = divmod(width * height, _BUFFER_SIZE)
-        pixel = _encode_pixel(color)
+        pixels = width * height
+        chunks = pixels // _BUFFER_SIZE
+        rest = pixels - chunks * _BUFFER_SIZE
+        data = self._fill_view(_BUFFER_SIZE)
+        _fill_color(data, color)
         self.dc.on()
         if chunks:
-            data = pixel * _BUFFER_SIZE
             for _ in range(chunks):
                 self._write(None, data)
         if rest:
-            self._write(None, pixel * rest)
+            self._write(None, self._fill_view(rest))
+
+    def _fill_view(self, pixels):
+        """
+        Return a view of the first pixels of the shared fill buffer.
+
+        Views are created once per size and kept, so repeated fills of the
+        same size (such as erasing the same strip every frame) do not
+        allocate.
+        """
+        view = self._fill_views.get(pixels)
+        if view is None:
+            view = pixelArena.get("fill", _BUFFER_SIZE * 2)[0:pixels * 2]
+            self._fill_views[pixels] = view
+        return view
 
     def fill(self, color):
         """
@@ -560,8 +956,9 @@ class GC9A01():
                     #
                     # Yes, this looks bad, but it is fast
                     #
-                    buffer = struct.pack(
-                        '>64H',
+                    buffer = pixelArena.get("text", 128)
+                    struct.pack_into(
+                        '>64H', buffer, 0,
                         color if font.FONT[idx] & _BIT7 else background,
                         color if font.FONT[idx] & _BIT6 else background,
                         color if font.FONT[idx] & _BIT5 else background,
@@ -664,8 +1061,9 @@ class GC9A01():
                     #
                     # And this looks even worse, but it is fast
                     #
-                    buffer = struct.pack(
-                        '>128H',
+                    buffer = pixelArena.get("text", 256)
+                    struct.pack_into(
+                        '>128H', buffer, 0,
                         color if font.FONT[idx] & _BIT7 else background,
                         color if font.FONT[idx] & _BIT6 else background,
                         color if font.FONT[idx] & _BIT5 else background,
@@ -827,24 +1225,20 @@ class GC9A01():
             index (int): Optional index of bitmap to draw from multiple bitmap
                 module
 
+        The module's PALETTE holds normal RGB565 colors.  Frames are decoded
+        into the same arena buffer every call, and the palette bytes are
+        kept per module, so playing the frames of a module does not
+        allocate (see eyeAnimation.SpriteSheet for cached frames and timing).
         """
         bitmap_size = bitmap.HEIGHT * bitmap.WIDTH
-        buffer_len = bitmap_size * 2
-        buffer = bytearray(buffer_len)
-        bs_bit = bitmap.BPP * bitmap_size * index if index > 0 else 0
-
-        for i in range(0, buffer_len, 2):
-            color_index = 0
-            for bit in range(bitmap.BPP):
-                color_index <<= 1
-                color_index |= (bitmap.BITMAP[bs_bit // 8]
-                                & 1 << (7 - (bs_bit % 8))) > 0
-                bs_bit += 1
-
-            color = bitmap.PALETTE[color_index]
-            buffer[i] = color & 0xff00 >> 8
-            buffer[i + 1] = color_index & 0xff
-
+        buffer = pixelArena.get("bitmap", bitmap_size * 2)
+        palette = self._palettes.get(bitmap)
+        if palette is None:
+            palette = paletteBytes(bitmap.PALETTE, False)
+            self._palettes[bitmap] = palette
+
+        decodePixels(bitmap.BITMAP, bitmap.BPP, bitmap.BPP * bitmap_size * index,
+                     bitmap_size, palette[0], palette[1], buffer)
         self.blit_buffer(buffer, x, y, bitmap.WIDTH, bitmap.HEIGHT)
 
     # @micropython.native
@@ -862,7 +1256,7 @@ class GC9A01():
             bg (int): background color, optional, defaults to BLACK
         """
         buffer_len = font.HEIGHT * font.MAX_WIDTH * 2
-        buffer = bytearray(buffer_len)
+        buffer = pixelArena.get("glyph", buffer_len)
         fg_hi = (fg & 0xff00) >> 8
         fg_lo = fg & 0xff
 
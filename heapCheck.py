@@ -0,0 +1,89 @@
+#
+# heapCheck.py -- Checks that the steady-state frame loop does not allocate
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import gc
+
+try:
+    import tracemalloc      # CPython (desktop runs with fake hardware)
+except ImportError:
+    tracemalloc = None      # MicroPython
+
+# frameAllocations( frame, frames=10, warmup=2 )
+#
+# Calls frame() warmup times so one-time setup (cached views, first use of
+# globals) is done, then calls it frames more times and measures the heap
+# two ways:
+#
+#    allocated  - the most bytes allocated while a single frame ran, freed
+#                 or not
+#    kept       - bytes still held once all the frames are over and garbage
+#                 has been collected (buffers created and kept, growing
+#                 caches), which is what fragments the heap on the device
+#
+# On the device allocated comes from gc.mem_alloc() with the garbage
+# collector disabled, so every byte a frame allocates is seen.  Under
+# CPython tracemalloc gives both, allocated as the peak above the memory in
+# use when the frame started.  There every integer above 256 (and below
+# -5) is a heap object too, so a frame that allocates nothing on the
+# device still shows a few hundred bytes allocated, and positions stored
+# by a frame hold a few bytes until the next one.  Frames that go through
+# a cycle of states should therefore run whole cycles.  Memory held by this
+# module's own counters is not part of kept (see heldBytes).
+#
+# Returns ( allocated, kept ).
+def frameAllocations( frame, frames=10, warmup=2 ):
+    for _ in range( warmup ):
+        frame()
+
+    worst = 0
+    if ( tracemalloc is not None ):
+        tracemalloc.start()
+        start = heldBytes()
+        for _ in range( frames ):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            frame()
+            worst  = max( worst, tracemalloc.get_traced_memory()[1] - before )
+        kept = heldBytes() - start
+        tracemalloc.stop()
+        return ( worst, kept )
+
+    enabled = gc.isenabled()
+    gc.disable()
+    gc.collect()
+    start = gc.mem_alloc()
+    for _ in range( frames ):
+        before = gc.mem_alloc()
+        frame()
+        worst  = max( worst, gc.mem_alloc() - before )
+    gc.collect()
+    kept = gc.mem_alloc() - start
+    if ( enabled ):
+        gc.enable()
+    return ( worst, kept )
+
+# heldBytes()
+#
+# Under CPython, the bytes traced by tracemalloc that were allocated
+# outside this module (and tracemalloc itself).
+def heldBytes():
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+                   ( tracemalloc.Filter( False, __file__ ),
+                     tracemalloc.Filter( False, tracemalloc.__file__ ) ) )
+    return sum( stat.size for stat in snapshot.statistics( "filename" ) )
+
+# checkFrame( frame, frames=10, limit=0, warmup=2 )
+#
+# Raises AssertionError if the frames kept memory or any frame allocated
+# more than limit bytes.  Returns ( allocated, kept ) as frameAllocations()
+# does.
+def checkFrame( frame, frames=10, limit=0, warmup=2 ):
+    allocated, kept = frameAllocations( frame, frames, warmup )
+    if ( kept > 0 ):
+        raise AssertionError( "Frames kept {} bytes".format( kept ) )
+    if ( allocated > limit ):
+        raise AssertionError( "Frame allocated {} bytes (limit {})".format( allocated, limit ) )
+    return ( allocated, kept )
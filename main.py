@@ -11,16 +11,29 @@
     Display an image of an eye ball on two GC9A01 TFT Displays and move left and right
 """
 
+import gc
+
+from   random      import randint
+
 from   machine     import ADC, Pin, SPI
 from   micropython import const
 
 import gc9a01py as gc9a01
-
-from   eyeball     import Eyeball
-from   eyeBitmap   import extractEye
+import pixelArena
+
+from   eyeball     import Eyeball, EyelidCurve
+from   eyeBitmap   import loadEye, cacheReport
+from   eyeMotion   import Motion, SPRING
+from   eyeGaze     import GazePlanner
+from   eyePath     import PathPlayer, PATTERNS
+from   eyeArray    import EyeArray
+from   eyeSclera   import renderSclera, scleraBytes
+from   eyeComposite import CompositeSprite, compositeBytes
+from   eyeSprite   import PaddedSprite, paddedBytes
+from   eyeWarp     import GazeWarp, loadWarps, warpBytes
 from   pinUtils    import pinID
 
-from   utime       import sleep, sleep_ms, ticks_ms
+from   utime       import sleep, sleep_ms, ticks_ms, ticks_diff, ticks_add
 
 # Bitmap (Python File format) of purple eye (just the iris)
 import peye
@@ -61,15 +74,76 @@ DISPLAY_HEIGHT  = const(240)
 
 BACKGROUND      = gc9a01.WHITE
 
+# Pixel arena: one preallocated block for the eye buffer and the driver's
+# line/fill/glyph buffers so long runs never fail on a fragmented heap.
+#    Eye buffer (115 x 115 x 2) plus room for the driver's working buffers
+ARENA_SIZE      = const(32 * 1024)
+
+# Frame timing.  Automatic garbage collection is turned off for the main
+# loop; instead gc.collect() runs every GC_EVERY_FRAMES frames, and only
+# when at least GC_MIN_IDLE_MS of the frame's time is still unused.  With
+# less than GC_MIN_FREE bytes of heap left it runs at once, idle or not,
+# so a frame that does allocate can never run the heap dry.
+FRAME_MS        = const(50)
+GC_EVERY_FRAMES = const(100)
+GC_MIN_IDLE_MS  = const(5)
+GC_MIN_FREE     = const(16 * 1024)
+
+# Potentiometer control moves the eyes by elapsed time on a spring, so
+# their speed does not depend on how long each frame takes.
+#    EYE_SPEED in pixels per second, EYE_SPRING natural frequency per second
+EYE_SPEED       = const(240)
+EYE_SPRING      = const(14)
+
+# Textured sclera (shading and veins) instead of a plain white background.
+# Costs 28800 bytes and slower erases, so it is off by default.
+TEXTURED_SCLERA = False
+
+# With TEXTURED_SCLERA, keep each eye's composed iris (see eyeComposite.py)
+# so redraws at the same place, such as the lids opening, are not composed
+# again.  Takes two more eye sized blocks of the pixel arena.
+COMPOSITE_CACHE = False
+
+# Padded copy of the eye with a PADDED_MARGIN pixel margin of background
+# (see eyeSprite.py): every move of up to that many pixels, which covers the
+# path modes, is erased and drawn in one blit.  The copy takes its own
+# block of the pixel arena, about 30 KB for peye, so it is off by default.
+# Not used with TEXTURED_SCLERA.
+PADDED_SPRITE   = False
+PADDED_MARGIN   = const(4)
+
+# Iris foreshortened by gaze angle, from variants made on the host with
+# eyeWarp.makeWarpVariants / saveWarps and copied to the board as WARP_FILE
+GAZE_WARP       = False
+WARP_FILE       = "peye.warp"
+WARP_ENTRIES    = const(3)    # Variants kept composed, in the pixel arena
+
+# Both eyes blink together every BLINK_MIN_MS to BLINK_MAX_MS
+BLINK_MIN_MS    = const(2000)
+BLINK_MAX_MS    = const(6000)
+
 # Mode:  0 == Center Still
 #        1 == Auto Left and Right
 #        2 == Auto Up and Down
 #        3 == Potentiometer Control
+#        4 == Natural gaze (saccades and fixations)
+#        5 == Auto Circle
+#        6 == Auto Figure Eight
 
 CENTER_STILL     = const(0)
 AUTO_HORIZONTAL  = const(1)
 AUTO_VERTICAL    = const(2)
 MANUAL_CONTROL   = const(3)
+NATURAL_GAZE     = const(4)
+AUTO_CIRCLE      = const(5)
+AUTO_FIGURE8     = const(6)
+LAST_MODE        = AUTO_FIGURE8
+
+# Automatic modes and the eyePath pattern each one plays
+MODE_PATHS = { AUTO_HORIZONTAL: "horizontal",
+               AUTO_VERTICAL:   "vertical",
+               AUTO_CIRCLE:     "circle",
+               AUTO_FIGURE8:    "figure8" }
 
 mode = CENTER_STILL
 
@@ -143,7 +217,7 @@ def buttonHandler( pin: Pin ):
     
     mode += 1
     
-    if ( mode > MANUAL_CONTROL ):
+    if ( mode > LAST_MODE ):
         mode = 0
                
     if ( DEBUG_MODE ):
@@ -159,6 +233,24 @@ def buttonHandler( pin: Pin ):
 PIN_MODE.irq(handler=buttonHandler, trigger=Pin.IRQ_FALLING)
 
 
+# Allocate the arena first, while the heap still has a large free area.
+# The padded copy, sclera, composite buffers and gaze variants, when used,
+# are carved from it too.
+paddedSteps = ( ( PADDED_MARGIN, PADDED_MARGIN ), )
+arenaSize   = ARENA_SIZE
+if ( PADDED_SPRITE ):
+    arenaSize += paddedBytes( peye.WIDTH, peye.HEIGHT, paddedSteps )
+if ( TEXTURED_SCLERA ):
+    arenaSize += scleraBytes( DISPLAY_WIDTH )
+    if ( COMPOSITE_CACHE ):
+        arenaSize += compositeBytes( peye.WIDTH, peye.HEIGHT, "right sprite" )
+        arenaSize += compositeBytes( peye.WIDTH, peye.HEIGHT, "left sprite" )
+    else:
+        arenaSize += compositeBytes( peye.WIDTH, peye.HEIGHT )
+if ( GAZE_WARP ):
+    arenaSize += warpBytes( peye.WIDTH, peye.HEIGHT, WARP_ENTRIES )
+pixelArena.init(arenaSize)
+
 spi = SPI(SPI_BLOCK, sck=PIN_CLK, mosi=PIN_MOSI, baudrate=BAUD_RATE)
 
 # Create Display Objects for Left and Right Eyes
@@ -174,7 +266,8 @@ eyeLeft    = gc9a01.GC9A01( spi,
                             cs=PIN_CS_LEFT,
                             reset=PIN_RESET_LEFT,
                             backlight=PIN_BACKLIGHT,
-                            rotation=0)
+                            rotation=0,
+                            mirror=True)    # Mirror image of the right eye
 
 eyeRight.fill(gc9a01.RED | gc9a01.BLUE)  # Purple
 eyeLeft.fill( gc9a01.RED | gc9a01.BLUE)  # Purple
@@ -191,33 +284,91 @@ print("Bitmap Size: ", len(peye.BITMAP), " pixels, Buffer Size: ", peye.WIDTH *
 #
 # Extracting bitmap buffer external to the Eyeball class allows
 # both eyeballs to share the same buffer, saving memory.
+#
+# The decoded buffer is cached on flash so only the first boot (or the
+# first boot after peye changes) pays for decoding the bitmap.  Either way
+# the eye is drawn on both panels while it loads; when decoding, band by
+# band, so it shows long before the whole bitmap is decoded.
 #   
-eyeBuffer = extractEye( peye )
+eyeBuffer = loadEye( peye, displays=( eyeRight, eyeLeft ) )
+print("Eye cache: ", "hit" if cacheReport["hit"] else "miss", ", ", cacheReport["ms"],
+      " ms, first visible after ", cacheReport["firstMs"], " ms")
 
 irisRight = Eyeball( eyeBuffer, peye.WIDTH, peye.HEIGHT, eyeRight, DISPLAY_WIDTH, DISPLAY_HEIGHT)
 irisLeft  = Eyeball( eyeBuffer, peye.WIDTH, peye.HEIGHT, eyeLeft,  DISPLAY_WIDTH, DISPLAY_HEIGHT)
 
+irisRight.setMotion( Motion( irisRight.x, irisRight.y, EYE_SPEED, SPRING, EYE_SPRING ) )
+irisLeft.setMotion(  Motion( irisLeft.x,  irisLeft.y,  EYE_SPEED, SPRING, EYE_SPRING ) )
+
+# Eyelids: one set of lid curve tables shared by both eyes
+lids = EyelidCurve( DISPLAY_WIDTH )
+irisRight.setLids( lids )
+irisLeft.setLids(  lids )
+
+# Optional textured sclera shared by both eyes
+if ( TEXTURED_SCLERA ):
+    sclera = renderSclera( DISPLAY_WIDTH )
+    irisRight.setSclera( sclera )
+    irisLeft.setSclera(  sclera )
+
+    # The white corners of the iris image show the sclera through them,
+    # with soft (2 bit alpha) edges; one composite serves both eyes unless
+    # each keeps its own composed copy
+    if ( COMPOSITE_CACHE ):
+        irisRight.setComposite( CompositeSprite( eyeBuffer, peye.WIDTH, peye.HEIGHT, alphaBits=2, cache="right sprite" ) )
+        irisLeft.setComposite(  CompositeSprite( eyeBuffer, peye.WIDTH, peye.HEIGHT, alphaBits=2, cache="left sprite" ) )
+    else:
+        composite = CompositeSprite( eyeBuffer, peye.WIDTH, peye.HEIGHT, alphaBits=2 )
+        irisRight.setComposite( composite )
+        irisLeft.setComposite(  composite )
+    irisRight.clear()
+    irisLeft.clear()
+
+# Optional padded copy shared by both eyes
+if ( PADDED_SPRITE ):
+    padded = PaddedSprite( eyeBuffer, peye.WIDTH, peye.HEIGHT, BACKGROUND, paddedSteps )
+    irisRight.setPadded( padded )
+    irisLeft.setPadded(  padded )
+
+# Optional gaze dependent iris variants shared by both eyes
+if ( GAZE_WARP ):
+    steps, warps = loadWarps( WARP_FILE )
+    warp = GazeWarp( eyeBuffer, peye.WIDTH, peye.HEIGHT, steps, warps, WARP_ENTRIES )
+    irisRight.setWarp( warp )
+    irisLeft.setWarp(  warp )
+
+# All eyes in one array, updated together.  Eyes in identical state on
+# unmirrored displays are drawn once for all of them (see eyeArray.py).
+eyes = EyeArray( [ irisRight, irisLeft ] )
+
+# Both eyes look at the same, randomly chosen points
+gaze = GazePlanner( eyes )
+
+# Automatic modes follow a path, precomputed per frame at mode entry
+paths = PathPlayer( eyes )
+
 irisRight.show()
 irisLeft.show()
 
+if ( DEBUG_MODE ):
+    pixelArena.arena.print()
+
 
 led = Pin("LED", Pin.OUT)
 onFlag = False
 cnt    = 0
 
 def moveAutomatic():
-    global  eyeRight, irisRight
-    global  eyeLeft,  irisLeft
+    global  paths
     
-    irisRight.moveEyeball( False )
-    irisLeft.moveEyeball(  False )
+    paths.update( ticks_ms() )
     return
     
 
 atTargetRight = False
 atTargetLeft  = False
 
-def manualControl():
+def manualControl( now ):
     global lastRight, lastLeft, atTargetRight, atTargetLeft
      
     # Determine where target destination is
@@ -227,10 +378,9 @@ def manualControl():
     irisRight.changeDestination(left, right)
     irisLeft.changeDestination( left, right)
 
-    stopAtTarget = (mode == MANUAL_CONTROL)
-    # Draw new eyes if no at destination
-    if ( not irisRight.atDestination() ):
-        irisRight.moveEyeball(stopAtTarget)
+    # Draw new eyes if not at destination, moved by the time since the last frame
+    if ( not irisRight.atDestination() or irisRight.motion.moving ):
+        irisRight.animate( now )
         atTargetRight = False
     else:
         if (DEBUG_MODE and not atTargetRight):
@@ -238,8 +388,8 @@ def manualControl():
             atTargetRight = True
 
         
-    if ( not irisLeft.atDestination() ):
-        irisLeft.moveEyeball( stopAtTarget )
+    if ( not irisLeft.atDestination() or irisLeft.motion.moving ):
+        irisLeft.animate( now )
         atTargetLeft = False
     else:
         if (DEBUG_MODE and not atTargetLeft):
@@ -259,6 +409,12 @@ def debugPrint( currMode, imageLeft, imageRight ):
         modeStr = "Auto Vertical"
     elif ( currMode == MANUAL_CONTROL ):
         modeStr = "Manual Control"
+    elif ( currMode == NATURAL_GAZE ):
+        modeStr = "Natural Gaze"
+    elif ( currMode == AUTO_CIRCLE ):
+        modeStr = "Auto Circle"
+    elif ( currMode == AUTO_FIGURE8 ):
+        modeStr = "Auto Figure Eight"
     print("Mode: ", modeStr)
 
     print("Left  Iris: (", imageLeft.x, ", ", imageLeft.y, ") ==> (", imageLeft.targetX, ", ", imageLeft.targetY, "), [",
@@ -271,36 +427,26 @@ def newMode():
     global mode, irisLeft, irisRight, eyeRight, eyeLeft
     
     # Clear old iris from display
-    irisRight.clear()
-    irisLeft.clear()
+    eyes.clear()
     
     # Center each eye
-    irisRight.moveCenter()
-    irisLeft.moveCenter()
+    eyes.moveCenter()
     
     # Set Directions based on mode
-    if ( mode == AUTO_HORIZONTAL ):
-        irisRight.setDirection( -1, 0 )
-        irisRight.setDestination( -1, irisRight.CENTER_Y )
-        irisLeft.setDirection(  -1, 0 )
-        irisLeft.setDestination(   -1, irisLeft.CENTER_Y )
-    elif ( mode == AUTO_VERTICAL ):
-        irisRight.setDirection( 0, 1 )
-        irisRight.setDestination( irisRight.CENTER_X, -1 )
-        irisLeft.setDirection(  0, 1 )
-        irisLeft.setDestination(  irisLeft.CENTER_X, -1 )
+    paths.stop()
+    if ( mode in MODE_PATHS ):
+        paths.play( PATTERNS[ MODE_PATHS[ mode ] ], ticks_ms(), FRAME_MS )
     elif ( mode == CENTER_STILL ):
-        irisRight.setDirection( 0, 0 )
-        irisLeft.setDirection(  0, 0 )
-        irisRight.moveCenter()
-        irisLeft.moveCenter()
+        # Eyes are already centered and still
+        pass
+    elif ( mode == NATURAL_GAZE ):
+        gaze.clear()
     else:
-        irisRight.autoDirection()
-        irisLeft.autoDirection()
+        for iris in eyes:
+            iris.autoDirection()
         
     # Display eyes
-    irisRight.show()
-    irisLeft.show()
+    eyes.show()
         
     debugPrint( mode, irisLeft, irisRight )
         
@@ -309,10 +455,27 @@ def newMode():
 
 oldMode = -1 # Not a valid value which will trigger a flush display on the first loop
 
+if ( DEBUG_MODE ):
+    # The steady-state frame must not allocate (see heapCheck.py).  Play a
+    # path for it, since no mode has started one yet; the first newMode()
+    # of the loop stops it and redraws the eyes.
+    import heapCheck
+    paths.play( PATTERNS[ "circle" ], ticks_ms(), FRAME_MS )
+    allocated, kept = heapCheck.frameAllocations( moveAutomatic )
+    paths.stop()
+    print("Frame allocations: ", allocated, " bytes, kept: ", kept, " bytes")
+
 print("Enter forever loop")
 
+gc.collect()
+gc.disable()
+framesSinceGC = 0
+nextBlink     = ticks_add( ticks_ms(), BLINK_MAX_MS )
+
 try:
     while True:
+        frameStart = ticks_ms()
+        
         if ( onFlag ):
             led.off()
             onFlag = False
@@ -324,19 +487,37 @@ try:
             oldMode = mode
             newMode()            
         
-        if ( mode == AUTO_HORIZONTAL or mode == AUTO_VERTICAL):
-            moveAutomatic()
+        if ( mode in MODE_PATHS ):
+            paths.update( frameStart )
         elif ( mode == CENTER_STILL ):
             # Nothing to do.  Eyes are centered and still.
             pass
+        elif ( mode == NATURAL_GAZE ):
+            gaze.update( frameStart )
         else:
-            manualControl()
-
-        sleep_ms(50)
+            manualControl( frameStart )
+
+        # Blink now and then; the lids redraw only the rows that change
+        if ( ticks_diff( frameStart, nextBlink ) >= 0 ):
+            eyes.blink( frameStart )
+            nextBlink = ticks_add( frameStart, randint( BLINK_MIN_MS, BLINK_MAX_MS ) )
+        eyes.updateBlink( frameStart )
+
+        # Spend idle time on garbage collection, then wait out the frame
+        framesSinceGC += 1
+        idle = FRAME_MS - ticks_diff( ticks_ms(), frameStart )
+        if ( ( framesSinceGC >= GC_EVERY_FRAMES and idle >= GC_MIN_IDLE_MS ) or
+             gc.mem_free() < GC_MIN_FREE ):
+            gc.collect()
+            framesSinceGC = 0
+            idle = FRAME_MS - ticks_diff( ticks_ms(), frameStart )
+        if ( idle > 0 ):
+            sleep_ms( idle )
 
 except KeyboardInterrupt:
     print("Keyboard Interrupt")
 finally:
+    gc.enable()
     eyeRight.fill(BACKGROUND)
     eyeLeft.fill(BACKGROUND)
  
@@ -0,0 +1,178 @@
+##
+# PixelArena Class
+#
+# One preallocated block of RAM that all large pixel, line and glyph buffers
+# are carved from, so the MicroPython heap never has to find big contiguous
+# free areas after it has become fragmented.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    pixelArena.py
+
+    Module: Preallocated pixel buffer arena with per-owner accounting.
+
+    Call init( size ) once at boot, before anything else is allocated, then
+    get( owner, nbytes ) hands out memoryview slices of the arena.  Every
+    owner (a short name such as "fill" or "peye") has at most one block;
+    asking again returns the same block, reallocated only if it must grow.
+
+    Without init() buffers come from the heap as before, but each owner's
+    buffer is still kept and reused instead of being allocated per call.
+"""
+
+## Blocks are aligned to this many bytes
+ALIGN = 4
+
+##
+## Class PixelArena
+##
+class PixelArena:
+    '''
+    First-fit allocator over a single bytearray.
+
+    blocks      - owner -> (offset, size) of its block
+    freeList    - sorted list of free (offset, size) extents
+    highWater   - largest number of bytes ever in use at once
+    fallbacks   - requests that did not fit and were given heap memory
+    '''
+
+    def __init__( self, size ):
+        self.size      = size
+        self.memory    = bytearray( size )
+        self.view      = memoryview( self.memory )
+        self.blocks    = {}
+        self.freeList  = [ (0, size) ]
+        self.used      = 0
+        self.highWater = 0
+        self.fallbacks = 0
+        self.heap      = {}     # owner -> heap buffer when the arena was full
+
+    def get( self, owner, nbytes ):
+        # Return owner's buffer of at least nbytes as a memoryview of nbytes
+        block = self.blocks.get( owner )
+        if ( block is not None ):
+            if ( block[1] >= nbytes ):
+                return self.view[ block[0] : block[0] + nbytes ]
+            self.release( owner )
+
+        heapBuffer = self.heap.get( owner )
+        if ( heapBuffer is not None and len( heapBuffer ) >= nbytes ):
+            return memoryview( heapBuffer )[ 0 : nbytes ]
+
+        size = ( nbytes + ALIGN - 1 ) & ~( ALIGN - 1 )
+        for i in range( len( self.freeList ) ):
+            offset, free = self.freeList[ i ]
+            if ( free >= size ):
+                if ( free == size ):
+                    del self.freeList[ i ]
+                else:
+                    self.freeList[ i ] = ( offset + size, free - size )
+                self.blocks[ owner ] = ( offset, size )
+                self.used           += size
+                self.highWater       = max( self.highWater, self.used )
+                return self.view[ offset : offset + nbytes ]
+
+        # Arena full: fall back to the heap rather than failing
+        self.fallbacks     += 1
+        heapBuffer          = bytearray( nbytes )
+        self.heap[ owner ]  = heapBuffer
+        return memoryview( heapBuffer )
+
+    def release( self, owner ):
+        # Return owner's block to the arena, merging neighbouring free extents
+        if ( owner in self.heap ):
+            del self.heap[ owner ]
+
+        block = self.blocks.pop( owner, None )
+        if ( block is None ):
+            return
+        self.used -= block[1]
+
+        freeList = self.freeList
+        i = 0
+        while ( i < len( freeList ) and freeList[ i ][0] < block[0] ):
+            i += 1
+        freeList.insert( i, block )
+
+        # Merge with the following extent, then with the preceding one
+        if ( i + 1 < len( freeList ) and freeList[ i ][0] + freeList[ i ][1] == freeList[ i + 1 ][0] ):
+            freeList[ i ] = ( freeList[ i ][0], freeList[ i ][1] + freeList[ i + 1 ][1] )
+            del freeList[ i + 1 ]
+        if ( i > 0 and freeList[ i - 1 ][0] + freeList[ i - 1 ][1] == freeList[ i ][0] ):
+            freeList[ i - 1 ] = ( freeList[ i - 1 ][0], freeList[ i - 1 ][1] + freeList[ i ][1] )
+            del freeList[ i ]
+
+    def report( self ):
+        # Usage summary: sizes, high-water mark and bytes per owner
+        owners = {}
+        for owner in self.blocks:
+            owners[ owner ] = self.blocks[ owner ][1]
+        for owner in self.heap:
+            owners[ owner ] = len( self.heap[ owner ] )
+        largest = 0
+        for extent in self.freeList:
+            largest = max( largest, extent[1] )
+        return { "size":        self.size,
+                 "used":        self.used,
+                 "highWater":   self.highWater,
+                 "largestFree": largest,
+                 "fallbacks":   self.fallbacks,
+                 "owners":      owners }
+
+    def print( self ):
+        report = self.report()
+        print("Arena Size:      ", report["size"])
+        print("Used:            ", report["used"])
+        print("High Water:      ", report["highWater"])
+        print("Largest Free:    ", report["largestFree"])
+        print("Heap Fallbacks:  ", report["fallbacks"])
+        for owner in report["owners"]:
+            print("   {:16s} {}".format( owner, report["owners"][ owner ] ))
+
+
+## The arena shared by gc9a01py, eyeBitmap and eyeball (None until init)
+arena = None
+
+## Heap buffers kept per owner when there is no arena
+_heapBuffers = {}
+
+# init( size )
+#
+# Create the shared arena.  Call once at boot, before the eye buffers are
+# decoded, while the heap still has one large free area.
+def init( size ):
+    global arena
+    arena = PixelArena( size )
+    return arena
+
+# get( owner, nbytes )
+#
+# Returns owner's buffer (a memoryview of nbytes), from the arena if there
+# is one, otherwise from a heap buffer kept for the owner.
+def get( owner, nbytes ):
+    if ( arena is not None ):
+        return arena.get( owner, nbytes )
+    buffer = _heapBuffers.get( owner )
+    if ( buffer is None or len( buffer ) < nbytes ):
+        buffer = bytearray( nbytes )
+        _heapBuffers[ owner ] = buffer
+    return memoryview( buffer )[ 0 : nbytes ]
+
+# release( owner )
+#
+# Give back owner's buffer.  Views handed out for it must no longer be used.
+def release( owner ):
+    if ( arena is not None ):
+        arena.release( owner )
+    if ( owner in _heapBuffers ):
+        del _heapBuffers[ owner ]
+
+# report()
+#
+# Returns the arena usage summary, or None if init() was not called.
+def report():
+    if ( arena is None ):
+        return None
+    return arena.report()
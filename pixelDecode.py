@@ -0,0 +1,64 @@
+##
+# Pixel Decode
+#
+# Palette and packed bitmap decoding shared by the display driver and the
+# eye modules, kept apart so that neither has to import the other.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+"""
+    pixelDecode.py
+
+    Module: Packed palette bitmap to RGB565 decoding.
+"""
+
+
+# paletteBytes( palette, swapped=True )
+#
+# Splits a PALETTE into the two bytes sent for each color, high byte first.
+# Eye bitmap modules (peye.py) store their colors byte swapped, as
+# eyeBitmap.extractEye() expects; bitmap modules made for GC9A01.bitmap() hold
+# normal RGB565 colors (swapped=False).
+#
+# Returns (high, low) bytearrays indexed by color index.
+def paletteBytes( palette, swapped=True ):
+    high = bytearray( len( palette ) )
+    low  = bytearray( len( palette ) )
+    for i in range( len( palette ) ):
+        color = palette[ i ]
+        if ( swapped ):
+            color = ( ( color & 0xFF ) << 8 ) | ( color >> 8 )
+        high[ i ] = color >> 8
+        low[ i ]  = color & 0xFF
+    return high, low
+
+
+# decodePixels( bitmap, bpp, firstBit, pixels, high, low, buffer, offset=0 )
+#
+# Decodes pixels color indices of bpp bits, starting at bit firstBit of a
+# packed BITMAP, straight into RGB565 pixels of buffer from byte offset,
+# using the color bytes from paletteBytes().  Bits are pulled into an
+# accumulator a byte at a time as in eyeBitmap.extractIndices(), so the start of a
+# frame in a multi-frame bitmap need not be byte aligned.  An index past
+# the end of the palette raises IndexError.
+def decodePixels( bitmap, bpp, firstBit, pixels, high, low, buffer, offset=0 ):
+    mask        = (1 << bpp) - 1
+    bitMapIndex = firstBit >> 3
+    accBits     = 8 - ( firstBit & 7 )
+    accumulator = bitmap[ bitMapIndex ] & ( 0xFF >> ( firstBit & 7 ) )
+    bitMapIndex += 1
+    end         = offset + pixels * 2
+
+    for out in range( offset, end, 2 ):
+        # Top up the accumulator until it holds a full color index
+        while ( accBits < bpp ):
+            accumulator = ( (accumulator << 8) | bitmap[ bitMapIndex ] ) & 0xFFFF
+            bitMapIndex += 1
+            accBits     += 8
+
+        accBits   -= bpp
+        colorIndex = ( accumulator >> accBits ) & mask
+        buffer[ out ]     = high[ colorIndex ]
+        buffer[ out + 1 ] = low[ colorIndex ]
+    # end of decodePixels()
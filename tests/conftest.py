@@ -0,0 +1,24 @@
+##
+# Test setup
+#
+# Puts the repository and the stand-ins for MicroPython's built in modules
+# (tests/fakes) on the import path, so the eye modules run under CPython.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import builtins
+import os
+import sys
+import time
+
+HERE = os.path.dirname( os.path.abspath( __file__ ) )
+sys.path.insert( 0, os.path.join( HERE, "fakes" ) )
+sys.path.insert( 0, os.path.dirname( HERE ) )
+
+# const() is a builtin on MicroPython and some modules use it unimported;
+# ptr8() exists inside viper functions, which run as plain Python here;
+# the driver's time module has sleep_ms()
+builtins.const = lambda value: value
+builtins.ptr8  = lambda buffer: buffer
+time.sleep_ms  = lambda ms: None
@@ -0,0 +1,38 @@
+##
+# deflate stand-in
+#
+# Decompressing DeflateIO on CPython's zlib.  Like the real stream it
+# returns short reads, and like it the window bits given are the largest
+# window the stream may use.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import zlib
+
+ZLIB = 1
+
+## Most bytes one readinto() returns
+SHORT_READ = 300
+
+##
+## Class DeflateIO
+##
+class DeflateIO:
+    def __init__( self, stream, format, wbits=15 ):
+        self.stream  = stream
+        self.inflate = zlib.decompressobj( wbits )
+        self.pending = b''
+
+    def readinto( self, view ):
+        wanted = len( view )
+        while ( len( self.pending ) < wanted ):
+            data = self.stream.read( 97 )
+            if ( not data ):
+                self.pending += self.inflate.flush()
+                break
+            self.pending += self.inflate.decompress( data )
+        count = min( wanted, len( self.pending ), SHORT_READ )
+        view[ 0 : count ] = self.pending[ 0 : count ]
+        self.pending = self.pending[ count : ]
+        return count
@@ -0,0 +1,48 @@
+##
+# framebuf stand-in
+#
+# RGB565 FrameBuffer with the drawing calls eyeScene uses, pixels stored
+# in the CPU's (little endian) byte order like the real module.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+RGB565 = 1
+
+##
+## Class FrameBuffer
+##
+class FrameBuffer:
+    def __init__( self, buffer, width, height, format ):
+        self.buffer = buffer
+        self.width  = width
+        self.height = height
+
+    def pixel( self, x, y, color=None ):
+        offset = ( y * self.width + x ) * 2
+        if ( color is None ):
+            return self.buffer[ offset ] | ( self.buffer[ offset + 1 ] << 8 )
+        if ( 0 <= x < self.width and 0 <= y < self.height ):
+            self.buffer[ offset ]     = color & 0xFF
+            self.buffer[ offset + 1 ] = color >> 8
+
+    def fill( self, color ):
+        self.fill_rect( 0, 0, self.width, self.height, color )
+
+    def fill_rect( self, x, y, width, height, color ):
+        for row in range( y, y + height ):
+            for column in range( x, x + width ):
+                self.pixel( column, row, color )
+
+    def blit( self, source, x, y, key=-1 ):
+        for row in range( source.height ):
+            for column in range( source.width ):
+                color = source.pixel( column, row )
+                if ( color != key ):
+                    self.pixel( x + column, y + row, color )
+
+    def text( self, text, x, y, color ):
+        # A diagonal stroke per character stands in for the font
+        for i in range( len( text ) ):
+            for k in range( 8 ):
+                self.pixel( x + 8 * i + k, y + k, color )
@@ -0,0 +1,58 @@
+##
+# machine stand-in
+#
+# The parts of MicroPython's machine module the eye modules touch: pins
+# that remember their level, an ADC that reads mid scale and an SPI bus
+# that drops what it is sent.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+##
+## Class Pin
+##
+class Pin:
+    IN          = 0
+    OUT         = 1
+    PULL_UP     = 1
+    PULL_DOWN   = 2
+    IRQ_FALLING = 4
+
+    def __init__( self, *args, **kwargs ):
+        self.level = 1
+
+    def on( self ):
+        self.level = 1
+
+    def off( self ):
+        self.level = 0
+
+    def value( self, level=None ):
+        if ( level is None ):
+            return self.level
+        self.level = level
+
+    def irq( self, **kwargs ):
+        pass
+
+
+##
+## Class ADC
+##
+class ADC:
+    def __init__( self, *args ):
+        pass
+
+    def read_u16( self ):
+        return 32768
+
+
+##
+## Class SPI
+##
+class SPI:
+    def __init__( self, *args, **kwargs ):
+        self.nbytes = 0
+
+    def write( self, data ):
+        self.nbytes += len( data )
@@ -0,0 +1,17 @@
+##
+# micropython stand-in
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+def const( value ):
+    return value
+
+def native( function ):
+    return function
+
+def viper( function ):
+    return function
+
+def mem_info( *args ):
+    pass
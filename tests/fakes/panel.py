@@ -0,0 +1,110 @@
+##
+# Panel emulator
+#
+# Stands in for the SPI bus of one GC9A01, or of several sharing a bus,
+# and keeps what each panel would show, so tests can compare whole screens.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+from machine import Pin
+
+## Commands the emulator follows
+CASET  = 0x2A
+RASET  = 0x2B
+RAMWR  = 0x2C
+RAMWRC = 0x3C
+MADCTL = 0x36
+
+##
+## Class Panel
+##
+class Panel:
+    '''
+    Follows CASET, RASET, RAMWR, Write Memory Continue and MADCTL.  Column
+    order is taken from the MADCTL MX bit (0x40) the way the panel scans,
+    so pixels holds the screen as seen, mirrored displays included.
+
+    dc      - the data / command pin to hand to GC9A01
+    pixels  - 240 x 240 RGB565 screen, high byte first
+    nbytes  - bytes of pixel data received
+    '''
+
+    def __init__( self, size=240 ):
+        self.size    = size
+        self.dc      = Pin()
+        self.pixels  = bytearray( size * size * 2 )
+        self.nbytes  = 0
+        self.command = None
+        self.madctl  = 0x40
+        self.columns = ( 0, size - 1 )
+        self.rows    = ( 0, size - 1 )
+        self.column  = 0
+        self.row     = 0
+        self.pending = b''
+
+    def write( self, data ):
+        data = bytes( data )
+        if ( self.dc.value() == 0 ):
+            self.command = data[ 0 ]
+            if ( self.command == RAMWR ):
+                self.column  = self.columns[ 0 ]
+                self.row     = self.rows[ 0 ]
+                self.pending = b''
+            return
+
+        command = self.command
+        if ( command == CASET ):
+            self.columns = ( ( data[ 0 ] << 8 ) | data[ 1 ], ( data[ 2 ] << 8 ) | data[ 3 ] )
+        elif ( command == RASET ):
+            self.rows = ( ( data[ 0 ] << 8 ) | data[ 1 ], ( data[ 2 ] << 8 ) | data[ 3 ] )
+        elif ( command == MADCTL ):
+            self.madctl = data[ 0 ]
+        elif ( command == RAMWR or command == RAMWRC ):
+            self.nbytes += len( data )
+            data  = self.pending + data
+            whole = len( data ) & ~1
+            self.pending = data[ whole : ]
+            for i in range( 0, whole, 2 ):
+                self.store( data[ i : i + 2 ] )
+
+    def store( self, pixel ):
+        size = self.size
+        if ( self.column < size and self.row < size ):
+            column = self.column if ( self.madctl & 0x40 ) else size - 1 - self.column
+            offset = ( self.row * size + column ) * 2
+            self.pixels[ offset : offset + 2 ] = pixel
+        self.column += 1
+        if ( self.column > self.columns[ 1 ] ):
+            self.column = self.columns[ 0 ]
+            self.row   += 1
+
+
+##
+## Class Bus
+##
+class Bus:
+    '''
+    One SPI bus wired to count panels the way the eye displays are: a
+    shared data / command pin and a chip select pin per panel.  Whatever
+    is written reaches every panel whose chip select is low.
+
+    dc      - the shared data / command pin
+    cs      - chip select pin of each panel
+    panels  - the Panel emulators
+    '''
+
+    def __init__( self, count, size=240 ):
+        self.dc     = Pin()
+        self.cs     = []
+        self.panels = []
+        for _ in range( count ):
+            panel    = Panel( size )
+            panel.dc = self.dc
+            self.cs.append( Pin() )
+            self.panels.append( panel )
+
+    def write( self, data ):
+        for i in range( len( self.panels ) ):
+            if ( self.cs[ i ].value() == 0 ):
+                self.panels[ i ].write( data )
@@ -0,0 +1,7 @@
+##
+# ustruct stand-in
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+from struct import *
@@ -0,0 +1,28 @@
+##
+# utime stand-in
+#
+# A clock that only moves when sleep_ms() or advance() is called, so tests
+# control time exactly.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+_now = [ 0 ]
+
+def ticks_ms():
+    return _now[ 0 ]
+
+def ticks_us():
+    return _now[ 0 ] * 1000
+
+def ticks_diff( a, b ):
+    return a - b
+
+def ticks_add( a, b ):
+    return a + b
+
+def sleep_ms( ms ):
+    _now[ 0 ] += ms
+
+def advance( ms ):
+    _now[ 0 ] += ms
@@ -0,0 +1,123 @@
+##
+# eyeArray tests
+#
+# Draws three eyes on panels sharing one bus, where eyes in the same state
+# are broadcast with several chip selects low, and compares every screen
+# with the same eye drawn on a panel of its own.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import pytest
+
+import gc9a01py as gc9a01
+import pixelArena
+
+from eyeArray import EyeArray
+from eyeball  import Eyeball, EyelidCurve
+from eyeDelta import SpanDelta
+from eyePupil import PupilDilation
+from eyeWarp  import GazeWarp
+from panel    import Bus, Panel
+
+COUNT = 3
+SIZE  = 40
+
+
+@pytest.fixture
+def arena():
+    pixelArena.init( 64 * 1024 )
+    yield pixelArena.arena
+    pixelArena.arena = None
+
+def image():
+    pixels = bytearray( SIZE * SIZE * 2 )
+    for i in range( SIZE * SIZE ):
+        color = ( i * 37 + 5 ) & 0xFFFE
+        pixels[ i * 2 ]     = color >> 8
+        pixels[ i * 2 + 1 ] = color & 0xFF
+    return pixels
+
+def delta( value, box=( 10, 10, 30, 30 ) ):
+    # A variant that paints box one color
+    result = SpanDelta( SIZE, SIZE )
+    for row in range( box[1], box[3] ):
+        result.addSpan( row, box[0], bytes( ( value, value ) ) * ( box[2] - box[0] ) )
+    return result
+
+def setup( attach=None ):
+    # The eyes on a shared bus, and the same eyes each on a panel of their
+    # own; attach( eyes ) adds shared extras to each set
+    buffer  = image()
+    lids    = EyelidCurve( 240 )
+    bus     = Bus( COUNT )
+    grouped = []
+    alone   = []
+    panels  = []
+    for i in range( COUNT ):
+        display = gc9a01.GC9A01( bus, dc=bus.dc, cs=bus.cs[ i ] )
+        grouped.append( Eyeball( buffer, SIZE, SIZE, display ) )
+        panel   = Panel()
+        alone.append( Eyeball( buffer, SIZE, SIZE, gc9a01.GC9A01( panel, dc=panel.dc, cs=None ) ) )
+        panels.append( panel )
+    for eyes in ( grouped, alone ):
+        for eye in eyes:
+            eye.setLids( lids )
+        if ( attach is not None ):
+            attach( eyes )
+    return EyeArray( grouped ), alone, bus, panels
+
+def drawAt( group, alone, x, y ):
+    group.drawAt( x, y )
+    for eye in alone:
+        eye.drawAt( x, y )
+
+def assertSameScreens( bus, panels ):
+    for i in range( COUNT ):
+        assert bus.panels[ i ].pixels == panels[ i ].pixels, "eye {}".format( i )
+
+
+def test_eyes_in_the_same_state_are_drawn_once( arena ):
+    group, alone, bus, panels = setup()
+    drawAt( group, alone, 60, 70 )
+    assert group.draws == 1
+    assertSameScreens( bus, panels )
+
+def test_lid_level_splits_the_group( arena ):
+    group, alone, bus, panels = setup()
+    drawAt( group, alone, 60, 70 )
+    group[ 2 ].setLidLevel( 3 )
+    alone[ 2 ].setLidLevel( 3 )
+    drawAt( group, alone, 90, 95 )
+    assert group.draws == 2
+    assertSameScreens( bus, panels )
+
+def test_pupil_level_splits_the_group( arena ):
+    def attach( eyes ):
+        pupil = PupilDilation( eyes[ 0 ].buffer, SIZE, ( 10, 10, 30, 30 ),
+                               [ delta( 0x11 ), delta( 0x22 ) ] )
+        for eye in eyes:
+            eye.setPupil( pupil )
+    group, alone, bus, panels = setup( attach )
+    drawAt( group, alone, 60, 70 )
+    group[ 1 ].dilate( 1 )
+    alone[ 1 ].dilate( 1 )
+    drawAt( group, alone, 104, 100 )
+    assert group.draws == 2
+    assertSameScreens( bus, panels )
+
+def test_followers_select_the_warp( arena ):
+    def attach( eyes ):
+        # One color per variant, so a wrong variant shows
+        deltas = [ delta( 0x10 + key * 0x10 ) for key in range( 9 ) ]
+        warp   = GazeWarp( eyes[ 0 ].buffer, SIZE, SIZE, 1, deltas )
+        for eye in eyes:
+            eye.setWarp( warp )
+    group, alone, bus, panels = setup( attach )
+    for x, y in ( ( 60, 70 ), ( 190, 20 ), ( 10, 180 ), ( 100, 100 ) ):
+        drawAt( group, alone, x, y )
+        assert group.draws == 1
+        for i in range( COUNT ):
+            assert group[ i ].warpKey == alone[ i ].warpKey
+            assert group[ i ].buffer == alone[ i ].buffer
+        assertSameScreens( bus, panels )
@@ -0,0 +1,50 @@
+##
+# eyeBitmap tests
+#
+# Loads the peye bitmap module through the flash cache onto two panels,
+# one mirrored, decoding on the first load and reading back on the second.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import pytest
+
+import gc9a01py as gc9a01
+import eyeBitmap
+import peye
+
+from eyeBitmap import extractEye, loadEye, cacheReport
+from panel     import Panel
+
+
+@pytest.fixture( scope="module" )
+def reference():
+    return bytes( extractEye( peye, "reference" ) )
+
+def centered( reference, mirror ):
+    # A panel with the eye blitted in the middle, for comparison
+    panel   = Panel()
+    display = gc9a01.GC9A01( panel, dc=panel.dc, cs=None, mirror=mirror )
+    display.blit_buffer( reference, ( 240 - peye.WIDTH ) // 2, ( 240 - peye.HEIGHT ) // 2,
+                         peye.WIDTH, peye.HEIGHT )
+    return panel.pixels
+
+@pytest.mark.parametrize( "hit", ( False, True ) )
+def test_load_draws_on_every_display( tmp_path, reference, hit ):
+    cacheDir = str( tmp_path / "cache" )
+    if ( hit ):
+        loadEye( peye, cacheDir, owner="first load" )
+    panels   = [ Panel(), Panel() ]
+    displays = [ gc9a01.GC9A01( panels[ i ], dc=panels[ i ].dc, cs=None, mirror=( i == 1 ) )
+                 for i in range( 2 ) ]
+    buffer   = loadEye( peye, cacheDir, owner="eye", displays=displays )
+    assert bytes( buffer ) == reference
+    assert cacheReport[ "hit" ] == hit
+    assert 0 <= cacheReport[ "firstMs" ] <= cacheReport[ "ms" ]
+    for i in range( 2 ):
+        assert panels[ i ].pixels == centered( reference, i == 1 )
+
+def test_rows_cover_the_eye( reference ):
+    rows = [ ( row, count ) for row, count, pixels in eyeBitmap.extractEyeRows( peye, "bands", 10 ) ]
+    assert rows[ 0 ] == ( 0, 10 )
+    assert rows[ -1 ] == ( 110, 5 )
@@ -0,0 +1,98 @@
+##
+# eyeComposite tests
+#
+# An eye drawn through a CompositeSprite that keeps its composed sprite
+# must show the same screen as one composed afresh for every draw, also
+# when the pupil image is rewritten in place for another level.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import random
+
+import pytest
+
+import gc9a01py as gc9a01
+import pixelArena
+
+from eyeball      import Eyeball, EyelidCurve
+from eyeComposite import CompositeSprite
+from eyeDelta     import SpanDelta
+from eyePupil     import PupilDilation
+from eyeSclera    import renderSclera
+from panel        import Panel
+
+SIZE = 40
+BOX  = ( 12, 12, 28, 28 )
+KEY  = 0xFFFF
+
+
+@pytest.fixture( scope="module" )
+def sclera():
+    random.seed( 5 )
+    return renderSclera( 240 )
+
+@pytest.fixture
+def arena():
+    pixelArena.init( 64 * 1024 )
+    yield pixelArena.arena
+    pixelArena.arena = None
+
+def image():
+    # Random opaque pixels with key colored corners
+    random.seed( 9 )
+    pixels = bytearray( SIZE * SIZE * 2 )
+    for row in range( SIZE ):
+        for column in range( SIZE ):
+            if ( min( row, SIZE - 1 - row ) + min( column, SIZE - 1 - column ) < 6 ):
+                color = KEY
+            else:
+                color = random.getrandbits( 16 ) & 0xFFFE
+            pixels[ ( row * SIZE + column ) * 2 ]     = color >> 8
+            pixels[ ( row * SIZE + column ) * 2 + 1 ] = color & 0xFF
+    return pixels
+
+def delta( value ):
+    # A pupil level that paints the box one color
+    result = SpanDelta( SIZE, SIZE )
+    for row in range( BOX[1], BOX[3] ):
+        result.addSpan( row, BOX[0], bytes( ( value, value ) ) * ( BOX[2] - BOX[0] ) )
+    return result
+
+def eye( sclera, buffer, pupil, cache ):
+    panel   = Panel()
+    display = gc9a01.GC9A01( panel, dc=panel.dc, cs=None )
+    result  = Eyeball( buffer, SIZE, SIZE, display )
+    result.setSclera( sclera )
+    result.setComposite( CompositeSprite( buffer, SIZE, SIZE, KEY, cache=cache ) )
+    result.setPupil( pupil )
+    result.setLids( EyelidCurve( 240 ) )
+    result.clear()
+    return result, panel
+
+def pair( sclera ):
+    # An eye keeping its sprite and one composing every draw
+    buffer = image()
+    levels = [ delta( 0x11 ), delta( 0x66 ) ]
+    kept,  keptPanel  = eye( sclera, buffer, PupilDilation( buffer, SIZE, BOX, levels ), "test sprite" )
+    fresh, freshPanel = eye( sclera, buffer, PupilDilation( buffer, SIZE, BOX, levels ), None )
+    return ( kept, fresh ), keptPanel, freshPanel
+
+
+def test_dilate_then_show( arena, sclera ):
+    eyes, keptPanel, freshPanel = pair( sclera )
+    for level in ( 0, 1, 0 ):
+        for each in eyes:
+            each.dilate( level )
+            each.show()
+        assert keptPanel.pixels == freshPanel.pixels
+
+def test_lids_open_after_dilate( arena, sclera ):
+    eyes, keptPanel, freshPanel = pair( sclera )
+    for each in eyes:
+        each.dilate( 0 )
+        each.show()
+        each.setLidLevel( 0 )
+        each.dilate( 1 )
+        each.setLidLevel( each.lids.levels - 1 )
+    assert keptPanel.pixels == freshPanel.pixels
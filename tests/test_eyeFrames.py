@@ -0,0 +1,164 @@
+##
+# eyeFrames tests
+#
+# Plays small frame files through the panel emulator with the stand-in
+# clock, checking what is shown and how late or short frames are counted.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import random
+
+import pytest
+import utime
+
+import gc9a01py as gc9a01
+
+from eyeFrames import FramePlayer, saveFrames
+from panel     import Panel
+
+WIDTH  = 20
+HEIGHT = 30
+COUNT  = 4
+
+
+##
+## Class SlowFile
+##
+class SlowFile:
+    '''
+    Wraps a frame file so that every read takes ms on the stand-in clock
+    and, with short, stops after that many bytes.
+    '''
+
+    def __init__( self, file, ms, short=None ):
+        self.file  = file
+        self.ms    = ms
+        self.short = short
+
+    def seek( self, *args ):
+        return self.file.seek( *args )
+
+    def readinto( self, buffer ):
+        utime.advance( self.ms )
+        if ( self.short is not None ):
+            return self.file.readinto( memoryview( buffer )[ 0 : self.short ] )
+        return self.file.readinto( buffer )
+
+    def close( self ):
+        self.file.close()
+
+
+@pytest.fixture
+def frameFile( tmp_path ):
+    random.seed( 3 )
+    frames   = [ bytes( random.getrandbits( 8 ) for _ in range( WIDTH * HEIGHT * 2 ) ) for _ in range( COUNT ) ]
+    fileName = str( tmp_path / "frames.bin" )
+    saveFrames( fileName, WIDTH, HEIGHT, 40, frames )
+    return fileName, frames
+
+def shown( panel, player ):
+    rows = []
+    for row in range( HEIGHT ):
+        start = ( ( player.y + row ) * 240 + player.x ) * 2
+        rows.append( bytes( panel.pixels[ start : start + WIDTH * 2 ] ) )
+    return b''.join( rows )
+
+def player( fileName, **kwargs ):
+    panel   = Panel()
+    display = gc9a01.GC9A01( panel, dc=panel.dc, cs=None )
+    return panel, FramePlayer( display, fileName, bandPixels=200, **kwargs )
+
+def test_play_follows_the_clock( frameFile ):
+    fileName, frames = frameFile
+    panel, play = player( fileName )
+    now = utime.ticks_ms()
+    play.start( now )
+    assert shown( panel, play ) == frames[ 0 ]
+    assert not play.update( now + 39 )
+    assert play.update( now + 40 )
+    assert shown( panel, play ) == frames[ 1 ]
+
+    # Frames 2 and 3 are over by now and skipped unread
+    assert play.update( now + 165 )
+    assert shown( panel, play ) == frames[ 0 ]
+    assert play.stats()[ "dropped" ] == 2
+    assert play.stats()[ "underruns" ] == 0
+    play.close()
+
+def test_indexed_frames( tmp_path ):
+    random.seed( 4 )
+    palette  = [ random.getrandbits( 16 ) for _ in range( 256 ) ]
+    frames   = [ bytes( random.getrandbits( 8 ) for _ in range( WIDTH * HEIGHT ) ) for _ in range( COUNT ) ]
+    fileName = str( tmp_path / "indexed.bin" )
+    saveFrames( fileName, WIDTH, HEIGHT, 40, frames, palette )
+    panel, play = player( fileName )
+    now = utime.ticks_ms()
+    play.start( now )
+    for i in range( COUNT ):
+        if ( i ):
+            assert play.update( now + 40 * i )
+        pixels = bytearray()
+        for index in frames[ i ]:
+            pixels += bytes( ( palette[ index ] >> 8, palette[ index ] & 0xFF ) )
+        assert shown( panel, play ) == pixels
+    play.close()
+
+def test_slow_frame_counts_from_start_of_send( frameFile ):
+    fileName, frames = frameFile
+    panel, play = player( fileName )
+    play.start( utime.ticks_ms() )
+
+    # Handed a time 35 ms old, a send of 6 ms is still in time
+    play.file = SlowFile( play.file, 2 )
+    utime.advance( 75 )
+    play.update( utime.ticks_ms() - 35 )
+    assert play.stats()[ "underruns" ] == 0
+
+    play.file.ms = 20
+    utime.advance( 40 )
+    play.update( utime.ticks_ms() )
+    assert play.stats()[ "underruns" ] == 1
+    assert play.stats()[ "worstMs" ] >= 40
+    play.close()
+
+def test_short_and_slow_frame_is_one_underrun( frameFile ):
+    fileName, frames = frameFile
+    panel, play = player( fileName )
+    play.start( utime.ticks_ms() )
+    play.file = SlowFile( play.file, 50, short=10 )
+    utime.advance( 40 )
+    play.update( utime.ticks_ms() )
+    assert play.stats()[ "underruns" ] == 1
+    play.close()
+
+@pytest.mark.parametrize( "fps", ( 0, -5, 1001 ) )
+def test_frame_rate_is_checked( frameFile, fps ):
+    with pytest.raises( ValueError ):
+        player( frameFile[ 0 ], fps=fps )
+
+def test_frame_time_of_zero_is_refused( tmp_path ):
+    fileName = str( tmp_path / "still.bin" )
+    saveFrames( fileName, WIDTH, HEIGHT, 0, [ bytes( WIDTH * HEIGHT * 2 ) ] )
+    with pytest.raises( ValueError ):
+        player( fileName )
+    panel, play = player( fileName, fps=25 )
+    assert play.frameMs == 40
+    play.close()
+
+def test_frame_partly_off_panel( frameFile ):
+    # Only the rows on the panel are read, and the next frame still starts
+    # at its own place in the file
+    fileName, frames = frameFile
+    panel   = Panel()
+    display = gc9a01.GC9A01( panel, dc=panel.dc, cs=None )
+    play    = FramePlayer( display, fileName, x=-5, y=225, bandPixels=200 )
+    now     = utime.ticks_ms()
+    play.start( now )
+    play.update( now + 40 )
+    for row in range( 240 - 225 ):
+        start = ( 225 + row ) * 240 * 2
+        frame = frames[ 1 ][ ( row * WIDTH + 5 ) * 2 : ( row + 1 ) * WIDTH * 2 ]
+        assert panel.pixels[ start : start + len( frame ) ] == frame
+    assert play.stats()[ "underruns" ] == 0
+    play.close()
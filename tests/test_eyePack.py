@@ -0,0 +1,69 @@
+##
+# eyePack tests
+#
+# Packs images stored, compressed, RGB565 and indexed, and draws them back
+# band by band through the panel emulator.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import os
+import random
+
+import pytest
+
+import gc9a01py as gc9a01
+import eyePack
+
+from eyePack import PackedEye, packEye, benchmark
+from panel   import Panel
+
+WIDTH  = 37
+HEIGHT = 29
+
+
+@pytest.fixture( scope="module" )
+def image():
+    # Runs of a few colors, so that compression has something to find
+    random.seed( 5 )
+    pixels = bytearray()
+    while ( len( pixels ) < WIDTH * HEIGHT * 2 ):
+        color   = random.choice( ( 0x0000, 0xF800, 0x07E0, 0x1234 ) )
+        pixels += bytes( ( color >> 8, color & 0xFF ) ) * random.randint( 1, 20 )
+    return bytes( pixels[ 0 : WIDTH * HEIGHT * 2 ] )
+
+@pytest.mark.parametrize( "method", ( eyePack.STORED, eyePack.ZLIB ) )
+def test_draw_matches_image( tmp_path, image, method ):
+    fileName = str( tmp_path / "eye.epk" )
+    packEye( fileName, image, WIDTH, HEIGHT, method=method )
+    packed  = PackedEye( fileName, bandPixels=200 )
+    panel   = Panel()
+    display = gc9a01.GC9A01( panel, dc=panel.dc, cs=None )
+    packed.draw( display, 50, 60 )
+    for row in range( HEIGHT ):
+        start = ( ( 60 + row ) * 240 + 50 ) * 2
+        assert panel.pixels[ start : start + WIDTH * 2 ] == image[ row * WIDTH * 2 : ( row + 1 ) * WIDTH * 2 ]
+    assert bytes( packed.loadInto( bytearray( len( image ) ) ) ) == image
+
+def test_indexed_file( tmp_path ):
+    random.seed( 6 )
+    palette  = [ random.getrandbits( 16 ) for _ in range( 16 ) ]
+    indices  = bytes( random.randrange( 16 ) for _ in range( WIDTH * HEIGHT ) )
+    fileName = str( tmp_path / "indexed.epk" )
+    packEye( fileName, indices, WIDTH, HEIGHT, palette )
+    pixels = PackedEye( fileName, bandPixels=100 ).loadInto( bytearray( WIDTH * HEIGHT * 2 ) )
+    for i in range( WIDTH * HEIGHT ):
+        color = palette[ indices[ i ] ]
+        assert pixels[ i * 2 : i * 2 + 2 ] == bytes( ( color >> 8, color & 0xFF ) )
+
+def test_compressed_with_small_window( image ):
+    # CINFO, the top of the zlib header's first byte, is window bits - 8
+    data = eyePack.compress( image )
+    assert data[ 0 ] >> 4 == eyePack.WINDOW_BITS - 8
+
+def test_benchmark_removes_raw_copy( tmp_path, image ):
+    fileName = str( tmp_path / "eye.epk" )
+    packEye( fileName, image, WIDTH, HEIGHT )
+    result = benchmark( fileName, repeats=1 )
+    assert result[ "rawBytes" ] > result[ "packedBytes" ]
+    assert not os.path.exists( fileName + ".raw" )
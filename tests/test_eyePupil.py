@@ -0,0 +1,64 @@
+##
+# eyePupil tests
+#
+# Every PupilDilation (and PaddedSprite) keeps its images in arena blocks
+# of its own, so one instance composing a level never changes the pixels
+# another has handed out.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import pytest
+
+import pixelArena
+
+from eyeDelta  import SpanDelta
+from eyePupil  import PupilDilation
+from eyeSprite import PaddedSprite
+
+WIDTH  = 8
+HEIGHT = 6
+BOX    = ( 2, 1, 6, 5 )
+
+
+@pytest.fixture
+def arena():
+    pixelArena.init( 16 * 1024 )
+    yield pixelArena.arena
+    pixelArena.arena = None
+
+def delta( value ):
+    # A level that paints the box one color
+    result = SpanDelta( WIDTH, HEIGHT )
+    for row in range( BOX[1], BOX[3] ):
+        result.addSpan( row, BOX[0], bytes( ( value, value ) ) * ( BOX[2] - BOX[0] ) )
+    return result
+
+def dilation( buffer, first, second ):
+    return PupilDilation( buffer, WIDTH, BOX, [ delta( first ), delta( second ) ] )
+
+def boxPixel( image ):
+    return image[ ( BOX[1] * WIDTH + BOX[0] ) * 2 ]
+
+
+def test_full_images_are_kept_apart( arena ):
+    buffer = bytes( WIDTH * HEIGHT * 2 )
+    a      = dilation( buffer, 0x11, 0x22 )
+    b      = dilation( buffer, 0x33, 0x44 )
+    assert boxPixel( a.fullImage( 1 ) ) == 0x22
+    assert boxPixel( b.fullImage( 0 ) ) == 0x33
+    assert boxPixel( a.fullImage( 1 ) ) == 0x22
+    assert a.owner != b.owner
+
+def test_owner_can_be_given( arena ):
+    pupil = PupilDilation( bytes( WIDTH * HEIGHT * 2 ), WIDTH, BOX, [ delta( 1 ) ],
+                           owner="right pupil" )
+    pupil.fullImage( 0 )
+    assert "right pupil" in pixelArena.report()[ "owners" ]
+
+def test_padded_copies_are_kept_apart( arena ):
+    buffer = bytes( WIDTH * HEIGHT * 2 )
+    black  = PaddedSprite( buffer, WIDTH, HEIGHT, 0x0000 )
+    white  = PaddedSprite( buffer, WIDTH, HEIGHT, 0xFFFF )
+    assert black.buffers[ 257 ][ 0 ] == 0x00
+    assert white.buffers[ 257 ][ 0 ] == 0xFF
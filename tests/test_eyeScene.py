@@ -0,0 +1,92 @@
+##
+# eyeScene tests
+#
+# Renders a scene of a sclera, an iris sprite and lids through the panel
+# emulator, moving the iris so that only part of the screen is redrawn, and
+# compares the screen with one worked out pixel by pixel.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import random
+
+import pytest
+
+import gc9a01py as gc9a01
+
+from eyeball   import EyelidCurve
+from eyeScene  import Scene, ScleraLayer, SpriteLayer, LidLayer
+from eyeSclera import renderSclera
+from panel     import Panel
+
+SIZE   = 240
+WIDTH  = 30
+HEIGHT = 24
+KEY    = 0xFFFF
+
+
+@pytest.fixture( scope="module" )
+def sclera():
+    random.seed( 7 )
+    return renderSclera( SIZE )
+
+@pytest.fixture( scope="module" )
+def image():
+    # Random opaque pixels inside a key colored frame
+    random.seed( 11 )
+    pixels = bytearray( WIDTH * HEIGHT * 2 )
+    for row in range( HEIGHT ):
+        for column in range( WIDTH ):
+            if ( row in ( 0, HEIGHT - 1 ) or column in ( 0, WIDTH - 1 ) ):
+                color = KEY
+            else:
+                color = random.getrandbits( 16 ) & 0xFFFE
+            pixels[ ( row * WIDTH + column ) * 2 ]     = color >> 8
+            pixels[ ( row * WIDTH + column ) * 2 + 1 ] = color & 0xFF
+    return pixels
+
+def expected( sclera, image, lids, level, x, y, mirror ):
+    # The screen as it should look, worked out one pixel at a time.  On a
+    # mirrored display the sprite stays in place but reads reversed and
+    # the sclera, covering the panel, is mirrored as a whole.
+    screen = bytearray( SIZE * SIZE * 2 )
+    for row in range( SIZE ):
+        gap = lids.gap( level, row )
+        for column in range( SIZE ):
+            source = ( x + WIDTH - 1 - column ) if mirror else ( column - x )
+            offset = ( ( row - y ) * WIDTH + source ) * 2
+            if ( not ( lids.center - gap <= column < lids.center + gap ) ):
+                pixel = bytes( ( lids.color >> 8, lids.color & 0xFF ) )
+            elif ( 0 <= source < WIDTH and y <= row < y + HEIGHT and
+                   image[ offset : offset + 2 ] != b'\xff\xff' ):
+                pixel = image[ offset : offset + 2 ]
+            else:
+                back   = ( SIZE - 1 - column ) if mirror else column
+                packed = sclera.indices[ ( row * SIZE + back ) >> 1 ]
+                index  = ( packed & 0x0F ) if ( back & 1 ) else ( packed >> 4 )
+                pixel  = bytes( ( sclera.high[ index ], sclera.low[ index ] ) )
+            screen[ ( row * SIZE + column ) * 2 : ( row * SIZE + column ) * 2 + 2 ] = pixel
+    return screen
+
+@pytest.mark.parametrize( "mirror", ( False, True ) )
+def test_partial_renders_match_whole_screen( sclera, image, mirror ):
+    panel   = Panel()
+    display = gc9a01.GC9A01( panel, dc=panel.dc, cs=None, mirror=mirror )
+    lids    = EyelidCurve( SIZE )
+    scene   = Scene( display, [ ScleraLayer( sclera ) ] )
+    iris    = scene.add( SpriteLayer( image, WIDTH, HEIGHT, 100, 100, KEY ) )
+    lid     = scene.add( LidLayer( lids ) )
+    assert scene.render()
+
+    # Small moves redraw only the box around the old and new place
+    for step in ( ( 5, 3 ), ( -2, 7 ), ( 40, -20 ) ):
+        iris.moveTo( iris.x + step[ 0 ], iris.y + step[ 1 ] )
+        sent = panel.nbytes
+        assert scene.render()
+        assert panel.nbytes - sent < SIZE * SIZE * 2 // 4
+        assert panel.pixels == expected( sclera, image, lids, lids.levels - 1, iris.x, iris.y, mirror )
+    assert not scene.render()
+
+    lid.setLevel( 6 )
+    scene.render()
+    assert panel.pixels == expected( sclera, image, lids, 6, iris.x, iris.y, mirror )
@@ -0,0 +1,164 @@
+##
+# heapCheck tests
+#
+# Runs the steady-state frames of the eyes (moves on and off the panel,
+# mirrored displays, broadcast groups, paths, blinks) through
+# heapCheck.checkFrame and fails if a frame allocates.
+#
+# The SPI bus keeps every buffer it is handed.  A driver that sends views
+# it keeps hands over the same objects every frame, while a slice made for
+# one write is kept too and shows up as memory the frame held on to.
+#
+#  Copyright © 2025, Steven F. LeBrun.  All rights reserved.
+#
+
+import sys
+
+import pytest
+
+import gc9a01py as gc9a01
+import heapCheck
+import pixelArena
+
+from eyeArray import EyeArray
+from eyeball  import Eyeball, EyelidCurve
+from eyePath  import PathPlayer, PATTERNS
+from machine  import Pin, SPI
+
+SIZE  = 115
+HALF  = ( SIZE + 1 ) // 2
+
+# Under CPython every integer above 256 is a heap object, so a frame that
+# allocates nothing on the device still peaks a few hundred bytes above
+# where it started (see heapCheck.frameAllocations).  Copies of pixel rows
+# are far larger than this.
+LIMIT = 1024
+
+# Places that are on the panel, clipped at each edge and in the corners
+PLACES = [ ( 62, 62 ), ( 60, 65 ), ( -20, 62 ), ( -57, 30 ), ( 180, 62 ),
+           ( 62, -40 ), ( 62, 170 ), ( -30, -30 ), ( 200, 190 ), ( 62, 62 ) ]
+
+
+##
+## Class KeepingSPI
+##
+class KeepingSPI( SPI ):
+    '''
+    SPI bus that keeps a reference to every buffer written to it, one per
+    object, so buffers made for a single write are never freed.
+    '''
+
+    def __init__( self ):
+        super().__init__()
+        self.kept = {}
+
+    def write( self, data ):
+        self.kept[ id( data ) ] = data
+
+
+@pytest.fixture
+def arena():
+    pixelArena.init( 64 * 1024 )
+    yield pixelArena.arena
+    pixelArena.arena = None
+
+def image( width, height, seed ):
+    # Pixels that differ from the background and from each other
+    pixels = bytearray( width * height * 2 )
+    for i in range( width * height ):
+        color = ( i * 37 + seed ) & 0xFFFE
+        pixels[ i * 2 ]     = color >> 8
+        pixels[ i * 2 + 1 ] = color & 0xFF
+    return pixels
+
+def eyes( spi, lids=True ):
+    # A right eye and a mirrored left eye showing the same image
+    buffer = image( SIZE, SIZE, 1 )
+    result = []
+    for mirror in ( False, True ):
+        display = gc9a01.GC9A01( spi, dc=Pin(), cs=Pin(), mirror=mirror )
+        eye     = Eyeball( buffer, SIZE, SIZE, display )
+        if ( lids ):
+            eye.setLids( EyelidCurve( 240 ) )
+        result.append( eye )
+    return result
+
+def cycle( steps ):
+    # A frame function doing steps[ 0 ], steps[ 1 ], ... in turn
+    state = [ 0 ]
+    def frame():
+        steps[ state[ 0 ] ]()
+        state[ 0 ] = ( state[ 0 ] + 1 ) % len( steps )
+    return frame
+
+def check( frame, count ):
+    # Warm up with one whole cycle so every view is made, then check two
+    return heapCheck.checkFrame( frame, 2 * count, LIMIT, count )
+
+
+def test_slices_are_kept_by_spi():
+    spi  = KeepingSPI()
+    view = memoryview( bytearray( 8 ) )
+    with pytest.raises( AssertionError ):
+        heapCheck.checkFrame( lambda: spi.write( view[ 0 : 4 ] ), 4, sys.maxsize )
+    assert heapCheck.checkFrame( lambda: spi.write( view ), 4, sys.maxsize )[1] == 0
+
+def test_large_allocation_fails():
+    with pytest.raises( AssertionError ):
+        heapCheck.checkFrame( lambda: bytearray( 4 * LIMIT ), 4, LIMIT )
+
+@pytest.mark.parametrize( "roundMask", ( False, True ) )
+def test_draw_at( arena, roundMask ):
+    right, left = eyes( KeepingSPI() )
+    right.setRoundMask( roundMask )
+    left.setRoundMask( roundMask )
+    steps = []
+    for x, y in PLACES:
+        steps.append( lambda x=x, y=y: ( right.drawAt( x, y ), left.drawAt( x, y ) ) )
+    check( cycle( steps ), len( steps ) )
+
+def test_low_resolution( arena ):
+    right, left = eyes( KeepingSPI(), lids=False )
+    for eye in ( right, left ):
+        eye.setLowResolution( image( HALF, HALF, 2 ) )
+        eye.setQuality( Eyeball.QUALITY_LOW )
+    steps = []
+    for x, y in PLACES:
+        steps.append( lambda x=x, y=y: ( right.drawAt( x, y ), left.drawAt( x, y ) ) )
+    check( cycle( steps ), len( steps ) )
+
+def test_move( arena ):
+    right, left = eyes( KeepingSPI() )
+    for eye in ( right, left ):
+        eye.setDirection( 1, 1 )
+        eye.stepX = 7
+        eye.stepY = 5
+    def frame():
+        right.moveEyeball()
+        left.moveEyeball()
+    # The warm up bounces the eyes off every edge at least once
+    check( frame, 200 )
+
+def test_blink( arena ):
+    right, left = eyes( KeepingSPI() )
+    steps = []
+    for level in ( 15, 11, 6, 2, 0, 4, 9, 15 ):
+        steps.append( lambda level=level: ( right.setLidLevel( level ), left.setLidLevel( level ) ) )
+    check( cycle( steps ), len( steps ) )
+
+def test_eye_array( arena ):
+    group = EyeArray( eyes( KeepingSPI() ) )
+    steps = []
+    for x, y in PLACES:
+        steps.append( lambda x=x, y=y: group.drawAt( x, y ) )
+    check( cycle( steps ), len( steps ) )
+
+def test_path( arena ):
+    group  = EyeArray( eyes( KeepingSPI() ) )
+    player = PathPlayer( group )
+    path   = PATTERNS[ "circle" ]
+    player.play( path, 0, 50 )
+    steps  = []
+    for now in range( 0, path.periodMs, 50 ):
+        steps.append( lambda now=now: player.update( now ) )
+    check( cycle( steps ), len( steps ) )